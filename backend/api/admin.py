@@ -9,6 +9,7 @@ from .models import (
 	NuevoUsuario, 
 	ValidacionCorte, 
 	HistorialCarga,
+	TrabajoCarga,
 	Etnia,
 	Nacionalidad,
 	Sector,
@@ -16,24 +17,42 @@ from .models import (
 	Establecimiento,
 	Usuario,
 )
+from .cache_datos import bump_data_version
+from .signals import TABLA_POR_MODELO
+
+
+class VersionadoAdminMixin:
+	"""
+	Sube la versión de caché al eliminar desde el admin. Las ediciones ya la suben
+	por post_save (ver api/signals.py); las eliminaciones de estos modelos no
+	tienen receptor para no perder el borrado rápido de QuerySet.delete().
+	"""
+
+	def delete_model(self, request, obj):
+		super().delete_model(request, obj)
+		bump_data_version(TABLA_POR_MODELO[self.model])
+
+	def delete_queryset(self, request, queryset):
+		super().delete_queryset(request, queryset)
+		bump_data_version(TABLA_POR_MODELO[self.model])
 
 
 @admin.register(CorteFonasa)
-class CorteFonasaAdmin(admin.ModelAdmin):
+class CorteFonasaAdmin(VersionadoAdminMixin, admin.ModelAdmin):
 	list_display = ("run", "fecha_corte", "nombre_centro", "motivo")
 	list_filter = ("fecha_corte", "nombre_centro", "motivo")
 	search_fields = ("run", "nombres", "ap_paterno", "ap_materno")
 
 
 @admin.register(HpTrakcare)
-class HpTrakcareAdmin(admin.ModelAdmin):
+class HpTrakcareAdmin(VersionadoAdminMixin, admin.ModelAdmin):
 	list_display = ("run", "nombre", "ap_paterno", "sector", "nacionalidad")
 	list_filter = ("sector", "nacionalidad", "etnia")
 	search_fields = ("run", "nombre", "ap_paterno", "ap_materno", "cod_registro")
 
 
 @admin.register(NuevoUsuario)
-class NuevoUsuarioAdmin(admin.ModelAdmin):
+class NuevoUsuarioAdmin(VersionadoAdminMixin, admin.ModelAdmin):
 	list_display = ("run", "nombre_completo", "fecha_inscripcion", "periodo_str", "estado", "sector", "nacionalidad")
 	list_filter = ("estado", "periodo_anio", "periodo_mes", "nacionalidad", "sector", "etnia")
 	search_fields = ("run", "nombre_completo", "codigo_percapita")
@@ -157,3 +176,10 @@ class HistorialCargaAdmin(admin.ModelAdmin):
 		return f"{obj.tasa_exito}%"
 	tasa_exito.short_description = "Tasa de Éxito"
 
+
+@admin.register(TrabajoCarga)
+class TrabajoCargaAdmin(admin.ModelAdmin):
+	list_display = ("id", "tipo_carga", "estado", "creado_el", "iniciado_el", "finalizado_el")
+	list_filter = ("tipo_carga", "estado")
+	readonly_fields = ("creado_el", "iniciado_el", "finalizado_el", "resultado", "error")
+	ordering = ("-creado_el",)
@@ -0,0 +1,194 @@
+"""
+Búsqueda por RUN y nombre sobre el corte FONASA, HP Trakcare y nuevos usuarios.
+
+Los índices los crea la migración 0027_busqueda_indices según el motor:
+
+- PostgreSQL: índices GIN de pg_trgm sobre UPPER(campo). Además de este módulo,
+  aceleran los filtros `search=` (icontains) de los listados. El ranking usa
+  similarity().
+- SQLite: tablas virtuales FTS5 (tokenizador trigram) sincronizadas por
+  triggers. El ranking usa bm25().
+- Otros motores, o términos de menos de 3 caracteres en SQLite: icontains sin
+  ranking.
+
+En SQLite, las migraciones que reconstruyen una de estas tablas (AddConstraint,
+AddField con FK, etc.) borran sus triggers: deben volver a crearlos con
+api/migrations/_busqueda_fts.py, indicando las columnas de ese momento.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from django.db import DatabaseError, connection
+from django.db.models import Model, Q
+
+from .models import CorteFonasa, HpTrakcare, NuevoUsuario, normalize_run
+from .snapshots import snapshot_activo_id
+
+
+@dataclass(frozen=True)
+class FuenteBusqueda:
+    model: type[Model]
+    campos: Tuple[str, ...]
+    payload: Callable[[Model], Dict]
+    # Filas por versión (HP Trakcare): el índice FTS incluye todas las versiones
+    versionada: bool = False
+
+    @property
+    def tabla_fts(self) -> str:
+        return f"{self.model._meta.db_table}_fts"
+
+
+def _corte_payload(instance: CorteFonasa) -> Dict:
+    return {
+        "id": instance.id,
+        "run": instance.run,
+        "nombre": instance.nombre_completo,
+        "fechaCorte": instance.fecha_corte.isoformat(),
+        "nombreCentro": instance.nombre_centro,
+        "estadoValidacion": instance.estado_validacion,
+    }
+
+
+def _trakcare_payload(instance: HpTrakcare) -> Dict:
+    return {
+        "id": instance.id,
+        "run": instance.run,
+        "nombre": instance.nombre_completo,
+        "codFamilia": instance.cod_familia or None,
+        "codRegistro": instance.cod_registro or None,
+    }
+
+
+def _nuevo_usuario_payload(instance: NuevoUsuario) -> Dict:
+    return {
+        "id": instance.id,
+        "run": instance.run,
+        "nombre": instance.nombre_completo,
+        "periodo": f"{instance.periodo_anio:04d}-{instance.periodo_mes:02d}",
+        "estado": instance.estado,
+    }
+
+
+# Mismos campos que indexa la migración 0027_busqueda_indices
+FUENTES: Dict[str, FuenteBusqueda] = {
+    "corte": FuenteBusqueda(CorteFonasa, ("run", "nombres", "ap_paterno", "ap_materno"), _corte_payload),
+    "trakcare": FuenteBusqueda(
+        HpTrakcare, ("run", "nombre", "ap_paterno", "ap_materno", "cod_registro"), _trakcare_payload, versionada=True
+    ),
+    "nuevos_usuarios": FuenteBusqueda(NuevoUsuario, ("run", "nombre_completo"), _nuevo_usuario_payload),
+}
+
+
+def _contains_filter(fuente: FuenteBusqueda, termino: str) -> Q:
+    condicion = Q()
+    for campo in fuente.campos:
+        condicion |= Q(**{f"{campo}__icontains": termino})
+    return condicion
+
+
+def _filas(fuente: FuenteBusqueda, snapshot_id: int | None):
+    # Las fuentes versionadas leen la versión resuelta una vez al inicio de buscar()
+    if fuente.versionada:
+        return fuente.model.objects.de_snapshot(snapshot_id)
+    return fuente.model.objects.all()
+
+
+def _buscar_postgresql(
+    fuente: FuenteBusqueda, termino: str, limit: int, snapshot_id: int | None
+) -> List[Tuple[Model, float]]:
+    from django.contrib.postgres.search import TrigramSimilarity
+    from django.db.models.functions import Greatest, Upper
+
+    score = Greatest(*(TrigramSimilarity(Upper(campo), termino.upper()) for campo in fuente.campos))
+    queryset = (
+        _filas(fuente, snapshot_id)
+        .filter(_contains_filter(fuente, termino))
+        .annotate(score=score)
+        .order_by("-score", "id")[:limit]
+    )
+    return [(instance, round(instance.score, 4)) for instance in queryset]
+
+
+def _buscar_sqlite(
+    fuente: FuenteBusqueda, termino: str, limit: int, snapshot_id: int | None
+) -> List[Tuple[Model, float]] | None:
+    # El tokenizador trigram necesita al menos 3 caracteres
+    if len(termino) < 3:
+        return None
+
+    tabla = fuente.tabla_fts
+    frase = '"' + termino.replace('"', '""') + '"'
+    join, join_params = "", []
+    if fuente.versionada:
+        # Solo filas de la versión activa, para no gastar el límite en versiones en carga u obsoletas
+        tabla_modelo = fuente.model._meta.db_table
+        join = f"JOIN {tabla_modelo} ON {tabla_modelo}.id = {tabla}.rowid AND {tabla_modelo}.snapshot_id = %s "
+        join_params = [snapshot_id]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {tabla}.rowid, bm25({tabla}) FROM {tabla} {join}WHERE {tabla} MATCH %s "
+                f"ORDER BY bm25({tabla}), {tabla}.rowid LIMIT %s",
+                [*join_params, frase, limit],
+            )
+            ranking = cursor.fetchall()
+    except DatabaseError:
+        # Sin FTS5 (SQLite antiguo): se usa icontains
+        return None
+
+    instancias = _filas(fuente, snapshot_id).in_bulk([rowid for rowid, _ in ranking])
+    # bm25 es menor para mejores resultados; se invierte para que mayor = mejor
+    return [(instancias[rowid], round(-rank, 4)) for rowid, rank in ranking if rowid in instancias]
+
+
+def _buscar_fuente(
+    fuente: FuenteBusqueda, termino: str, limit: int, snapshot_id: int | None
+) -> List[Tuple[Model, float | None]]:
+    resultados = None
+    if connection.vendor == "postgresql":
+        resultados = _buscar_postgresql(fuente, termino, limit, snapshot_id)
+    elif connection.vendor == "sqlite":
+        resultados = _buscar_sqlite(fuente, termino, limit, snapshot_id)
+
+    if resultados is None:
+        queryset = _filas(fuente, snapshot_id).filter(_contains_filter(fuente, termino)).order_by("id")[:limit]
+        resultados = [(instance, None) for instance in queryset]
+    return resultados
+
+
+def buscar(termino: str, fuentes: Sequence[str], limit: int = 20) -> Dict[str, List[Dict]]:
+    """
+    Busca `termino` en cada fuente y retorna hasta `limit` resultados por fuente,
+    ordenados por relevancia. Si el término es un RUN completo, sus coincidencias
+    exactas van primero.
+    """
+    termino = termino.strip()
+    digitos = sum(char.isdigit() for char in termino)
+    run_exacto = normalize_run(termino) if digitos >= 7 else ""
+    # Los RUN se guardan sin puntos
+    termino_busqueda = termino.replace(".", "") if digitos else termino
+
+    # HP Trakcare: todas las consultas leen la versión activa al iniciar la búsqueda
+    snapshot_id = snapshot_activo_id() if any(FUENTES[nombre].versionada for nombre in fuentes) else None
+
+    resultados: Dict[str, List[Dict]] = {}
+    for nombre in fuentes:
+        fuente = FUENTES[nombre]
+        filas: List[Dict] = []
+        vistos = set()
+
+        if run_exacto:
+            for instance in _filas(fuente, snapshot_id).filter(run=run_exacto).order_by("id")[:limit]:
+                filas.append({**fuente.payload(instance), "score": None, "exacto": True})
+                vistos.add(instance.pk)
+
+        for instance, score in _buscar_fuente(fuente, termino_busqueda, limit, snapshot_id):
+            if len(filas) >= limit:
+                break
+            if instance.pk in vistos:
+                continue
+            filas.append({**fuente.payload(instance), "score": score, "exacto": False})
+
+        resultados[nombre] = filas
+    return resultados
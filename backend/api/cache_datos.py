@@ -0,0 +1,152 @@
+"""
+Caché compartida de respuestas, versionada según los datos cargados.
+
+Toda carga, reemplazo, edición o eliminación llama a `bump_data_version(tabla)`,
+que al confirmar la transacción renueva la versión de esa tabla y la global. Las
+claves de respuesta incluyen la versión global, así que tras una carga las
+respuestas anteriores dejan de usarse sin tener que borrarlas (expiran por
+TIMEOUT).
+
+Renovar es escribir un valor nuevo al azar, nunca leer y sumar: FileBasedCache
+y DatabaseCache implementan incr() como get() + set(), y dos cargas simultáneas
+podían dejar la misma versión para datos distintos. Con un valor que no se
+repite, la escritura posterior a una carga deja sin uso las respuestas guardadas
+antes, con cualquier backend.
+
+Las versiones por tabla generan los ETag de `etag_por_version`: si el cliente
+envía un If-None-Match vigente se responde 304 sin consultar la base de datos.
+
+El backend se configura en settings.CACHES (archivos, base de datos o Redis),
+por lo que la caché y las versiones se comparten entre los workers.
+"""
+
+from functools import partial, wraps
+import hashlib
+import json
+from typing import Dict, Sequence, Tuple
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+
+DATA_VERSION_KEY = "datos:version"
+
+# Tablas con versión propia (ETag); cualquier cambio también renueva la global
+TABLAS_VERSIONADAS = ("corte", "trakcare", "nuevos_usuarios", "catalogos")
+
+
+def _version_key(tabla: str | None) -> str:
+    return DATA_VERSION_KEY if tabla is None else f"{DATA_VERSION_KEY}:{tabla}"
+
+
+def _nueva_version() -> int:
+    # Al azar y no la hora: dos cargas en el mismo tic del reloj no deben
+    # compartir versión. Tampoco se repite si la clave se pierde (reinicio o
+    # expulsión de la caché)
+    return uuid.uuid4().int >> 65
+
+
+def get_data_version(tabla: str | None = None) -> int:
+    """Versión global de los datos, o la de `tabla` si se indica."""
+    return get_data_versions([tabla])[0]
+
+
+def get_data_versions(tablas: Sequence[str | None]) -> list[int]:
+    keys = [_version_key(tabla) for tabla in tablas]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _nueva_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def _renovar_version(key: str) -> None:
+    cache.set(key, _nueva_version(), timeout=None)
+
+
+# Una función fija por versión, para reconocerla entre los on_commit pendientes
+_RENOVACIONES = {tabla: partial(_renovar_version, _version_key(tabla)) for tabla in (None, *TABLAS_VERSIONADAS)}
+
+
+def bump_data_version(*tablas: str) -> None:
+    """
+    Marca como modificadas las tablas indicadas e invalida las respuestas
+    cacheadas. Dentro de una transacción la versión se renueva al confirmarla (una
+    sola vez por tabla): antes, otra petición podría guardar datos antiguos bajo
+    la versión nueva.
+    """
+    renovaciones = [_RENOVACIONES[None], *(_RENOVACIONES[tabla] for tabla in tablas)]
+    connection = transaction.get_connection()
+    if connection.in_atomic_block:
+        pendientes = {id(func) for _, func, _ in connection.run_on_commit}
+        for renovacion in renovaciones:
+            if id(renovacion) not in pendientes:
+                transaction.on_commit(renovacion)
+    else:
+        for renovacion in renovaciones:
+            renovacion()
+
+
+def response_cache_key(endpoint: str, params) -> str:
+    """Clave de una respuesta según el endpoint, sus parámetros y la versión de los datos."""
+    if hasattr(params, "lists"):
+        items = sorted((key, values) for key, values in params.lists())
+    else:
+        items = sorted(params.items())
+    digest = hashlib.sha1(json.dumps(items, default=str).encode("utf-8")).hexdigest()
+    return f"respuesta:{endpoint}:v{get_data_version()}:{digest}"
+
+
+def get_cached_response(endpoint: str, params) -> Tuple[str, Dict | None]:
+    """Retorna (clave, datos cacheados o None)."""
+    key = response_cache_key(endpoint, params)
+    return key, cache.get(key)
+
+
+def set_cached_response(key: str, data: Dict) -> None:
+    cache.set(key, data, timeout=getattr(settings, "RESPONSE_CACHE_TIMEOUT", 600))
+
+
+def _calcular_etag(request, tablas: Sequence[str]) -> str:
+    params = sorted(request.GET.lists())
+    contenido = json.dumps(
+        [request.path, params, request.META.get("HTTP_ACCEPT", ""), get_data_versions(tablas)]
+    )
+    return '"' + hashlib.sha1(contenido.encode("utf-8")).hexdigest() + '"'
+
+
+def etag_por_version(*tablas: str):
+    """
+    Decorador para vistas de lectura: agrega un ETag fuerte calculado con la ruta,
+    los parámetros y las versiones de `tablas`, y responde 304 sin ejecutar la
+    vista cuando If-None-Match coincide. Va debajo de @api_view.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+
+            etag = _calcular_etag(request, tablas)
+            if_none_match = request.headers.get("If-None-Match")
+            if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == "*"):
+                response = HttpResponseNotModified()
+            else:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+
+            response["ETag"] = etag
+            patch_vary_headers(response, ["Accept"])
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,105 @@
+"""
+Resolución en memoria de catálogos (etnia, nacionalidad, sector, subsector y
+establecimiento) a partir de los textos de las cargas.
+
+`CatalogoResolver` lee cada catálogo una sola vez por carga y lo indexa por
+nombre (y código, si el modelo lo tiene) sin distinguir mayúsculas, tildes ni
+espacios repetidos. Resolver una fila no consulta la base de datos.
+
+Con `crear_desconocidos` (por defecto settings.INGESTA_CREAR_CATALOGOS) los
+valores sin coincidencia se crean con un bulk_create por lote y catálogo.
+"""
+
+import unicodedata
+from typing import Dict, Iterable
+
+from django.conf import settings
+from django.db.models import Model
+
+from .cache_datos import bump_data_version
+from .models import Establecimiento, Etnia, Nacionalidad, Sector, Subsector
+
+
+CATALOGOS: Dict[str, type[Model]] = {
+    "etnia": Etnia,
+    "nacionalidad": Nacionalidad,
+    "sector": Sector,
+    "subsector": Subsector,
+    "establecimiento": Establecimiento,
+}
+
+
+def normalizar_clave(valor) -> str:
+    """'  María  José ' -> 'MARIA JOSE'."""
+    if valor is None:
+        return ""
+    texto = unicodedata.normalize("NFKD", str(valor))
+    texto = "".join(char for char in texto if not unicodedata.combining(char))
+    return " ".join(texto.upper().split())
+
+
+class CatalogoResolver:
+    """Índices de catálogos en memoria, válidos durante una carga."""
+
+    def __init__(self, *, crear_desconocidos: bool | None = None):
+        if crear_desconocidos is None:
+            crear_desconocidos = getattr(settings, "INGESTA_CREAR_CATALOGOS", False)
+        self.crear_desconocidos = crear_desconocidos
+        self._indices: Dict[str, Dict[str, Model]] = {}
+
+    def _indice(self, catalogo: str) -> Dict[str, Model]:
+        indice = self._indices.get(catalogo)
+        if indice is None:
+            model = CATALOGOS[catalogo]
+            con_codigo = any(field.name == "codigo" for field in model._meta.fields)
+            codigos: Dict[str, Model] = {}
+            nombres: Dict[str, Model] = {}
+            # Ante claves repetidas gana el activo más antiguo
+            for instancia in model.objects.order_by("-activo", "id"):
+                if con_codigo and instancia.codigo:
+                    codigos.setdefault(normalizar_clave(instancia.codigo), instancia)
+                nombres.setdefault(normalizar_clave(instancia.nombre), instancia)
+            # El nombre prima sobre el código
+            indice = {**codigos, **nombres}
+            indice.pop("", None)
+            self._indices[catalogo] = indice
+        return indice
+
+    def resolver(self, catalogo: str, valor) -> Model | None:
+        """Instancia del catálogo cuyo nombre o código coincide con `valor`, o None."""
+        clave = normalizar_clave(valor)
+        if not clave:
+            return None
+        return self._indice(catalogo).get(clave)
+
+    def _crear_faltantes(self, catalogo: str, valores: Iterable) -> None:
+        indice = self._indice(catalogo)
+        faltantes: Dict[str, str] = {}
+        for valor in valores:
+            clave = normalizar_clave(valor)
+            if clave and clave not in indice:
+                faltantes.setdefault(clave, " ".join(str(valor).split()))
+        if not faltantes:
+            return
+
+        model = CATALOGOS[catalogo]
+        creados = model.objects.bulk_create([model(nombre=nombre) for nombre in faltantes.values()])
+        bump_data_version("catalogos")
+        if all(instancia.pk is not None for instancia in creados):
+            for clave, instancia in zip(faltantes, creados):
+                indice[clave] = instancia
+        else:
+            # Motores que no retornan ids desde bulk_create: se vuelve a leer el catálogo
+            self._indices.pop(catalogo)
+
+    def resolver_filas(self, filas: Iterable[Dict], campos: Dict[str, str]) -> None:
+        """
+        Reemplaza en cada fila el texto de cada campo por la instancia del catálogo
+        indicado en `campos` ({campo: catálogo}), o None si no hay coincidencia.
+        """
+        filas = list(filas)
+        for campo, catalogo in campos.items():
+            if self.crear_desconocidos:
+                self._crear_faltantes(catalogo, (fila.get(campo) for fila in filas))
+            for fila in filas:
+                fila[campo] = self.resolver(catalogo, fila.get(campo))
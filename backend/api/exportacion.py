@@ -0,0 +1,188 @@
+"""
+Exportación masiva del corte FONASA y HP Trakcare a CSV, XLSX o Parquet.
+
+Las filas se leen desde un cursor de base de datos en lotes de tamaño fijo
+(`.values_list(...).iterator(chunk_size=EXPORT_CHUNK_SIZE)`), por lo que la
+memoria no depende del tamaño del mes exportado:
+
+- CSV: se genera mientras se leen las filas (StreamingHttpResponse).
+- XLSX: libro openpyxl en modo write_only sobre un archivo temporal.
+- Parquet: un row group de pyarrow por lote sobre un archivo temporal. pyarrow
+  es opcional; sin él el formato responde 400.
+"""
+
+import csv
+from dataclasses import dataclass
+from datetime import date
+import tempfile
+from typing import Iterator, List, Sequence
+
+from django.http import FileResponse, StreamingHttpResponse
+from openpyxl import Workbook
+
+
+EXPORT_FORMATS = ("csv", "xlsx", "parquet")
+EXPORT_CHUNK_SIZE = 5000
+
+# Sobre este tamaño el archivo temporal pasa de memoria a disco
+_SPOOL_MAX_SIZE = 32 * 1024 * 1024
+
+
+class ExportFormatError(Exception):
+    """El formato pedido no existe o no está disponible en este servidor."""
+
+
+@dataclass(frozen=True)
+class ColumnaExport:
+    nombre: str
+    campo: str
+    tipo: str = "str"  # str | int | date
+
+
+CORTE_EXPORT_COLUMNS = [
+    ColumnaExport("run", "run"),
+    ColumnaExport("nombres", "nombres"),
+    ColumnaExport("apPaterno", "ap_paterno"),
+    ColumnaExport("apMaterno", "ap_materno"),
+    ColumnaExport("fechaNacimiento", "fecha_nacimiento", "date"),
+    ColumnaExport("genero", "genero"),
+    ColumnaExport("tramo", "tramo"),
+    ColumnaExport("fechaCorte", "fecha_corte", "date"),
+    ColumnaExport("nombreCentro", "nombre_centro"),
+    ColumnaExport("centroDeProcedencia", "centro_de_procedencia"),
+    ColumnaExport("comunaDeProcedencia", "comuna_de_procedencia"),
+    ColumnaExport("centroActual", "centro_actual"),
+    ColumnaExport("comunaActual", "comuna_actual"),
+    ColumnaExport("aceptadoRechazado", "aceptado_rechazado"),
+    ColumnaExport("motivo", "motivo"),
+    ColumnaExport("estadoValidacion", "estado_validacion"),
+]
+
+TRAKCARE_EXPORT_COLUMNS = [
+    ColumnaExport("codFamilia", "cod_familia"),
+    ColumnaExport("relacionParentezco", "relacion_parentezco"),
+    ColumnaExport("idTrakcare", "id_trakcare"),
+    ColumnaExport("etnia", "etnia__nombre"),
+    ColumnaExport("codRegistro", "cod_registro"),
+    ColumnaExport("nacionalidad", "nacionalidad__nombre"),
+    ColumnaExport("RUN", "run"),
+    ColumnaExport("apPaterno", "ap_paterno"),
+    ColumnaExport("apMaterno", "ap_materno"),
+    ColumnaExport("nombre", "nombre"),
+    ColumnaExport("genero", "genero"),
+    ColumnaExport("fechaNacimiento", "fecha_nacimiento", "date"),
+    ColumnaExport("edad", "edad", "int"),
+    ColumnaExport("direccion", "direccion"),
+    ColumnaExport("telefono", "telefono"),
+    ColumnaExport("telefonoCelular", "telefono_celular"),
+    ColumnaExport("TelefonoRecado", "telefono_recado"),
+    ColumnaExport("servicioSalud", "servicio_salud"),
+    ColumnaExport("centroInscripcion", "centro_inscripcion__nombre"),
+    ColumnaExport("sector", "sector__nombre"),
+    ColumnaExport("prevision", "prevision"),
+    ColumnaExport("planTrakcare", "plan_trakcare"),
+    ColumnaExport("praisTrakcare", "prais_trakcare"),
+    ColumnaExport("fechaIncorporacion", "fecha_incorporacion", "date"),
+    ColumnaExport("fechaUltimaModif", "fecha_ultima_modif", "date"),
+    ColumnaExport("fechaDefuncion", "fecha_defuncion", "date"),
+]
+
+
+def _iter_filas(queryset, columnas: Sequence[ColumnaExport]) -> Iterator[tuple]:
+    campos = [columna.campo for columna in columnas]
+    return queryset.values_list(*campos).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def _iter_lotes(filas: Iterator[tuple]) -> Iterator[List[tuple]]:
+    lote: List[tuple] = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= EXPORT_CHUNK_SIZE:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+class _Echo:
+    """Objeto tipo archivo que retorna lo escrito, para csv.writer en streaming."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def _exportar_csv(queryset, columnas: Sequence[ColumnaExport], nombre_archivo: str) -> StreamingHttpResponse:
+    writer = csv.writer(_Echo())
+
+    def generate():
+        # BOM para que Excel abra el archivo como UTF-8
+        yield "\ufeff" + writer.writerow([columna.nombre for columna in columnas])
+        for lote in _iter_lotes(_iter_filas(queryset, columnas)):
+            yield "".join(
+                writer.writerow(
+                    ["" if valor is None else valor.isoformat() if isinstance(valor, date) else valor for valor in fila]
+                )
+                for fila in lote
+            )
+
+    response = StreamingHttpResponse(generate(), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{nombre_archivo}.csv"'
+    return response
+
+
+def _exportar_xlsx(queryset, columnas: Sequence[ColumnaExport], nombre_archivo: str) -> FileResponse:
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=nombre_archivo[:31])
+    sheet.append([columna.nombre for columna in columnas])
+    for fila in _iter_filas(queryset, columnas):
+        sheet.append(fila)
+
+    archivo = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE)
+    workbook.save(archivo)
+    archivo.seek(0)
+    return FileResponse(
+        archivo,
+        as_attachment=True,
+        filename=f"{nombre_archivo}.xlsx",
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+
+
+def _exportar_parquet(queryset, columnas: Sequence[ColumnaExport], nombre_archivo: str) -> FileResponse:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ExportFormatError("El formato parquet requiere pyarrow instalado en el servidor") from exc
+
+    tipos = {"str": pa.string(), "int": pa.int64(), "date": pa.date32()}
+    schema = pa.schema([(columna.nombre, tipos[columna.tipo]) for columna in columnas])
+
+    archivo = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE)
+    with pq.ParquetWriter(archivo, schema) as writer:
+        for lote in _iter_lotes(_iter_filas(queryset, columnas)):
+            # Un row group por lote: solo un lote en memoria a la vez
+            writer.write_batch(
+                pa.RecordBatch.from_arrays(
+                    [pa.array(valores, type=campo.type) for valores, campo in zip(zip(*lote), schema)],
+                    schema=schema,
+                )
+            )
+    archivo.seek(0)
+    return FileResponse(
+        archivo,
+        as_attachment=True,
+        filename=f"{nombre_archivo}.parquet",
+        content_type="application/vnd.apache.parquet",
+    )
+
+
+def exportar(queryset, columnas: Sequence[ColumnaExport], formato: str, nombre_archivo: str):
+    """Retorna la respuesta HTTP con el queryset exportado en el formato pedido."""
+    if formato == "csv":
+        return _exportar_csv(queryset, columnas, nombre_archivo)
+    if formato == "xlsx":
+        return _exportar_xlsx(queryset, columnas, nombre_archivo)
+    if formato == "parquet":
+        return _exportar_parquet(queryset, columnas, nombre_archivo)
+    raise ExportFormatError(f"Formato no soportado: {formato}. Opciones: {', '.join(EXPORT_FORMATS)}")
@@ -0,0 +1,110 @@
+"""
+Compara el rendimiento de la inserción fila a fila versus la inserción por lotes
+del corte FONASA, y de la inserción por lotes con la normalización repartida en
+NORMALIZACION_WORKERS procesos (como en las cargas de archivo y los trabajos).
+
+Uso:
+    python manage.py benchmark_ingesta_corte --rows 20000 --batch-size 5000 --workers 4
+
+Los registros generados se insertan dentro de una transacción que se revierte al
+finalizar, por lo que la base de datos queda intacta.
+"""
+
+import os
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from api.models import CorteFonasa, normalize_motivo
+from api.normalizacion import normalizar_cortes_por_lotes
+from api.views import _bulk_insert_cortes, _get_corte_batch_size
+
+
+class _Rollback(Exception):
+	pass
+
+
+def _generar_registros(cantidad: int, fecha_corte: date):
+	motivos = ["", "TRASLADO POSITIVO", "TRASLADO NEGATIVO", "RECHAZADO PREVISIONAL"]
+	for i in range(cantidad):
+		yield (
+			{
+				"run": f"{10_000_000 + i}-{i % 10}",
+				"nombres": f"NOMBRE {i}",
+				"apPaterno": "PATERNO",
+				"apMaterno": "MATERNO",
+				"fechaNacimiento": "1990-01-01",
+				"genero": "F" if i % 2 else "M",
+				"tramo": "A",
+				"fehcaCorte": fecha_corte.isoformat(),
+				"nombreCentro": f"CENTRO {i % 5}",
+				"aceptadoRechazado": "ACEPTADO" if i % 7 else "RECHAZADO",
+				"motivo": motivos[i % len(motivos)],
+			},
+			fecha_corte,
+		)
+
+
+class Command(BaseCommand):
+	help = "Mide filas/segundo de la ingesta del corte FONASA (fila a fila vs. por lotes)."
+
+	def add_arguments(self, parser):
+		parser.add_argument("--rows", type=int, default=20000, help="Cantidad de registros a insertar")
+		parser.add_argument("--batch-size", type=int, default=None, help="Tamaño de lote para bulk_create")
+		parser.add_argument(
+			"--workers", type=int, default=os.cpu_count() or 2, help="Procesos de normalización para el modo con procesos"
+		)
+
+	def _medir(self, funcion) -> float:
+		inicio = time.perf_counter()
+		try:
+			with transaction.atomic():
+				funcion()
+				raise _Rollback()
+		except _Rollback:
+			pass
+		return time.perf_counter() - inicio
+
+	def handle(self, *args, **options):
+		rows = options["rows"]
+		batch_size = options["batch_size"]
+		fecha_corte = date(1900, 1, 1)
+
+		def fila_a_fila():
+			for record, fecha in _generar_registros(rows, fecha_corte):
+				motivo = record.get("motivo", "")
+				CorteFonasa.objects.create(
+					run=record["run"],
+					fecha_corte=fecha,
+					nombres=record["nombres"],
+					ap_paterno=record["apPaterno"],
+					ap_materno=record["apMaterno"],
+					genero=record["genero"],
+					tramo=record["tramo"],
+					nombre_centro=record["nombreCentro"],
+					aceptado_rechazado=record["aceptadoRechazado"],
+					motivo=motivo,
+					motivo_normalizado=normalize_motivo(motivo),
+				)
+
+		def por_lotes():
+			_bulk_insert_cortes(list(_generar_registros(rows, fecha_corte)), batch_size=batch_size)
+
+		def con_procesos():
+			# Mismo recorrido que _ingest_corte_batches: lotes normalizados en el pool
+			# mientras se inserta el anterior
+			registros = list(_generar_registros(rows, fecha_corte))
+			tamano = batch_size or _get_corte_batch_size()
+			lotes = (registros[inicio : inicio + tamano] for inicio in range(0, rows, tamano))
+			with override_settings(NORMALIZACION_WORKERS=options["workers"]):
+				for lote, normalized in normalizar_cortes_por_lotes(lotes, total_carga=rows):
+					_bulk_insert_cortes(lote, batch_size=batch_size, normalized=normalized)
+
+		modos = (("fila a fila", fila_a_fila), ("por lotes", por_lotes), ("con procesos", con_procesos))
+		for etiqueta, funcion in modos:
+			segundos = self._medir(funcion)
+			tasa = rows / segundos if segundos else float("inf")
+			self.stdout.write(f"{etiqueta:>12}: {rows} filas en {segundos:.2f}s ({tasa:,.0f} filas/s)")
@@ -0,0 +1,57 @@
+"""
+Ejecuta los trabajos de carga pendientes en un proceso separado del servidor web.
+
+Uso:
+    python manage.py procesar_trabajos            # queda escuchando nuevos trabajos
+    python manage.py procesar_trabajos --once     # procesa los pendientes y termina
+
+Pensado para INGESTA_EJECUTOR = "command"; con el ejecutor por hilos no hace
+falta, el propio servidor retoma la cola (ver trabajos.reanudar_trabajos). En
+cada vuelta devuelve a la cola los trabajos EN_PROCESO abandonados (sin avance en
+INGESTA_TRABAJO_TIMEOUT segundos, ver trabajos.liberar_trabajos_abandonados).
+Cuando la cola está vacía elimina las versiones obsoletas de HP Trakcare.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api.models import TrabajoCarga
+from api.snapshots import recolectar_snapshots
+from api.trabajos import ejecutar_trabajo, liberar_trabajos_abandonados
+
+
+class Command(BaseCommand):
+	help = "Procesa los trabajos de carga (Corte FONASA / HP Trakcare) pendientes."
+
+	def add_arguments(self, parser):
+		parser.add_argument("--once", action="store_true", help="Procesa los pendientes y termina")
+		parser.add_argument("--interval", type=float, default=2.0, help="Segundos entre consultas de la cola")
+
+	def handle(self, *args, **options):
+		while True:
+			close_old_connections()
+			liberados = liberar_trabajos_abandonados()
+			if liberados:
+				self.stdout.write(f"Trabajos abandonados devueltos a la cola: {liberados}")
+			pendientes = list(
+				TrabajoCarga.objects.filter(estado="PENDIENTE")
+				.order_by("creado_el")
+				.values_list("pk", flat=True)
+			)
+			for trabajo_id in pendientes:
+				self.stdout.write(f"Procesando trabajo #{trabajo_id}")
+				ejecutar_trabajo(trabajo_id)
+				estado = TrabajoCarga.objects.values_list("estado", flat=True).get(pk=trabajo_id)
+				self.stdout.write(f"Trabajo #{trabajo_id}: {estado}")
+
+			if not pendientes:
+				eliminadas = recolectar_snapshots()
+				if eliminadas:
+					self.stdout.write(f"Versiones obsoletas de HP Trakcare: {eliminadas} filas eliminadas")
+
+			if options["once"]:
+				break
+			if not pendientes:
+				time.sleep(options["interval"])
@@ -0,0 +1,27 @@
+"""
+Recalcula la tabla CorteFonasaDelta para todos los meses cargados.
+
+Uso:
+    python manage.py recalcular_deltas_corte
+
+Las cargas mantienen los deltas al día; este comando sirve para poblarlos con los
+cortes existentes antes de la migración o tras ediciones manuales de registros.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.cache_datos import bump_data_version
+from api.models import CorteFonasaDelta
+from api.views import _refresh_corte_deltas
+
+
+class Command(BaseCommand):
+	help = "Recalcula las altas, bajas y cambios mes a mes del Corte FONASA."
+
+	def handle(self, *args, **options):
+		with transaction.atomic():
+			_refresh_corte_deltas()
+			# Las respuestas de /api/corte-fonasa/delta/ dependen de la versión del corte
+			bump_data_version("corte")
+		self.stdout.write(f"Deltas recalculados: {CorteFonasaDelta.objects.count()} filas")
@@ -0,0 +1,221 @@
+"""
+Métricas por endpoint: peticiones, latencia, consultas SQL y tamaño de respuesta.
+
+`MetricasMiddleware` mide cada petición y la agrupa por el nombre de la ruta
+resuelta (`url_name` de api/urls.py). Las consultas se cuentan y cronometran con
+`connection.execute_wrapper`; en las respuestas transmitidas (listados all=true,
+exportaciones) la medición sigue hasta terminar de enviar el contenido.
+
+Los valores se acumulan en memoria del proceso y se publican en /api/metrics/ en
+formato de texto de Prometheus; con varios workers cada uno publica los suyos.
+El endpoint solo responde a usuarios staff o, si METRICS_TOKEN está definido, a
+peticiones con el encabezado "Authorization: Bearer <METRICS_TOKEN>" (Prometheus).
+
+Con METRICS_SLOW_REQUEST_MS > 0 las peticiones más lentas que ese umbral se
+registran en el logger "api.metricas" junto a sus consultas más lentas.
+"""
+
+from dataclasses import dataclass, field
+import heapq
+import hmac
+import logging
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.db import connection
+from rest_framework.permissions import BasePermission
+
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SLOW_QUERIES_LOGGED = 5
+_SQL_LOG_MAX_CHARS = 500
+
+
+@dataclass
+class _Medicion:
+    """Mediciones de una petición en curso."""
+
+    inicio: float
+    registrar_consultas: bool
+    consultas: int = 0
+    tiempo_sql: float = 0.0
+    bytes: int = 0
+    # (duración, sql) de las consultas más lentas, como heap de mínimos
+    mas_lentas: List[Tuple[float, str]] = field(default_factory=list)
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            self.consultas += 1
+            self.tiempo_sql += duracion
+            if self.registrar_consultas:
+                entrada = (duracion, sql)
+                if len(self.mas_lentas) < SLOW_QUERIES_LOGGED:
+                    heapq.heappush(self.mas_lentas, entrada)
+                elif duracion > self.mas_lentas[0][0]:
+                    heapq.heapreplace(self.mas_lentas, entrada)
+
+
+@dataclass
+class _MetricasEndpoint:
+    peticiones: Dict[Tuple[str, int], int] = field(default_factory=dict)  # (método, status) -> total
+    buckets: List[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+    latencia_total: float = 0.0
+    cantidad: int = 0
+    consultas: int = 0
+    tiempo_sql: float = 0.0
+    bytes: int = 0
+
+
+_metricas: Dict[str, _MetricasEndpoint] = {}
+_lock = threading.Lock()
+
+
+def _registrar(endpoint: str, metodo: str, status_code: int, medicion: _Medicion) -> None:
+    latencia = time.perf_counter() - medicion.inicio
+    with _lock:
+        metricas = _metricas.setdefault(endpoint, _MetricasEndpoint())
+        clave = (metodo, status_code)
+        metricas.peticiones[clave] = metricas.peticiones.get(clave, 0) + 1
+        for index, limite in enumerate(LATENCY_BUCKETS):
+            if latencia <= limite:
+                metricas.buckets[index] += 1
+        metricas.latencia_total += latencia
+        metricas.cantidad += 1
+        metricas.consultas += medicion.consultas
+        metricas.tiempo_sql += medicion.tiempo_sql
+        metricas.bytes += medicion.bytes
+
+    umbral_ms = getattr(settings, "METRICS_SLOW_REQUEST_MS", 0)
+    if umbral_ms and latencia * 1000 >= umbral_ms:
+        consultas = "".join(
+            f"\n  {duracion * 1000:.1f} ms: {sql[:_SQL_LOG_MAX_CHARS]}"
+            for duracion, sql in sorted(medicion.mas_lentas, reverse=True)
+        )
+        logger.warning(
+            "Petición lenta %s %s (%s): %.0f ms, %d consultas, %.0f ms en SQL%s",
+            metodo,
+            endpoint,
+            status_code,
+            latencia * 1000,
+            medicion.consultas,
+            medicion.tiempo_sql * 1000,
+            consultas,
+        )
+
+
+class MetricasMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        medicion = _Medicion(
+            inicio=time.perf_counter(),
+            registrar_consultas=bool(getattr(settings, "METRICS_SLOW_REQUEST_MS", 0)),
+        )
+        with connection.execute_wrapper(medicion):
+            response = self.get_response(request)
+
+        match = getattr(request, "resolver_match", None)
+        endpoint = (match.url_name if match else None) or "sin_ruta"
+
+        if response.streaming:
+            response.streaming_content = self._medir_contenido(
+                response.streaming_content, endpoint, request.method, response.status_code, medicion
+            )
+        else:
+            medicion.bytes = len(response.content)
+            _registrar(endpoint, request.method, response.status_code, medicion)
+        return response
+
+    @staticmethod
+    def _medir_contenido(contenido, endpoint: str, metodo: str, status_code: int, medicion: _Medicion):
+        # Las consultas del streaming ocurren mientras el servidor consume el iterador
+        try:
+            with connection.execute_wrapper(medicion):
+                for chunk in contenido:
+                    medicion.bytes += len(chunk)
+                    yield chunk
+        finally:
+            _registrar(endpoint, metodo, status_code, medicion)
+
+
+def _etiqueta(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def render_prometheus() -> str:
+    """Métricas acumuladas en formato de texto de Prometheus."""
+    with _lock:
+        snapshot = sorted(
+            (
+                endpoint,
+                dict(metricas.peticiones),
+                list(metricas.buckets),
+                metricas.latencia_total,
+                metricas.cantidad,
+                metricas.consultas,
+                metricas.tiempo_sql,
+                metricas.bytes,
+            )
+            for endpoint, metricas in _metricas.items()
+        )
+
+    lineas = [
+        "# HELP percapita_http_requests_total Peticiones atendidas por endpoint, método y status.",
+        "# TYPE percapita_http_requests_total counter",
+    ]
+    for endpoint, peticiones, *_ in snapshot:
+        for (metodo, status_code), total in sorted(peticiones.items()):
+            lineas.append(
+                f'percapita_http_requests_total{{endpoint="{_etiqueta(endpoint)}",method="{metodo}",'
+                f'status="{status_code}"}} {total}'
+            )
+
+    lineas += [
+        "# HELP percapita_http_request_duration_seconds Latencia de las peticiones por endpoint.",
+        "# TYPE percapita_http_request_duration_seconds histogram",
+    ]
+    for endpoint, _, buckets, latencia_total, cantidad, *_ in snapshot:
+        etiqueta = _etiqueta(endpoint)
+        for limite, total in zip(LATENCY_BUCKETS, buckets):
+            lineas.append(
+                f'percapita_http_request_duration_seconds_bucket{{endpoint="{etiqueta}",le="{limite}"}} {total}'
+            )
+        lineas += [
+            f'percapita_http_request_duration_seconds_bucket{{endpoint="{etiqueta}",le="+Inf"}} {cantidad}',
+            f'percapita_http_request_duration_seconds_sum{{endpoint="{etiqueta}"}} {latencia_total:.6f}',
+            f'percapita_http_request_duration_seconds_count{{endpoint="{etiqueta}"}} {cantidad}',
+        ]
+
+    contadores = (
+        ("percapita_db_queries_total", "Consultas SQL ejecutadas por endpoint.", 5, "{}"),
+        ("percapita_db_query_seconds_total", "Tiempo total en SQL por endpoint.", 6, "{:.6f}"),
+        ("percapita_http_response_bytes_total", "Bytes enviados en las respuestas por endpoint.", 7, "{}"),
+    )
+    for nombre, ayuda, posicion, formato in contadores:
+        lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} counter"]
+        for fila in snapshot:
+            lineas.append(f'{nombre}{{endpoint="{_etiqueta(fila[0])}"}} {formato.format(fila[posicion])}')
+
+    return "\n".join(lineas) + "\n"
+
+
+class AccesoMetricas(BasePermission):
+    """Usuarios staff, o el token de METRICS_TOKEN como Bearer."""
+
+    def has_permission(self, request, view) -> bool:
+        if request.user and request.user.is_staff:
+            return True
+        token = getattr(settings, "METRICS_TOKEN", "")
+        if not token:
+            return False
+        esquema, _, credencial = request.headers.get("Authorization", "").partition(" ")
+        return esquema.lower() == "bearer" and hmac.compare_digest(credencial.strip().encode(), token.encode())
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:24
+
+import django.core.validators
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+NON_VALIDATED_MOTIVOS = {
+    "TRASLADO NEGATIVO",
+    "RECHAZADO PREVISIONAL",
+    "RECHAZADO FALLECIDO",
+}
+
+
+def forward_populate(apps, schema_editor):
+    CorteFonasa = apps.get_model("api", "CorteFonasa")
+    CorteMonthlyStats = apps.get_model("api", "CorteMonthlyStats")
+
+    non_validated_filter = (
+        Q(aceptado_rechazado__icontains="RECHAZADO")
+        | Q(aceptado_rechazado__icontains="RECHAZO")
+        | Q(motivo_normalizado__in=NON_VALIDATED_MOTIVOS)
+        | Q(motivo_normalizado__icontains="FALLECIDO")
+    )
+    validated_filter = Q(aceptado_rechazado__iexact="ACEPTADO") & ~non_validated_filter
+
+    grouped = (
+        CorteFonasa.objects.values("fecha_corte__year", "fecha_corte__month", "nombre_centro")
+        .annotate(
+            total=Count("id"),
+            validados=Count("id", filter=validated_filter),
+            no_validados=Count("id", filter=non_validated_filter),
+        )
+        .order_by()
+    )
+    CorteMonthlyStats.objects.bulk_create(
+        [
+            CorteMonthlyStats(
+                periodo_anio=item["fecha_corte__year"],
+                periodo_mes=item["fecha_corte__month"],
+                nombre_centro=item["nombre_centro"] or "",
+                total=item["total"],
+                validados=item["validados"],
+                no_validados=item["no_validados"],
+            )
+            for item in grouped
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_remove_cortefonasa_rut_centro_actual_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorteMonthlyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('periodo_anio', models.PositiveSmallIntegerField()),
+                ('periodo_mes', models.PositiveSmallIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(12)])),
+                ('nombre_centro', models.CharField(blank=True, max_length=255)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('validados', models.PositiveIntegerField(default=0)),
+                ('no_validados', models.PositiveIntegerField(default=0)),
+                ('actualizado_el', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Estadística mensual de corte',
+                'verbose_name_plural': 'Estadísticas mensuales de corte',
+                'ordering': ['-periodo_anio', '-periodo_mes', 'nombre_centro'],
+                'unique_together': {('periodo_anio', 'periodo_mes', 'nombre_centro')},
+            },
+        ),
+        migrations.RunPython(forward_populate, migrations.RunPython.noop),
+    ]
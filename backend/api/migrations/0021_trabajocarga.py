@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:29
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_cortemonthlystats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historialcarga',
+            name='etapas',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='historialcarga',
+            name='filas_procesadas',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='TrabajoCarga',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo_carga', models.CharField(choices=[('CORTE_FONASA', 'Corte FONASA'), ('HP_TRAKCARE', 'HP Trakcare')], db_index=True, max_length=20)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_PROCESO', 'En Proceso'), ('EXITOSO', 'Exitoso'), ('ERROR', 'Error')], db_index=True, default='PENDIENTE', max_length=20)),
+                ('registros', models.JSONField(blank=True, null=True)),
+                ('archivo', models.FileField(blank=True, upload_to='cargas/')),
+                ('reemplazo', models.BooleanField(default=False)),
+                ('resultado', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True)),
+                ('creado_el', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('iniciado_el', models.DateTimeField(blank=True, null=True)),
+                ('finalizado_el', models.DateTimeField(blank=True, null=True)),
+                ('historial', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='trabajo', to='api.historialcarga')),
+            ],
+            options={
+                'verbose_name': 'Trabajo de Carga',
+                'verbose_name_plural': 'Trabajos de Carga',
+                'ordering': ['-creado_el'],
+                'indexes': [models.Index(fields=['estado', 'creado_el'], name='api_trabajo_estado_0fce4f_idx')],
+            },
+        ),
+    ]
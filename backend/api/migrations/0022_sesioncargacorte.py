@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:31
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_trabajocarga'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SesionCargaCorte',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('estado', models.CharField(choices=[('ABIERTA', 'Abierta'), ('FINALIZADA', 'Finalizada')], db_index=True, default='ABIERTA', max_length=20)),
+                ('nombre_archivo', models.CharField(blank=True, max_length=500)),
+                ('usuario', models.CharField(blank=True, max_length=255)),
+                ('reemplazo', models.BooleanField(default=False)),
+                ('meses_reemplazados', models.JSONField(blank=True, default=list)),
+                ('total_chunks', models.PositiveIntegerField(blank=True, null=True)),
+                ('creado_el', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finalizado_el', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Sesión de Carga de Corte',
+                'verbose_name_plural': 'Sesiones de Carga de Corte',
+                'ordering': ['-creado_el'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ChunkCargaCorte',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('numero', models.PositiveIntegerField()),
+                ('hash', models.CharField(max_length=64)),
+                ('total_registros', models.PositiveIntegerField(default=0)),
+                ('registros_creados', models.PositiveIntegerField(default=0)),
+                ('registros_invalidos', models.PositiveIntegerField(default=0)),
+                ('errores', models.JSONField(blank=True, default=list)),
+                ('recibido_el', models.DateTimeField(default=django.utils.timezone.now)),
+                ('sesion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='api.sesioncargacorte')),
+            ],
+            options={
+                'verbose_name': 'Chunk de Carga de Corte',
+                'verbose_name_plural': 'Chunks de Carga de Corte',
+                'ordering': ['sesion', 'numero'],
+                'unique_together': {('sesion', 'numero')},
+            },
+        ),
+    ]
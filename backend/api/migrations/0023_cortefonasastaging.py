@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:33
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_sesioncargacorte'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorteFonasaStaging',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('carga', models.UUIDField(db_index=True)),
+                ('run', models.CharField(max_length=12)),
+                ('nombres', models.CharField(blank=True, max_length=255)),
+                ('ap_paterno', models.CharField(blank=True, max_length=255)),
+                ('ap_materno', models.CharField(blank=True, max_length=255)),
+                ('fecha_nacimiento', models.DateField(blank=True, null=True)),
+                ('genero', models.CharField(blank=True, max_length=20)),
+                ('tramo', models.CharField(blank=True, max_length=50)),
+                ('fecha_corte', models.DateField()),
+                ('nombre_centro', models.CharField(blank=True, max_length=255)),
+                ('centro_de_procedencia', models.CharField(blank=True, max_length=255)),
+                ('comuna_de_procedencia', models.CharField(blank=True, max_length=100)),
+                ('nombre_centro_actual', models.CharField(blank=True, max_length=255)),
+                ('centro_actual', models.CharField(blank=True, max_length=255)),
+                ('comuna_actual', models.CharField(blank=True, max_length=100)),
+                ('aceptado_rechazado', models.CharField(blank=True, default='', max_length=255)),
+                ('motivo', models.CharField(blank=True, max_length=255)),
+                ('motivo_normalizado', models.CharField(blank=True, default='', max_length=255)),
+                ('creado_el', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+            ],
+            options={
+                'verbose_name': 'Corte FONASA (preparación)',
+                'verbose_name_plural': 'Cortes FONASA (preparación)',
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:38
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_cortefonasastaging'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chunkcargacorte',
+            name='meses',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.CreateModel(
+            name='CorteFonasaDelta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('periodo_anio', models.PositiveSmallIntegerField()),
+                ('periodo_mes', models.PositiveSmallIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(12)])),
+                ('anterior_anio', models.PositiveSmallIntegerField()),
+                ('anterior_mes', models.PositiveSmallIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(12)])),
+                ('run', models.CharField(max_length=12)),
+                ('tipo', models.CharField(choices=[('ALTA', 'Alta'), ('BAJA', 'Baja'), ('CAMBIO', 'Cambio')], max_length=10)),
+                ('nombre', models.CharField(blank=True, max_length=800)),
+                ('tramo_anterior', models.CharField(blank=True, max_length=50)),
+                ('tramo_actual', models.CharField(blank=True, max_length=50)),
+                ('centro_anterior', models.CharField(blank=True, max_length=255)),
+                ('centro_actual', models.CharField(blank=True, max_length=255)),
+                ('motivo_anterior', models.CharField(blank=True, max_length=255)),
+                ('motivo_actual', models.CharField(blank=True, max_length=255)),
+                ('cambio_tramo', models.BooleanField(default=False)),
+                ('cambio_centro', models.BooleanField(default=False)),
+                ('cambio_motivo', models.BooleanField(default=False)),
+            ],
+            options={
+                'verbose_name': 'Delta de Corte FONASA',
+                'verbose_name_plural': 'Deltas de Corte FONASA',
+                'ordering': ['-periodo_anio', '-periodo_mes', 'tipo', 'run'],
+                'indexes': [models.Index(fields=['periodo_anio', 'periodo_mes', 'tipo', 'run'], name='api_cortefo_periodo_06b105_idx')],
+            },
+        ),
+    ]
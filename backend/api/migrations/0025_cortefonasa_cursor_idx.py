@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_cortefonasadelta'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cortefonasa',
+            index=models.Index(fields=['-fecha_corte', 'run', 'id'], name='api_cortefo_fecha_c_f8b00c_idx'),
+        ),
+    ]
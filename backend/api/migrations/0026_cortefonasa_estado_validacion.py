@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:41
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+NON_VALIDATED_MOTIVOS = {
+    "TRASLADO NEGATIVO",
+    "RECHAZADO PREVISIONAL",
+    "RECHAZADO FALLECIDO",
+}
+
+
+def forward_classify(apps, schema_editor):
+    CorteFonasa = apps.get_model("api", "CorteFonasa")
+    CorteMonthlyStats = apps.get_model("api", "CorteMonthlyStats")
+
+    # El campo se agrega como VALIDADO; se corrigen los demás por conjuntos
+    CorteFonasa.objects.filter(
+        Q(aceptado_rechazado__icontains="RECHAZADO")
+        | Q(aceptado_rechazado__icontains="RECHAZO")
+        | Q(motivo_normalizado__in=NON_VALIDATED_MOTIVOS)
+    ).update(estado_validacion="NO_VALIDADO")
+    CorteFonasa.objects.filter(motivo_normalizado__icontains="FALLECIDO").update(estado_validacion="FALLECIDO")
+
+    # Los totales por mes y centro pasan a contar según la nueva columna
+    grouped = (
+        CorteFonasa.objects.values("fecha_corte__year", "fecha_corte__month", "nombre_centro")
+        .annotate(
+            total=Count("id"),
+            validados=Count("id", filter=Q(estado_validacion="VALIDADO")),
+        )
+        .order_by()
+    )
+    CorteMonthlyStats.objects.all().delete()
+    CorteMonthlyStats.objects.bulk_create(
+        [
+            CorteMonthlyStats(
+                periodo_anio=item["fecha_corte__year"],
+                periodo_mes=item["fecha_corte__month"],
+                nombre_centro=item["nombre_centro"] or "",
+                total=item["total"],
+                validados=item["validados"],
+                no_validados=item["total"] - item["validados"],
+            )
+            for item in grouped
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_cortefonasa_cursor_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cortefonasa',
+            name='estado_validacion',
+            field=models.CharField(choices=[('VALIDADO', 'Validado'), ('NO_VALIDADO', 'No validado'), ('FALLECIDO', 'Fallecido')], db_index=True, default='VALIDADO', max_length=12),
+        ),
+        migrations.AddField(
+            model_name='cortefonasastaging',
+            name='estado_validacion',
+            field=models.CharField(choices=[('VALIDADO', 'Validado'), ('NO_VALIDADO', 'No validado'), ('FALLECIDO', 'Fallecido')], default='VALIDADO', max_length=12),
+        ),
+        migrations.RunPython(forward_classify, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='cortefonasa',
+            index=models.Index(fields=['fecha_corte', 'nombre_centro', 'estado_validacion'], name='api_cortefo_fecha_c_54dd8f_idx'),
+        ),
+    ]
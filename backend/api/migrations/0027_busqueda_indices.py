@@ -0,0 +1,107 @@
+"""
+Índices de búsqueda por RUN y nombre (ver api/busqueda.py).
+
+- PostgreSQL: extensión pg_trgm e índices GIN sobre UPPER(campo), la misma
+  expresión que genera Django para `icontains`.
+- SQLite: tablas virtuales FTS5 con tokenizador trigram, de contenido externo y
+  sincronizadas con triggers.
+"""
+
+from django.db import migrations
+
+
+# tabla -> columnas indexadas
+SEARCH_TABLES = {
+    "api_cortefonasa": ("run", "nombres", "ap_paterno", "ap_materno"),
+    "api_hptrakcare": ("run", "nombre", "ap_paterno", "ap_materno", "cod_registro"),
+    "api_nuevousuario": ("run", "nombre_completo"),
+}
+
+
+def _sqlite_fts_disponible(connection) -> bool:
+    # El tokenizador trigram existe desde SQLite 3.34
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5'), sqlite_version()")
+        fts5, version = cursor.fetchone()
+    return bool(fts5) and tuple(int(part) for part in version.split(".")[:2]) >= (3, 34)
+
+
+def _postgresql_forward(schema_editor):
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, columns in SEARCH_TABLES.items():
+        for column in columns:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS "{table}_{column}_trgm" '
+                f'ON "{table}" USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+            )
+
+
+def _postgresql_backward(schema_editor):
+    for table, columns in SEARCH_TABLES.items():
+        for column in columns:
+            schema_editor.execute(f'DROP INDEX IF EXISTS "{table}_{column}_trgm"')
+
+
+def _sqlite_forward(schema_editor):
+    if not _sqlite_fts_disponible(schema_editor.connection):
+        return
+
+    for table, columns in SEARCH_TABLES.items():
+        fts = f"{table}_fts"
+        column_list = ", ".join(columns)
+        new_values = ", ".join(f"new.{column}" for column in columns)
+        old_values = ", ".join(f"old.{column}" for column in columns)
+
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5("
+            f"{column_list}, content='{table}', content_rowid='id', tokenize='trigram')"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {column_list} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+        )
+        schema_editor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def _sqlite_backward(schema_editor):
+    for table in SEARCH_TABLES:
+        fts = f"{table}_fts"
+        for suffix in ("ai", "ad", "au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+def forward(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        _postgresql_forward(schema_editor)
+    elif vendor == "sqlite":
+        _sqlite_forward(schema_editor)
+
+
+def backward(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        _postgresql_backward(schema_editor)
+    elif vendor == "sqlite":
+        _sqlite_backward(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_cortefonasa_estado_validacion'),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, backward),
+    ]
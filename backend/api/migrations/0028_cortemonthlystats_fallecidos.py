@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:54
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def forward_fallecidos(apps, schema_editor):
+    CorteFonasa = apps.get_model("api", "CorteFonasa")
+    CorteMonthlyStats = apps.get_model("api", "CorteMonthlyStats")
+
+    grouped = (
+        CorteFonasa.objects.filter(estado_validacion="FALLECIDO")
+        .values("fecha_corte__year", "fecha_corte__month", "nombre_centro")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+    for item in grouped:
+        CorteMonthlyStats.objects.filter(
+            periodo_anio=item["fecha_corte__year"],
+            periodo_mes=item["fecha_corte__month"],
+            nombre_centro=item["nombre_centro"] or "",
+        ).update(fallecidos=item["total"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0027_busqueda_indices'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cortemonthlystats',
+            name='fallecidos',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(forward_fallecidos, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='cortemonthlystats',
+            index=models.Index(fields=['nombre_centro', '-periodo_anio', '-periodo_mes'], name='cortestats_centro_mes_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:55
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+from ._busqueda_fts import reconstruir_fts_sqlite
+
+
+# Columnas de api_hptrakcare indexadas en este punto del historial (0027)
+HPTRAKCARE_FTS_COLUMNS = ("run", "nombre", "ap_paterno", "ap_materno", "cod_registro")
+
+
+def forward_dedupe(apps, schema_editor):
+    HpTrakcare = apps.get_model("api", "HpTrakcare")
+
+    # Se conserva la fila más reciente de cada (run, cod_registro) repetido
+    duplicados = (
+        HpTrakcare.objects.values("run", "cod_registro")
+        .annotate(total=Count("id"), ultimo_id=Max("id"))
+        .filter(total__gt=1)
+        .order_by()
+    )
+    for item in duplicados:
+        HpTrakcare.objects.filter(run=item["run"], cod_registro=item["cod_registro"]).exclude(
+            id=item["ultimo_id"]
+        ).delete()
+
+
+def reconstruir_busqueda(apps, schema_editor):
+    # AddConstraint reconstruye la tabla en SQLite y borra los triggers FTS
+    reconstruir_fts_sqlite(schema_editor, "api_hptrakcare", HPTRAKCARE_FTS_COLUMNS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_cortemonthlystats_fallecidos'),
+    ]
+
+    operations = [
+        migrations.RunPython(forward_dedupe, migrations.RunPython.noop),
+        migrations.RunPython(migrations.RunPython.noop, reconstruir_busqueda),
+        migrations.AddConstraint(
+            model_name='hptrakcare',
+            constraint=models.UniqueConstraint(fields=('run', 'cod_registro'), name='hptrakcare_run_cod_registro_uniq'),
+        ),
+        migrations.RunPython(reconstruir_busqueda, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,85 @@
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+from ._busqueda_fts import reconstruir_fts_sqlite
+
+
+# Columnas de api_hptrakcare indexadas en este punto del historial (0027)
+HPTRAKCARE_FTS_COLUMNS = ("run", "nombre", "ap_paterno", "ap_materno", "cod_registro")
+
+
+def forward_snapshot_inicial(apps, schema_editor):
+    TrakcareSnapshot = apps.get_model("api", "TrakcareSnapshot")
+    HpTrakcare = apps.get_model("api", "HpTrakcare")
+
+    # Los registros existentes pasan a ser la versión activa
+    snapshot = TrakcareSnapshot.objects.create(
+        estado="ACTIVO",
+        registros=HpTrakcare.objects.count(),
+        activado_el=django.utils.timezone.now(),
+    )
+    HpTrakcare.objects.update(snapshot=snapshot)
+
+
+def reconstruir_busqueda(apps, schema_editor):
+    # Las operaciones sobre api_hptrakcare reconstruyen la tabla en SQLite y borran los triggers FTS
+    reconstruir_fts_sqlite(schema_editor, "api_hptrakcare", HPTRAKCARE_FTS_COLUMNS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0029_hptrakcare_run_cod_registro_uniq'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrakcareSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(choices=[('CARGANDO', 'Cargando'), ('ACTIVO', 'Activo'), ('OBSOLETO', 'Obsoleto')], db_index=True, default='CARGANDO', max_length=10)),
+                ('registros', models.PositiveIntegerField(default=0)),
+                ('creado_el', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('activado_el', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Versión HP Trakcare',
+                'verbose_name_plural': 'Versiones HP Trakcare',
+                'ordering': ['-creado_el'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('estado', 'ACTIVO')), fields=('estado',), name='trakcaresnapshot_un_activo')],
+            },
+        ),
+        migrations.RunPython(migrations.RunPython.noop, reconstruir_busqueda),
+        migrations.AddField(
+            model_name='hptrakcare',
+            name='snapshot',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='registros_trakcare', to='api.trakcaresnapshot'),
+        ),
+        migrations.RunPython(forward_snapshot_inicial, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='hptrakcare',
+            name='snapshot',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='registros_trakcare', to='api.trakcaresnapshot'),
+        ),
+        migrations.RemoveConstraint(
+            model_name='hptrakcare',
+            name='hptrakcare_run_cod_registro_uniq',
+        ),
+        migrations.AddConstraint(
+            model_name='hptrakcare',
+            constraint=models.UniqueConstraint(fields=('snapshot', 'run', 'cod_registro'), name='hptrakcare_snapshot_run_cod_uniq'),
+        ),
+        migrations.AlterModelManagers(
+            name='hptrakcare',
+            managers=[
+                ('objects', models.Manager()),
+                ('todas_las_versiones', models.Manager()),
+            ],
+        ),
+        migrations.AlterModelOptions(
+            name='hptrakcare',
+            options={'base_manager_name': 'todas_las_versiones', 'ordering': ['run', 'nombre'], 'verbose_name': 'HP Trakcare', 'verbose_name_plural': 'HP Trakcare'},
+        ),
+        migrations.RunPython(reconstruir_busqueda, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0030_trakcare_snapshots'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hptrakcare',
+            index=models.Index(fields=['snapshot', 'cod_familia'], name='hptrakcare_familia_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0031_hptrakcare_familia_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='historialcarga',
+            index=models.Index(fields=['fecha_corte', '-fecha_carga'], name='historial_fecha_corte_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hptrakcare',
+            index=models.Index(fields=['snapshot', 'fecha_incorporacion'], name='hptrakcare_incorp_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0032_indices_periodo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trabajocarga',
+            name='intentos',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='trabajocarga',
+            name='latido_el',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0033_trabajo_latido'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sesioncargacorte',
+            name='estado',
+            field=models.CharField(choices=[('ABIERTA', 'Abierta'), ('FINALIZADA', 'Finalizada'), ('EXPIRADA', 'Expirada')], db_index=True, default='ABIERTA', max_length=20),
+        ),
+    ]
@@ -0,0 +1,57 @@
+"""
+Tablas FTS5 de búsqueda en SQLite para las migraciones (ver 0027_busqueda_indices).
+
+Las migraciones que reconstruyen una tabla indexada (AddConstraint, AddField con
+FK, etc.) borran en SQLite sus triggers y deben llamar a `reconstruir_fts_sqlite`
+con las columnas indexadas en ese punto del historial. Este módulo no importa
+código de la aplicación: una migración ya aplicada debe reproducirse igual aunque
+los modelos o api/busqueda.py cambien después. El prefijo "_" evita que Django lo
+cargue como migración.
+"""
+
+
+def _sqlite_fts_disponible(connection) -> bool:
+    # El tokenizador trigram existe desde SQLite 3.34
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5'), sqlite_version()")
+        fts5, version = cursor.fetchone()
+    return bool(fts5) and tuple(int(part) for part in version.split(".")[:2]) >= (3, 34)
+
+
+def reconstruir_fts_sqlite(schema_editor, table, columns):
+    """
+    Vuelve a crear la tabla FTS5 `<table>_fts` sobre `columns`, con los mismos
+    triggers de 0027_busqueda_indices, y reindexa sus filas. En otros motores no
+    hace nada.
+    """
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    fts = f"{table}_fts"
+    for suffix in ("ai", "ad", "au"):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {fts}")
+    if not _sqlite_fts_disponible(schema_editor.connection):
+        return
+
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+        f"{column_list}, content='{table}', content_rowid='id', tokenize='trigram')"
+    )
+    schema_editor.execute(
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+    )
+    schema_editor.execute(
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END"
+    )
+    schema_editor.execute(
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {column_list} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+    )
+    schema_editor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
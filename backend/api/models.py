@@ -83,6 +83,39 @@ def normalize_motivo(value: Optional[str]) -> str:
 	return normalized.strip()
 
 
+# Solo los 3 motivos que realmente aparecen en el sistema
+NON_VALIDATED_MOTIVOS = {
+	"TRASLADO NEGATIVO",
+	"RECHAZADO PREVISIONAL",
+	"RECHAZADO FALLECIDO",
+}
+
+ESTADO_VALIDACION_CHOICES = [
+	("VALIDADO", "Validado"),
+	("NO_VALIDADO", "No validado"),
+	("FALLECIDO", "Fallecido"),
+]
+
+
+def classify_estado_validacion(aceptado_rechazado: Optional[str], motivo_normalizado: Optional[str]) -> str:
+	"""
+	Clasifica un registro del corte FONASA según su aceptación y motivo normalizado.
+
+	- Motivo con "FALLECIDO" -> FALLECIDO
+	- aceptadoRechazado con "RECHAZADO" o "RECHAZO" (p. ej. "INGRESO RECHAZO
+	  SIMULTÁNEO"), o motivo en NON_VALIDATED_MOTIVOS -> NO_VALIDADO
+	- En otro caso ("ACEPTADO" o sin indicación clara) -> VALIDADO
+	"""
+	aceptado_upper = (aceptado_rechazado or "").upper()
+	motivo_upper = (motivo_normalizado or "").upper()
+
+	if "FALLECIDO" in motivo_upper:
+		return "FALLECIDO"
+	if "RECHAZADO" in aceptado_upper or "RECHAZO" in aceptado_upper or motivo_upper in NON_VALIDATED_MOTIVOS:
+		return "NO_VALIDADO"
+	return "VALIDADO"
+
+
 # =============================================================================
 # MODELOS DE CATÁLOGOS SIMPLIFICADOS
 # =============================================================================
@@ -227,6 +260,13 @@ class CorteFonasa(models.Model):
 	)
 	motivo = models.CharField(max_length=255, blank=True)
 	motivo_normalizado = models.CharField(max_length=255, blank=True, default="", db_index=True)
+	# Clasificación persistida (ver classify_estado_validacion) para filtrar y contar por igualdad
+	estado_validacion = models.CharField(
+		max_length=12,
+		choices=ESTADO_VALIDACION_CHOICES,
+		default="VALIDADO",
+		db_index=True,
+	)
 	creado_el = models.DateTimeField(default=timezone.now, editable=False)
 
 	class Meta:
@@ -238,13 +278,21 @@ class CorteFonasa(models.Model):
 			models.Index(fields=['run', 'fecha_corte']),
 			models.Index(fields=['fecha_corte', 'motivo_normalizado']),
 			models.Index(fields=['-fecha_corte', 'centro_salud']),
+			# Paginación por cursor del listado (fecha_corte desc, run, id)
+			models.Index(fields=['-fecha_corte', 'run', 'id']),
+			models.Index(fields=['fecha_corte', 'nombre_centro', 'estado_validacion']),
 		]
 
 	def save(self, *args, **kwargs):
 		self.run = normalize_run(self.run)
 		self.motivo_normalizado = normalize_motivo(self.motivo)
+		self.estado_validacion = classify_estado_validacion(self.aceptado_rechazado, self.motivo_normalizado)
 		super().save(*args, **kwargs)
 
+	@property
+	def is_validated(self) -> bool:
+		return self.estado_validacion == "VALIDADO"
+
 	@property
 	def nombre_completo(self) -> str:
 		"""Retorna el nombre completo del usuario."""
@@ -255,8 +303,171 @@ class CorteFonasa(models.Model):
 		return f"CorteFonasa({self.run} @ {self.fecha_corte:%Y-%m})"
 
 
+class CorteFonasaDelta(models.Model):
+	"""
+	Diferencias de un corte respecto del corte cargado anterior, por RUN.
+	Se calcula al cargar o eliminar un mes (ver _refresh_corte_deltas).
+	"""
+	TIPO_CHOICES = [
+		('ALTA', 'Alta'),
+		('BAJA', 'Baja'),
+		('CAMBIO', 'Cambio'),
+	]
+
+	periodo_anio = models.PositiveSmallIntegerField()
+	periodo_mes = models.PositiveSmallIntegerField(validators=[MinValueValidator(1), MaxValueValidator(12)])
+	anterior_anio = models.PositiveSmallIntegerField()
+	anterior_mes = models.PositiveSmallIntegerField(validators=[MinValueValidator(1), MaxValueValidator(12)])
+	run = models.CharField(max_length=12)
+	tipo = models.CharField(max_length=10, choices=TIPO_CHOICES)
+	nombre = models.CharField(max_length=800, blank=True)
+
+	tramo_anterior = models.CharField(max_length=50, blank=True)
+	tramo_actual = models.CharField(max_length=50, blank=True)
+	centro_anterior = models.CharField(max_length=255, blank=True)
+	centro_actual = models.CharField(max_length=255, blank=True)
+	motivo_anterior = models.CharField(max_length=255, blank=True)
+	motivo_actual = models.CharField(max_length=255, blank=True)
+
+	cambio_tramo = models.BooleanField(default=False)
+	cambio_centro = models.BooleanField(default=False)
+	cambio_motivo = models.BooleanField(default=False)
+
+	class Meta:
+		ordering = ["-periodo_anio", "-periodo_mes", "tipo", "run"]
+		verbose_name = 'Delta de Corte FONASA'
+		verbose_name_plural = 'Deltas de Corte FONASA'
+		indexes = [
+			models.Index(fields=['periodo_anio', 'periodo_mes', 'tipo', 'run']),
+		]
+
+	def __str__(self) -> str:
+		return f"CorteFonasaDelta({self.run} {self.tipo} @ {self.periodo_anio}-{self.periodo_mes:02d})"
+
+
+class CorteFonasaStaging(models.Model):
+	"""
+	Tabla de preparación para las cargas del corte en modo reemplazo.
+	Los registros de una carga se insertan y validan aquí, y luego se traspasan
+	a CorteFonasa en una transacción corta que reemplaza los meses completos.
+	"""
+	carga = models.UUIDField(db_index=True)
+	run = models.CharField(max_length=12)
+	nombres = models.CharField(max_length=255, blank=True)
+	ap_paterno = models.CharField(max_length=255, blank=True)
+	ap_materno = models.CharField(max_length=255, blank=True)
+	fecha_nacimiento = models.DateField(null=True, blank=True)
+	genero = models.CharField(max_length=20, blank=True)
+	tramo = models.CharField(max_length=50, blank=True)
+	fecha_corte = models.DateField()
+	nombre_centro = models.CharField(max_length=255, blank=True)
+	centro_de_procedencia = models.CharField(max_length=255, blank=True)
+	comuna_de_procedencia = models.CharField(max_length=100, blank=True)
+	nombre_centro_actual = models.CharField(max_length=255, blank=True)
+	centro_actual = models.CharField(max_length=255, blank=True)
+	comuna_actual = models.CharField(max_length=100, blank=True)
+	aceptado_rechazado = models.CharField(max_length=255, blank=True, default='')
+	motivo = models.CharField(max_length=255, blank=True)
+	motivo_normalizado = models.CharField(max_length=255, blank=True, default="")
+	estado_validacion = models.CharField(max_length=12, choices=ESTADO_VALIDACION_CHOICES, default="VALIDADO")
+	creado_el = models.DateTimeField(default=timezone.now, editable=False)
+
+	class Meta:
+		verbose_name = 'Corte FONASA (preparación)'
+		verbose_name_plural = 'Cortes FONASA (preparación)'
+
+	def __str__(self) -> str:
+		return f"CorteFonasaStaging({self.carga} - {self.run})"
+
+
+class CorteMonthlyStats(models.Model):
+	"""
+	Totales del corte FONASA por mes, centro y estado de validación.
+	Se recalculan dentro de la misma transacción de cada carga, reemplazo o
+	eliminación de registros, para no recorrer CorteFonasa al consultar totales.
+	"""
+	periodo_anio = models.PositiveSmallIntegerField()
+	periodo_mes = models.PositiveSmallIntegerField(
+		validators=[MinValueValidator(1), MaxValueValidator(12)]
+	)
+	nombre_centro = models.CharField(max_length=255, blank=True)
+	total = models.PositiveIntegerField(default=0)
+	validados = models.PositiveIntegerField(default=0)
+	no_validados = models.PositiveIntegerField(default=0)
+	# Subconjunto de no_validados con estado FALLECIDO
+	fallecidos = models.PositiveIntegerField(default=0)
+	actualizado_el = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		ordering = ["-periodo_anio", "-periodo_mes", "nombre_centro"]
+		unique_together = ("periodo_anio", "periodo_mes", "nombre_centro")
+		indexes = [
+			# Series mensuales de un centro (dashboard)
+			models.Index(fields=["nombre_centro", "-periodo_anio", "-periodo_mes"], name="cortestats_centro_mes_idx"),
+		]
+		verbose_name = 'Estadística mensual de corte'
+		verbose_name_plural = 'Estadísticas mensuales de corte'
+
+	def __str__(self) -> str:
+		return f"CorteMonthlyStats({self.periodo_anio}-{self.periodo_mes:02d} {self.nombre_centro or 'SIN CENTRO'})"
+
+
+class TrakcareSnapshot(models.Model):
+	"""
+	Versión completa de HP Trakcare. Una carga con reemplazo escribe una versión
+	nueva (CARGANDO) y al terminar la activa; las consultas solo ven la versión
+	ACTIVA, y las OBSOLETAS se eliminan en segundo plano (ver api/snapshots.py).
+	"""
+	ESTADO_CHOICES = [
+		('CARGANDO', 'Cargando'),
+		('ACTIVO', 'Activo'),
+		('OBSOLETO', 'Obsoleto'),
+	]
+
+	estado = models.CharField(max_length=10, choices=ESTADO_CHOICES, default='CARGANDO', db_index=True)
+	registros = models.PositiveIntegerField(default=0)
+	creado_el = models.DateTimeField(default=timezone.now, editable=False)
+	activado_el = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		ordering = ['-creado_el']
+		verbose_name = 'Versión HP Trakcare'
+		verbose_name_plural = 'Versiones HP Trakcare'
+		constraints = [
+			models.UniqueConstraint(
+				fields=['estado'],
+				condition=models.Q(estado='ACTIVO'),
+				name='trakcaresnapshot_un_activo',
+			),
+		]
+
+	def __str__(self) -> str:
+		return f"TrakcareSnapshot(#{self.pk} {self.estado})"
+
+
+class HpTrakcareActivoManager(models.Manager):
+	"""Filas de la versión activa de HP Trakcare, resuelta en la misma consulta."""
+
+	def get_queryset(self):
+		activo = TrakcareSnapshot.objects.filter(estado='ACTIVO').values('id')[:1]
+		return super().get_queryset().filter(snapshot_id=models.Subquery(activo))
+
+	def de_snapshot(self, snapshot_id):
+		"""
+		Filas de una versión ya resuelta (ver snapshots.snapshot_activo_id). Las
+		vistas que hacen varias consultas la resuelven una vez por petición, para
+		no mezclar versiones si otra carga se activa entre una consulta y otra.
+		"""
+		return super().get_queryset().filter(snapshot_id=snapshot_id)
+
+
 class HpTrakcare(models.Model):
 	"""Registro de usuarios en sistema HP Trakcare."""
+	snapshot = models.ForeignKey(
+		TrakcareSnapshot,
+		on_delete=models.PROTECT,
+		related_name='registros_trakcare',
+	)
 	cod_familia = models.CharField(max_length=100, blank=True)
 	relacion_parentezco = models.CharField(max_length=100, blank=True)
 	id_trakcare = models.CharField(max_length=100, blank=True, db_index=True)
@@ -319,7 +530,12 @@ class HpTrakcare(models.Model):
 	fecha_defuncion = models.DateField(null=True, blank=True, db_index=True)
 	creado_el = models.DateTimeField(default=timezone.now, editable=False)
 
+	# Solo la versión activa; `todas_las_versiones` incluye las que se cargan o eliminan
+	objects = HpTrakcareActivoManager()
+	todas_las_versiones = models.Manager()
+
 	class Meta:
+		base_manager_name = 'todas_las_versiones'
 		ordering = ["run", "nombre"]
 		verbose_name = 'HP Trakcare'
 		verbose_name_plural = 'HP Trakcare'
@@ -327,6 +543,14 @@ class HpTrakcare(models.Model):
 			models.Index(fields=['run', 'fecha_defuncion']),
 			models.Index(fields=['id_trakcare']),
 			models.Index(fields=['sector', 'run']),
+			# Miembros de una familia (buscar_familia)
+			models.Index(fields=['snapshot', 'cod_familia'], name='hptrakcare_familia_idx'),
+			# Filtro por mes de incorporación como rango de fechas sobre la versión activa
+			models.Index(fields=['snapshot', 'fecha_incorporacion'], name='hptrakcare_incorp_idx'),
+		]
+		constraints = [
+			# Clave de la carga masiva (INSERT ... ON CONFLICT)
+			models.UniqueConstraint(fields=['snapshot', 'run', 'cod_registro'], name='hptrakcare_snapshot_run_cod_uniq'),
 		]
 
 	def save(self, *args, **kwargs):
@@ -594,6 +818,10 @@ class HistorialCarga(models.Model):
 	errores = models.JSONField(default=list, blank=True)  # Lista de errores encontrados
 	tiempo_procesamiento = models.FloatField(null=True, blank=True, help_text="Tiempo en segundos")
 	
+	# Avance de cargas ejecutadas en segundo plano
+	filas_procesadas = models.PositiveIntegerField(default=0)
+	etapas = models.JSONField(default=dict, blank=True)  # Tiempo en segundos por etapa
+	
 	# Metadatos del sistema
 	ip_address = models.GenericIPAddressField(null=True, blank=True)
 
@@ -605,6 +833,8 @@ class HistorialCarga(models.Model):
 			models.Index(fields=['tipo_carga', '-fecha_carga']),
 			models.Index(fields=['usuario', '-fecha_carga']),
 			models.Index(fields=['periodo_anio', 'periodo_mes']),
+			# Segunda rama del filtro por periodo (periodo_anio/mes OR rango de fecha_corte)
+			models.Index(fields=['fecha_corte', '-fecha_carga'], name='historial_fecha_corte_idx'),
 			models.Index(fields=['estado', '-fecha_carga']),
 		]
 
@@ -637,6 +867,104 @@ class HistorialCarga(models.Model):
 		return f"HistorialCarga({self.get_tipo_carga_display()} - {self.usuario} - {self.fecha_carga:%Y-%m-%d %H:%M})"
 
 
+class TrabajoCarga(models.Model):
+	"""
+	Trabajo de ingesta ejecutado en segundo plano (Corte FONASA o HP Trakcare).
+	La solicitud de carga solo encola el trabajo; el avance y el resultado final
+	quedan en el HistorialCarga asociado.
+	"""
+	ESTADO_CHOICES = [
+		('PENDIENTE', 'Pendiente'),
+		('EN_PROCESO', 'En Proceso'),
+		('EXITOSO', 'Exitoso'),
+		('ERROR', 'Error'),
+	]
+
+	tipo_carga = models.CharField(max_length=20, choices=HistorialCarga.TIPO_CHOICES, db_index=True)
+	estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='PENDIENTE', db_index=True)
+	historial = models.OneToOneField(HistorialCarga, on_delete=models.CASCADE, related_name='trabajo')
+
+	# Datos de entrada: registros ya validados (JSON) o el archivo original
+	registros = models.JSONField(null=True, blank=True)
+	archivo = models.FileField(upload_to='cargas/', blank=True)
+	reemplazo = models.BooleanField(default=False)
+
+	# Resultado
+	resultado = models.JSONField(default=dict, blank=True)
+	error = models.TextField(blank=True)
+
+	creado_el = models.DateTimeField(default=timezone.now, db_index=True)
+	iniciado_el = models.DateTimeField(null=True, blank=True)
+	finalizado_el = models.DateTimeField(null=True, blank=True)
+	# Se actualiza con cada lote: un trabajo EN_PROCESO sin latido reciente quedó abandonado
+	latido_el = models.DateTimeField(null=True, blank=True)
+	intentos = models.PositiveSmallIntegerField(default=0)
+
+	class Meta:
+		ordering = ["-creado_el"]
+		verbose_name = 'Trabajo de Carga'
+		verbose_name_plural = 'Trabajos de Carga'
+		indexes = [
+			models.Index(fields=['estado', 'creado_el']),
+		]
+
+	def __str__(self) -> str:
+		return f"TrabajoCarga({self.get_tipo_carga_display()} - {self.estado} - #{self.pk})"
+
+
+class SesionCargaCorte(models.Model):
+	"""
+	Sesión de carga del corte FONASA en chunks numerados.
+	Cada chunk se aplica una sola vez por sesión, por lo que el cliente puede
+	reintentar o reanudar la carga sin duplicar registros.
+	"""
+	ESTADO_CHOICES = [
+		('ABIERTA', 'Abierta'),
+		('FINALIZADA', 'Finalizada'),
+		('EXPIRADA', 'Expirada'),  # Sin actividad: sus registros preparados se descartaron
+	]
+
+	token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+	estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='ABIERTA', db_index=True)
+	nombre_archivo = models.CharField(max_length=500, blank=True)
+	usuario = models.CharField(max_length=255, blank=True)
+	reemplazo = models.BooleanField(default=False)
+	meses_reemplazados = models.JSONField(default=list, blank=True)  # ["2024-10", ...]
+	total_chunks = models.PositiveIntegerField(null=True, blank=True)
+	creado_el = models.DateTimeField(default=timezone.now)
+	finalizado_el = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		ordering = ["-creado_el"]
+		verbose_name = 'Sesión de Carga de Corte'
+		verbose_name_plural = 'Sesiones de Carga de Corte'
+
+	def __str__(self) -> str:
+		return f"SesionCargaCorte({self.token} - {self.estado})"
+
+
+class ChunkCargaCorte(models.Model):
+	"""Chunk ya aplicado dentro de una sesión de carga del corte."""
+	sesion = models.ForeignKey(SesionCargaCorte, on_delete=models.CASCADE, related_name='chunks')
+	numero = models.PositiveIntegerField()
+	hash = models.CharField(max_length=64)  # SHA-256 del contenido del chunk
+	total_registros = models.PositiveIntegerField(default=0)
+	registros_creados = models.PositiveIntegerField(default=0)
+	registros_invalidos = models.PositiveIntegerField(default=0)
+	errores = models.JSONField(default=list, blank=True)
+	meses = models.JSONField(default=list, blank=True)  # ["2024-10", ...] presentes en el chunk
+	recibido_el = models.DateTimeField(default=timezone.now)
+
+	class Meta:
+		ordering = ["sesion", "numero"]
+		unique_together = ("sesion", "numero")
+		verbose_name = 'Chunk de Carga de Corte'
+		verbose_name_plural = 'Chunks de Carga de Corte'
+
+	def __str__(self) -> str:
+		return f"ChunkCargaCorte({self.sesion_id} - #{self.numero})"
+
+
 # =============================================================================
 # MODELO DE USUARIOS
 # =============================================================================
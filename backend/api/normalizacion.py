@@ -0,0 +1,366 @@
+"""
+Normalización de registros de carga (Corte FONASA, HP Trakcare y nuevos usuarios).
+
+Las funciones de este módulo no tocan la base de datos: reciben los registros ya
+validados por los serializers y retornan tuplas listas para insertar (None para
+los registros inválidos), en el mismo orden de entrada.
+
+Para cargas grandes, a partir de NORMALIZACION_MIN_FILAS registros en total, el
+trabajo se reparte entre NORMALIZACION_WORKERS procesos con un ProcessPoolExecutor.
+Las cargas que se insertan por lotes (archivos, trabajos en segundo plano) usan
+las funciones *_por_lotes: cada lote se normaliza en un proceso mientras el
+proceso web inserta el anterior.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from functools import lru_cache
+import math
+import multiprocessing
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from django.conf import settings
+
+
+DATE_FORMATS = ("%Y-%m-%d", "%d-%m-%Y", "%Y/%m/%d", "%d/%m/%Y")
+
+# Orden de las columnas en las tuplas retornadas por normalizar_cortes
+CORTE_FIELDS = (
+    "run",
+    "fecha_corte",
+    "nombres",
+    "ap_paterno",
+    "ap_materno",
+    "fecha_nacimiento",
+    "genero",
+    "tramo",
+    "nombre_centro",
+    "centro_de_procedencia",
+    "comuna_de_procedencia",
+    "nombre_centro_actual",
+    "centro_actual",
+    "comuna_actual",
+    "aceptado_rechazado",
+    "motivo",
+    "motivo_normalizado",
+    "estado_validacion",
+)
+
+
+def _safe_str(value, *, max_length: int | None = None) -> str:
+    text = "" if value is None else str(value).strip()
+    if max_length is not None:
+        return text[:max_length]
+    return text
+
+
+@lru_cache(maxsize=8192)
+def _parse_date_text(text: str) -> date | None:
+    # Camino rápido para el formato ISO, el más común en los archivos
+    if len(text) == 10 and text[4] == "-" and text[7] == "-":
+        try:
+            return date.fromisoformat(text)
+        except ValueError:
+            pass
+
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_date(value: str | None) -> date | None:
+    if not value:
+        return None
+
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not isinstance(value, str):
+        return None
+
+    return _parse_date_text(value.strip())
+
+
+def _parse_int(value: str | None) -> int | None:
+    if value in (None, ""):
+        return None
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+# -----------------------------------------------------------------------------
+# Normalizadores por lote (se ejecutan en el proceso web o en los procesos hijos)
+# -----------------------------------------------------------------------------
+
+def _normalizar_lote_corte(lote: Sequence[Tuple[Dict[str, str], date | None]]) -> List[tuple | None]:
+    from .models import classify_estado_validacion, normalize_motivo, normalize_run
+
+    resultado: List[tuple | None] = []
+    for record, fecha_corte in lote:
+        run = normalize_run(record.get("run")) if fecha_corte else ""
+        if not run:
+            resultado.append(None)
+            continue
+
+        aceptado_rechazado = _safe_str(record.get("aceptadoRechazado"), max_length=255)
+        motivo = _safe_str(record.get("motivo"))
+        motivo_normalizado = normalize_motivo(motivo)
+        resultado.append(
+            (
+                run,
+                fecha_corte,
+                _safe_str(record.get("nombres")),
+                _safe_str(record.get("apPaterno")),
+                _safe_str(record.get("apMaterno")),
+                _parse_date(record.get("fechaNacimiento")),
+                _safe_str(record.get("genero")),
+                _safe_str(record.get("tramo")),
+                _safe_str(record.get("nombreCentro")),
+                _safe_str(record.get("centroDeProcedencia")),
+                _safe_str(record.get("comunaDeProcedencia")),
+                _safe_str(record.get("nombreCentroActual")),
+                _safe_str(record.get("centroActual")),
+                _safe_str(record.get("comunaActual")),
+                aceptado_rechazado,
+                motivo,
+                motivo_normalizado,
+                classify_estado_validacion(aceptado_rechazado, motivo_normalizado),
+            )
+        )
+    return resultado
+
+
+def _normalizar_lote_trakcare(lote: Sequence[Tuple[int, Dict[str, str]]]) -> List[tuple | None]:
+    from .models import normalize_run
+
+    resultado: List[tuple | None] = []
+    for index, record in lote:
+        run_clean = normalize_run(record.get("RUN") or record.get("run"))
+        if not run_clean:
+            resultado.append(None)
+            continue
+
+        cod_registro = _safe_str(record.get("codRegistro"))
+        if not cod_registro:
+            cod_registro = _safe_str(record.get("idTrakcare"))
+        if not cod_registro:
+            cod_registro = f"{run_clean}-{index}"
+
+        defaults = {
+            "cod_familia": _safe_str(record.get("codFamilia")),
+            "relacion_parentezco": _safe_str(record.get("relacionParentezco")),
+            "id_trakcare": _safe_str(record.get("idTrakcare")),
+            "etnia": _safe_str(record.get("etnia")),
+            "nacionalidad": _safe_str(record.get("nacionalidad")),
+            "ap_paterno": _safe_str(record.get("apPaterno")),
+            "ap_materno": _safe_str(record.get("apMaterno")),
+            "nombre": _safe_str(record.get("nombre")),
+            "genero": _safe_str(record.get("genero")),
+            "fecha_nacimiento": _parse_date(record.get("fechaNacimiento")),
+            "edad": _parse_int(record.get("edad")),
+            "direccion": _safe_str(record.get("direccion")),
+            "telefono": _safe_str(record.get("telefono")),
+            "telefono_celular": _safe_str(record.get("telefonoCelular")),
+            "telefono_recado": _safe_str(record.get("TelefonoRecado")),
+            "servicio_salud": _safe_str(record.get("servicioSalud")),
+            "centro_inscripcion": _safe_str(record.get("centroInscripcion")),
+            "sector": _safe_str(record.get("sector")),
+            "prevision": _safe_str(record.get("prevision")),
+            "plan_trakcare": _safe_str(record.get("planTrakcare")),
+            "prais_trakcare": _safe_str(record.get("praisTrakcare")),
+            "fecha_incorporacion": _parse_date(record.get("fechaIncorporacion")),
+            "fecha_ultima_modif": _parse_date(record.get("fechaUltimaModif")),
+            "fecha_defuncion": _parse_date(record.get("fechaDefuncion")),
+        }
+        resultado.append((run_clean, cod_registro, defaults))
+    return resultado
+
+
+def _normalizar_lote_nuevos_usuarios(lote: Sequence[Dict[str, str]]) -> List[tuple | None]:
+    from .models import normalize_run
+
+    resultado: List[tuple | None] = []
+    for record in lote:
+        run_clean = normalize_run(record.get("run"))
+        fecha_inscripcion = _parse_date(record.get("fecha"))
+        if not run_clean or not fecha_inscripcion:
+            resultado.append(None)
+            continue
+
+        defaults = {
+            "nombres": _safe_str(record.get("nombres")),
+            "apellido_paterno": _safe_str(record.get("apellidoPaterno")),
+            "apellido_materno": _safe_str(record.get("apellidoMaterno")),
+            "fecha_inscripcion": fecha_inscripcion,
+            "periodo_mes": fecha_inscripcion.month,
+            "periodo_anio": fecha_inscripcion.year,
+            "codigo_percapita": _safe_str(record.get("codPercapita")),
+            "codigo_sector": _safe_str(record.get("codigoSector")),
+            "centro": _safe_str(record.get("centro")),
+            "observaciones": _safe_str(record.get("observaciones")),
+            "estado": _safe_str(record.get("estado")) or "PENDIENTE",
+        }
+        # Textos de catálogo: la vista los resuelve con CatalogoResolver
+        catalogos = {
+            "nacionalidad": _safe_str(record.get("nacionalidad")),
+            "etnia": _safe_str(record.get("etnia")),
+            "sector": _safe_str(record.get("sector")),
+            "subsector": _safe_str(record.get("subsector")),
+        }
+        resultado.append((run_clean, fecha_inscripcion, defaults, catalogos))
+    return resultado
+
+
+# -----------------------------------------------------------------------------
+# Reparto en procesos
+# -----------------------------------------------------------------------------
+
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _init_worker() -> None:
+    # Los procesos hijos parten sin Django configurado ("spawn")
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # "spawn" evita heredar hilos y conexiones abiertas del proceso web
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def _config_pool() -> Tuple[int, int]:
+    return (
+        int(getattr(settings, "NORMALIZACION_WORKERS", 0)),
+        int(getattr(settings, "NORMALIZACION_MIN_FILAS", 20000)),
+    )
+
+
+def _normalizar(funcion: Callable[[Sequence], List], registros: Sequence, total_carga: int | None = None) -> List:
+    """
+    Normaliza `registros` repartiéndolos entre los procesos si la carga completa
+    (`total_carga`, por defecto solo estos registros) alcanza NORMALIZACION_MIN_FILAS.
+    """
+    workers, min_filas = _config_pool()
+    if workers <= 1 or max(total_carga or 0, len(registros)) < min_filas:
+        return funcion(registros)
+
+    # Varios lotes por proceso para repartir mejor la carga
+    tamano = math.ceil(len(registros) / (workers * 4))
+    lotes = [registros[inicio : inicio + tamano] for inicio in range(0, len(registros), tamano)]
+
+    resultado: List = []
+    for parcial in _get_pool(workers).map(funcion, lotes):
+        resultado.extend(parcial)
+    return resultado
+
+
+def _normalizar_por_lotes(
+    funcion: Callable[[Sequence], List],
+    lotes: Iterable[Tuple[object, Sequence]],
+    total_carga: int | None,
+) -> Iterator[Tuple[object, List]]:
+    """
+    Normaliza en orden los lotes (clave, items) de una misma carga y entrega
+    (clave, valores). Si la carga alcanza NORMALIZACION_MIN_FILAS (`total_carga`
+    o, si no se conoce, las filas leídas hasta el momento), cada lote se envía
+    completo al pool y se mantienen hasta NORMALIZACION_WORKERS en curso: se
+    normalizan mientras quien consume inserta los anteriores.
+    """
+    workers, min_filas = _config_pool()
+    usar_pool = workers > 1 and total_carga is not None and total_carga >= min_filas
+    pendientes: deque = deque()
+    leidas = 0
+
+    for clave, items in lotes:
+        leidas += len(items)
+        if workers > 1 and total_carga is None and leidas >= min_filas:
+            usar_pool = True
+        if not usar_pool:
+            yield clave, funcion(items)
+            continue
+        if len(items) >= min_filas:
+            # Un lote que por sí solo es grande se reparte entre todos los procesos
+            while pendientes:
+                clave_lista, futuro = pendientes.popleft()
+                yield clave_lista, futuro.result()
+            yield clave, _normalizar(funcion, items)
+            continue
+
+        pendientes.append((clave, _get_pool(workers).submit(funcion, items)))
+        if len(pendientes) > workers:
+            clave_lista, futuro = pendientes.popleft()
+            yield clave_lista, futuro.result()
+
+    while pendientes:
+        clave_lista, futuro = pendientes.popleft()
+        yield clave_lista, futuro.result()
+
+
+def normalizar_cortes(
+    prepared_records: Sequence[Tuple[Dict[str, str], date | None]],
+    *,
+    total_carga: int | None = None,
+) -> List[tuple | None]:
+    """
+    Retorna una tupla por registro con los valores de CORTE_FIELDS, o None si es
+    inválido. `total_carga` es el tamaño de la carga completa cuando estos
+    registros son solo una parte (p. ej. un chunk de una sesión).
+    """
+    return _normalizar(_normalizar_lote_corte, list(prepared_records), total_carga)
+
+
+def normalizar_cortes_por_lotes(
+    batches: Iterable[List[Tuple[Dict[str, str], date | None]]],
+    *,
+    total_carga: int | None = None,
+) -> Iterator[Tuple[List[Tuple[Dict[str, str], date | None]], List[tuple | None]]]:
+    """Entrega (lote, valores de normalizar_cortes) por cada lote, en orden."""
+    return _normalizar_por_lotes(_normalizar_lote_corte, ((batch, batch) for batch in batches), total_carga)
+
+
+def normalizar_trakcare(records: Sequence[Dict[str, str]], *, start_index: int = 0) -> List[tuple | None]:
+    """Retorna (run, cod_registro, defaults) por registro, o None si el RUN es inválido."""
+    return _normalizar(_normalizar_lote_trakcare, list(enumerate(records, start=start_index)))
+
+
+def normalizar_trakcare_por_lotes(
+    batches: Iterable[Tuple[int, Sequence[Dict[str, str]]]],
+    *,
+    total_carga: int | None = None,
+) -> Iterator[Tuple[Tuple[int, Sequence[Dict[str, str]]], List[tuple | None]]]:
+    """Entrega ((inicio, lote), valores de normalizar_trakcare) por cada lote, en orden."""
+    return _normalizar_por_lotes(
+        _normalizar_lote_trakcare,
+        (((inicio, batch), list(enumerate(batch, start=inicio))) for inicio, batch in batches),
+        total_carga,
+    )
+
+
+def normalizar_nuevos_usuarios(records: Sequence[Dict[str, str]]) -> List[tuple | None]:
+    """Retorna (run, fecha_inscripcion, defaults, catalogos) por registro, o None si es inválido."""
+    return _normalizar(_normalizar_lote_nuevos_usuarios, list(records))
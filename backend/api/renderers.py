@@ -0,0 +1,39 @@
+from rest_framework.renderers import JSONRenderer
+
+
+class NDJSONRenderer(JSONRenderer):
+    """
+    Permite negociar `Accept: application/x-ndjson` en los listados que se
+    transmiten por streaming. Las respuestas no transmitidas (errores, páginas)
+    se entregan como un único objeto JSON en una línea.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(data, accepted_media_type, renderer_context) + b"\n"
+
+
+class _ExportFormatRenderer(JSONRenderer):
+    """
+    DRF usa el parámetro `?format=` para elegir el renderer. Estas clases hacen
+    que las vistas de exportación acepten format=csv|xlsx|parquet: el archivo se
+    entrega como respuesta Django propia y el renderer solo formatea los errores
+    como JSON.
+    """
+
+
+class CSVExportRenderer(_ExportFormatRenderer):
+    format = "csv"
+
+
+class XLSXExportRenderer(_ExportFormatRenderer):
+    format = "xlsx"
+
+
+class ParquetExportRenderer(_ExportFormatRenderer):
+    format = "parquet"
+
+
+EXPORT_RENDERERS = [JSONRenderer, CSVExportRenderer, XLSXExportRenderer, ParquetExportRenderer]
@@ -8,6 +8,7 @@ from .models import (
     NuevoUsuario,
     ValidacionCorte,
     HistorialCarga,
+    TrabajoCarga,
     Etnia,
     Nacionalidad,
     Sector,
@@ -631,6 +632,7 @@ class HistorialCargaSerializer(serializers.ModelSerializer):
     estadoDisplay = serializers.CharField(source="get_estado_display", read_only=True)
     tasaExito = serializers.FloatField(source="tasa_exito", read_only=True)
     tiempoProcesamiento = serializers.FloatField(source="tiempo_procesamiento", read_only=True)
+    filasProcesadas = serializers.IntegerField(source="filas_procesadas", read_only=True)
     validados = serializers.SerializerMethodField()
     noValidados = serializers.SerializerMethodField()
     totalPeriodo = serializers.SerializerMethodField()
@@ -663,6 +665,8 @@ class HistorialCargaSerializer(serializers.ModelSerializer):
             "observaciones",
             "tasaExito",
             "tiempoProcesamiento",
+            "filasProcesadas",
+            "etapas",
             "ip_address",
         ]
         read_only_fields = ("id",)
@@ -680,3 +684,46 @@ class HistorialCargaSerializer(serializers.ModelSerializer):
         return getattr(obj, "estado_carga", "NUEVO")
 
 
+class TrabajoCargaSerializer(serializers.ModelSerializer):
+    """Serializer de solo lectura para el seguimiento de trabajos de carga"""
+    tipoCarga = serializers.CharField(source="tipo_carga", read_only=True)
+    estadoDisplay = serializers.CharField(source="get_estado_display", read_only=True)
+    historialId = serializers.IntegerField(source="historial_id", read_only=True)
+    nombreArchivo = serializers.CharField(source="historial.nombre_archivo", read_only=True)
+    totalRegistros = serializers.IntegerField(source="historial.total_registros", read_only=True)
+    filasProcesadas = serializers.IntegerField(source="historial.filas_procesadas", read_only=True)
+    etapas = serializers.JSONField(source="historial.etapas", read_only=True)
+    progreso = serializers.SerializerMethodField()
+    creadoEl = serializers.DateTimeField(source="creado_el", read_only=True)
+    iniciadoEl = serializers.DateTimeField(source="iniciado_el", read_only=True)
+    finalizadoEl = serializers.DateTimeField(source="finalizado_el", read_only=True)
+
+    class Meta:
+        model = TrabajoCarga
+        fields = [
+            "id",
+            "tipoCarga",
+            "estado",
+            "estadoDisplay",
+            "historialId",
+            "nombreArchivo",
+            "totalRegistros",
+            "filasProcesadas",
+            "progreso",
+            "etapas",
+            "resultado",
+            "error",
+            "creadoEl",
+            "iniciadoEl",
+            "finalizadoEl",
+        ]
+        read_only_fields = fields
+
+    def get_progreso(self, obj) -> float | None:
+        """Porcentaje de avance; None si aún no se conoce el total (cargas desde archivo)."""
+        if obj.estado == "EXITOSO":
+            return 100.0
+        total = obj.historial.total_registros
+        if not total:
+            return None
+        return round(min(obj.historial.filas_procesadas / total, 1) * 100, 2)
@@ -0,0 +1,53 @@
+"""
+Versiones de caché para los cambios que no pasan por las vistas (admin, shell,
+scripts): cada save() de un modelo versionado llama a `bump_data_version`.
+
+Las cargas usan bulk_create y update(), que no envían señales, y ya suben la
+versión por su cuenta. post_delete solo se conecta para los catálogos: en
+CorteFonasa, HpTrakcare y NuevoUsuario un receptor de eliminación obligaría a
+QuerySet.delete() a cargar cada fila antes de borrarla. Sus eliminaciones desde
+el admin suben la versión en api/admin.py (VersionadoAdminMixin); las masivas
+desde el shell deben llamar a bump_data_version.
+"""
+
+from django.db.models.signals import post_delete, post_save
+
+from .cache_datos import bump_data_version
+from .models import (
+    CorteFonasa,
+    Establecimiento,
+    Etnia,
+    HpTrakcare,
+    Nacionalidad,
+    NuevoUsuario,
+    Sector,
+    Subsector,
+)
+
+
+# Modelo -> contador de cache_datos.TABLAS_VERSIONADAS
+TABLA_POR_MODELO = {
+    CorteFonasa: "corte",
+    HpTrakcare: "trakcare",
+    NuevoUsuario: "nuevos_usuarios",
+    Etnia: "catalogos",
+    Nacionalidad: "catalogos",
+    Sector: "catalogos",
+    Subsector: "catalogos",
+    Establecimiento: "catalogos",
+}
+
+
+def _bump_modelo(sender, **kwargs) -> None:
+    if kwargs.get("raw"):
+        # loaddata: los fixtures no pasan por la caché
+        return
+    bump_data_version(TABLA_POR_MODELO[sender])
+
+
+def conectar() -> None:
+    """Conecta los receptores; se llama desde ApiConfig.ready()."""
+    for model, tabla in TABLA_POR_MODELO.items():
+        post_save.connect(_bump_modelo, sender=model, dispatch_uid=f"bump_version_save_{model.__name__}")
+        if tabla == "catalogos":
+            post_delete.connect(_bump_modelo, sender=model, dispatch_uid=f"bump_version_delete_{model.__name__}")
@@ -0,0 +1,124 @@
+"""
+Versiones (snapshots) de HP Trakcare.
+
+Una carga con reemplazo no vacía la tabla: escribe sus filas en una versión nueva
+(CARGANDO), invisible para las consultas, y al terminar la activa en una sola
+transacción. `HpTrakcare.objects` filtra siempre por la versión ACTIVA, así que
+búsquedas y listados ven la versión anterior completa hasta ese momento. Las
+vistas que hacen varias consultas resuelven la versión una vez
+(`snapshot_activo_id`) y leen con `HpTrakcare.objects.de_snapshot(id)`.
+
+Las versiones reemplazadas quedan OBSOLETAS y `recolectar_snapshots` elimina sus
+filas por lotes en segundo plano (ver trabajos.programar_recoleccion_snapshots).
+"""
+
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache_datos import bump_data_version
+from .models import HpTrakcare, TrakcareSnapshot
+
+
+SNAPSHOT_GC_BATCH_SIZE = 5000
+
+# Una versión que sigue CARGANDO pasado este plazo se considera abandonada
+_CARGA_ABANDONADA = timedelta(days=1)
+
+
+def snapshot_activo() -> TrakcareSnapshot:
+    """Versión activa; si no existe (base de datos nueva) se crea vacía."""
+    snapshot = TrakcareSnapshot.objects.filter(estado="ACTIVO").first()
+    if snapshot is None:
+        try:
+            with transaction.atomic():
+                snapshot = TrakcareSnapshot.objects.create(estado="ACTIVO", activado_el=timezone.now())
+        except IntegrityError:
+            # Otra carga la creó al mismo tiempo
+            snapshot = TrakcareSnapshot.objects.get(estado="ACTIVO")
+    return snapshot
+
+
+def snapshot_activo_id() -> int | None:
+    return TrakcareSnapshot.objects.filter(estado="ACTIVO").values_list("id", flat=True).first()
+
+
+class SnapshotNoDisponible(Exception):
+    """La versión a activar ya no está CARGANDO (se descartó o se recolectó)."""
+
+
+def crear_snapshot() -> TrakcareSnapshot:
+    return TrakcareSnapshot.objects.create(estado="CARGANDO")
+
+
+def activar_snapshot(snapshot: TrakcareSnapshot) -> None:
+    """
+    Publica `snapshot` y deja obsoleta la versión activa anterior. Bloquea ambas
+    filas y, si `snapshot` ya no está CARGANDO, lanza SnapshotNoDisponible sin
+    tocar la versión activa.
+    """
+    from .trabajos import programar_recoleccion_snapshots
+
+    with transaction.atomic():
+        # Orden fijo de bloqueo: dos activaciones simultáneas se serializan
+        bloqueadas = {
+            fila.pk: fila
+            for fila in TrakcareSnapshot.objects.select_for_update()
+            .filter(Q(pk=snapshot.pk) | Q(estado="ACTIVO"))
+            .order_by("pk")
+        }
+        objetivo = bloqueadas.get(snapshot.pk)
+        if objetivo is None or objetivo.estado != "CARGANDO":
+            raise SnapshotNoDisponible(
+                f"La versión #{snapshot.pk} de HP Trakcare ya no está en carga "
+                f"({objetivo.estado if objetivo else 'eliminada'}); no se activa"
+            )
+
+        TrakcareSnapshot.objects.filter(estado="ACTIVO").update(estado="OBSOLETO")
+        TrakcareSnapshot.objects.filter(pk=snapshot.pk).update(
+            estado="ACTIVO",
+            activado_el=timezone.now(),
+            registros=HpTrakcare.todas_las_versiones.filter(snapshot=snapshot).count(),
+        )
+        bump_data_version("trakcare")
+        programar_recoleccion_snapshots()
+
+
+def descartar_snapshot(snapshot: TrakcareSnapshot) -> None:
+    """Marca como obsoleta una versión cuya carga falló, para que se recolecte."""
+    TrakcareSnapshot.objects.filter(pk=snapshot.pk, estado="CARGANDO").update(estado="OBSOLETO")
+
+
+def recolectar_snapshots(batch_size: int = SNAPSHOT_GC_BATCH_SIZE) -> int:
+    """
+    Elimina las filas de las versiones obsoletas (y de cargas abandonadas) en lotes
+    de `batch_size`, cada uno en su propia transacción, y luego la versión.
+    Retorna la cantidad de filas eliminadas.
+    """
+    pendientes = TrakcareSnapshot.objects.filter(
+        Q(estado="OBSOLETO") | Q(estado="CARGANDO", creado_el__lt=timezone.now() - _CARGA_ABANDONADA)
+    ).order_by("id")
+
+    eliminadas = 0
+    for snapshot in pendientes:
+        # Una carga abandonada se marca antes de borrar nada: si entretanto se
+        # activó (activar_snapshot la bloquea), no se toca
+        if snapshot.estado == "CARGANDO" and not TrakcareSnapshot.objects.filter(
+            pk=snapshot.pk, estado="CARGANDO"
+        ).update(estado="OBSOLETO"):
+            continue
+        while True:
+            ids = list(
+                HpTrakcare.todas_las_versiones.filter(snapshot=snapshot)
+                .order_by()
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                borradas, _ = HpTrakcare.todas_las_versiones.filter(id__in=ids).delete()
+            eliminadas += borradas
+        snapshot.delete()
+    return eliminadas
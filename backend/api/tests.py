@@ -1,3 +1,1376 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import csv
+from datetime import date, timedelta
+import io
+import json
+import re
+from unittest import mock
+import uuid
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from openpyxl import load_workbook
+from rest_framework.test import APIClient
+
+from .models import (
+	CorteFonasa,
+	CorteFonasaDelta,
+	CorteFonasaObservacion,
+	CorteFonasaStaging,
+	ChunkCargaCorte,
+	CorteMonthlyStats,
+	Etnia,
+	Nacionalidad,
+	Sector,
+	Subsector,
+	HistorialCarga,
+	HpTrakcare,
+	NuevoUsuario,
+	SesionCargaCorte,
+	TrabajoCarga,
+	TrakcareSnapshot,
+	classify_estado_validacion,
+)
+from .cache_datos import bump_data_version, get_data_version
+from .catalogos import CatalogoResolver
+from .snapshots import (
+	SnapshotNoDisponible,
+	activar_snapshot,
+	crear_snapshot,
+	descartar_snapshot,
+	recolectar_snapshots,
+	snapshot_activo,
+)
+from .trabajos import ejecutar_trabajo, encolar_trabajo, liberar_trabajos_abandonados, reanudar_trabajos
+from .views import (
+	CORTE_LIST_ORDERING,
+	_corte_after_cursor_filter,
+	_decode_corte_cursor,
+	_delete_sin_colector,
+	_encode_corte_cursor,
+)
+
+
+def _corte_record(run, fecha_corte, centro, aceptado="ACEPTADO", motivo="", nombres="USUARIO"):
+	return {
+		"run": run,
+		"nombres": nombres,
+		"fehcaCorte": fecha_corte,
+		"nombreCentro": centro,
+		"aceptadoRechazado": aceptado,
+		"motivo": motivo,
+	}
+
+
+class CorteFonasaListadoQueriesTests(TestCase):
+	"""El listado del corte debe resolver totales y resúmenes con un número fijo de consultas."""
+
+	@classmethod
+	def setUpTestData(cls):
+		records = [
+			_corte_record("11111111-1", "2024-09-01", "CESFAM A", nombres="ANA"),
+			_corte_record("22222222-2", "2024-09-01", "CESFAM B", "RECHAZADO", "RECHAZADO PREVISIONAL"),
+			_corte_record("11111111-1", "2024-10-01", "CESFAM A", nombres="ANA"),
+			_corte_record("33333333-3", "2024-10-01", "CESFAM A", nombres="ANDRES"),
+			_corte_record("22222222-2", "2024-10-01", "CESFAM B", "RECHAZADO", "RECHAZADO FALLECIDO"),
+		]
+		response = APIClient().post("/api/corte-fonasa/", {"records": records}, format="json")
+		assert response.status_code == 200, response.content
+
+	def setUp(self):
+		# Las respuestas cacheadas no consultan la base de datos
+		cache.clear()
+		self.client = APIClient()
+
+	def test_listado_sin_busqueda(self):
+		with self.assertNumQueries(2):
+			response = self.client.get("/api/corte-fonasa/", {"centros": "CESFAM A,CESFAM B"})
+
+		data = response.json()
+		self.assertEqual((data["total"], data["validated"], data["non_validated"]), (5, 3, 2))
+		self.assertEqual([item["month"] for item in data["summary"]], ["2024-10", "2024-09"])
+		self.assertEqual({item["centro"] for item in data["by_centro"]}, {"CESFAM A", "CESFAM B"})
+		self.assertEqual(len(data["rows"]), 5)
+
+	def test_listado_con_busqueda(self):
+		with self.assertNumQueries(2):
+			response = self.client.get(
+				"/api/corte-fonasa/",
+				{"search": "AN", "centros": "CESFAM A,CESFAM B", "validated_only": "true"},
+			)
+
+		data = response.json()
+		self.assertEqual((data["total"], data["validated"], data["non_validated"]), (3, 3, 0))
+		self.assertEqual(
+			[(item["month"], item["total"]) for item in data["summary"]],
+			[("2024-10", 2), ("2024-09", 1)],
+		)
+		self.assertEqual([item["centro"] for item in data["by_centro"]], ["CESFAM A"])
+		self.assertEqual(len(data["rows"]), 3)
+
+	def test_listado_solo_resumen(self):
+		with self.assertNumQueries(1):
+			response = self.client.get("/api/corte-fonasa/", {"search": "2222", "summary_only": "true"})
+
+		data = response.json()
+		self.assertEqual((data["total"], data["validated"], data["non_validated"]), (2, 0, 2))
+		self.assertEqual(data["rows"], [])
+
+
+class CorteCursorTests(TestCase):
+	"""Paginación por cursor del listado del corte (?cursor=, orden fecha desc, run, id)."""
+
+	@classmethod
+	def setUpTestData(cls):
+		# RUN repetido dentro de un mes y entre meses; el corte de página cae entre duplicados
+		filas = [
+			("22222222-2", date(2024, 10, 1)),
+			("11111111-1", date(2024, 10, 1)),
+			("11111111-1", date(2024, 10, 1)),
+			("33333333-3", date(2024, 9, 1)),
+			("11111111-1", date(2024, 9, 1)),
+			("11111111-1", date(2024, 9, 1)),
+			("22222222-2", date(2024, 8, 1)),
+		]
+		for run, fecha_corte in filas:
+			CorteFonasa.objects.create(run=run, fecha_corte=fecha_corte, nombre_centro="CESFAM A")
+
+	def setUp(self):
+		cache.clear()
+		self.client = APIClient()
+		self.esperado = list(CorteFonasa.objects.order_by(*CORTE_LIST_ORDERING).values_list("id", flat=True))
+
+	def test_codificar_y_decodificar(self):
+		corte = CorteFonasa.objects.order_by("id").first()
+		cursor = _encode_corte_cursor(corte)
+
+		self.assertNotIn("=", cursor)
+		self.assertEqual(_decode_corte_cursor(cursor), (corte.fecha_corte, corte.run, corte.id))
+		for invalido in ("no-es-base64!", "bm8tanNvbg", _encode_corte_cursor(corte)[:-4]):
+			with self.subTest(cursor=invalido):
+				self.assertIsNone(_decode_corte_cursor(invalido))
+
+	def test_filtro_posterior_al_cursor(self):
+		for posicion, pk in enumerate(self.esperado):
+			corte = CorteFonasa.objects.get(pk=pk)
+			siguientes = CorteFonasa.objects.filter(
+				_corte_after_cursor_filter((corte.fecha_corte, corte.run, corte.id))
+			).order_by(*CORTE_LIST_ORDERING)
+			with self.subTest(posicion=posicion):
+				self.assertEqual(list(siguientes.values_list("id", flat=True)), self.esperado[posicion + 1 :])
+
+	def test_recorre_todas_las_paginas(self):
+		vistos = []
+		cursor = ""
+		paginas = 0
+		while cursor is not None:
+			data = self.client.get("/api/corte-fonasa/", {"cursor": cursor, "limit": 2}).json()
+			vistos.extend(fila["id"] for fila in data["rows"])
+			cursor = data["next_cursor"]
+			paginas += 1
+
+		# Sin filas repetidas ni saltadas; la última página trae next_cursor nulo
+		self.assertEqual(vistos, self.esperado)
+		self.assertEqual(paginas, 4)
+
+		# Con el total exacto de filas no queda una página vacía al final
+		data = self.client.get("/api/corte-fonasa/", {"cursor": "", "limit": len(self.esperado)}).json()
+		self.assertEqual((len(data["rows"]), data["next_cursor"]), (len(self.esperado), None))
+
+	def test_cursor_invalido(self):
+		response = self.client.get("/api/corte-fonasa/", {"cursor": "no-es-un-cursor"})
+		self.assertEqual(response.status_code, 400)
+		self.assertEqual(response.json()["detail"], "Cursor inválido")
+
+
+class CorteEliminacionTests(TestCase):
+	"""DELETE por mes del corte: observaciones, estadísticas y relaciones inversas."""
+
+	def test_eliminar_mes(self):
+		client = APIClient()
+		client.post(
+			"/api/corte-fonasa/",
+			{"records": [_corte_record("11111111-1", "2024-09-01", "CESFAM A"), _corte_record("11111111-1", "2024-10-01", "CESFAM A")]},
+			format="json",
+		)
+		CorteFonasaObservacion.objects.create(corte=CorteFonasa.objects.get(fecha_corte=date(2024, 10, 1)), titulo="Llamar")
+
+		response = client.delete("/api/corte-fonasa/?month=2024-10&admin_password=admin123")
+
+		self.assertEqual(response.json(), {"deleted": 1})
+		self.assertEqual(list(CorteFonasa.objects.values_list("fecha_corte", flat=True)), [date(2024, 9, 1)])
+		self.assertFalse(CorteFonasaObservacion.objects.exists())
+		self.assertEqual(list(CorteMonthlyStats.objects.values_list("periodo_mes", "total")), [(9, 1)])
+
+	def test_relacion_no_eliminada_falla(self):
+		with self.assertRaisesMessage(RuntimeError, "CorteFonasaObservacion"):
+			_delete_sin_colector(CorteFonasa.objects.all())
+
+
+@override_settings(CORTE_BULK_BATCH_SIZE=2)
+class CorteDeltaTests(TestCase):
+	"""Altas, bajas y cambios de un corte respecto del mes anterior (CorteFonasaDelta)."""
+
+	def setUp(self):
+		cache.clear()
+		self.client = APIClient()
+		self.client.post(
+			"/api/corte-fonasa/",
+			{
+				"records": [
+					_corte_record("11111111-1", "2024-09-01", "CESFAM A"),
+					_corte_record("22222222-2", "2024-09-01", "CESFAM A"),
+					_corte_record("33333333-3", "2024-09-01", "CESFAM B"),
+				]
+			},
+			format="json",
+		)
+		self.client.post(
+			"/api/corte-fonasa/",
+			{
+				"records": [
+					_corte_record("11111111-1", "2024-10-01", "CESFAM A"),
+					_corte_record("22222222-2", "2024-10-01", "CESFAM B", "RECHAZADO", "RECHAZADO PREVISIONAL"),
+					_corte_record("44444444-4", "2024-10-01", "CESFAM A", nombres="NUEVA"),
+				]
+			},
+			format="json",
+		)
+
+	def test_altas_bajas_y_cambios(self):
+		data = self.client.get("/api/corte-fonasa/delta/").json()
+
+		self.assertEqual((data["month"], data["previous_month"], data["total"]), ("2024-10", "2024-09", 3))
+		self.assertEqual(
+			(data["summary"]["altas"], data["summary"]["bajas"], data["summary"]["cambios"]), (1, 1, 1)
+		)
+		filas = {fila["run"]: fila for fila in data["rows"]}
+		self.assertEqual(
+			{run: fila["tipo"] for run, fila in filas.items()},
+			{"44444444-4": "ALTA", "33333333-3": "BAJA", "22222222-2": "CAMBIO"},
+		)
+		self.assertIn("NUEVA", filas["44444444-4"]["nombre"])
+		self.assertEqual((filas["33333333-3"]["centroAnterior"], filas["33333333-3"]["centroActual"]), ("CESFAM B", ""))
+		cambio = filas["22222222-2"]
+		self.assertEqual((cambio["centroAnterior"], cambio["centroActual"]), ("CESFAM A", "CESFAM B"))
+		self.assertEqual((cambio["cambioCentro"], cambio["cambioMotivo"], cambio["cambioTramo"]), (True, True, False))
+
+		solo_centro = self.client.get("/api/corte-fonasa/delta/", {"cambio": "centro"}).json()
+		self.assertEqual([fila["run"] for fila in solo_centro["rows"]], ["22222222-2"])
+
+	def test_eliminar_mes_descarta_su_delta(self):
+		self.client.delete("/api/corte-fonasa/?month=2024-10&admin_password=admin123")
+		cache.clear()
+
+		self.assertFalse(CorteFonasaDelta.objects.filter(periodo_mes=10).exists())
+		self.assertEqual(self.client.get("/api/corte-fonasa/delta/", {"month": "2024-10"}).json()["total"], 0)
+
+
+class EstadoValidacionTests(TestCase):
+	"""Clasificación persistida del corte (classify_estado_validacion)."""
+
+	def test_clasificacion(self):
+		casos = [
+			(("ACEPTADO", ""), "VALIDADO"),
+			(("", ""), "VALIDADO"),
+			(("ACEPTADO", "TRASLADO POSITIVO"), "VALIDADO"),
+			(("RECHAZADO", ""), "NO_VALIDADO"),
+			(("INGRESO RECHAZO SIMULTÁNEO", ""), "NO_VALIDADO"),
+			(("ACEPTADO", "TRASLADO NEGATIVO"), "NO_VALIDADO"),
+			(("", "RECHAZADO PREVISIONAL"), "NO_VALIDADO"),
+			(("RECHAZADO", "RECHAZADO FALLECIDO"), "FALLECIDO"),
+			(("aceptado", "fallecido"), "FALLECIDO"),
+			((None, None), "VALIDADO"),
+		]
+		for (aceptado, motivo), esperado in casos:
+			with self.subTest(aceptado=aceptado, motivo=motivo):
+				self.assertEqual(classify_estado_validacion(aceptado, motivo), esperado)
+
+	def test_columna_en_carga_masiva_y_save(self):
+		APIClient().post(
+			"/api/corte-fonasa/",
+			{
+				"records": [
+					_corte_record("11111111-1", "2024-10-01", "CESFAM A"),
+					_corte_record("22222222-2", "2024-10-01", "CESFAM A", motivo="  traslado   negativo "),
+					_corte_record("33333333-3", "2024-10-01", "CESFAM A", "RECHAZADO", "RECHAZADO FALLECIDO"),
+				]
+			},
+			format="json",
+		)
+		self.assertEqual(
+			dict(CorteFonasa.objects.values_list("run", "estado_validacion")),
+			{"11111111-1": "VALIDADO", "22222222-2": "NO_VALIDADO", "33333333-3": "FALLECIDO"},
+		)
+
+		corte = CorteFonasa.objects.get(run="11111111-1")
+		corte.aceptado_rechazado = "RECHAZADO"
+		corte.save()
+		corte.refresh_from_db()
+		self.assertEqual(corte.estado_validacion, "NO_VALIDADO")
+
+	def test_historial_y_validaciones_leen_la_columna(self):
+		# Rechazo sin motivo de NON_VALIDATED_MOTIVOS: solo aceptado_rechazado lo marca
+		client = APIClient()
+		client.post(
+			"/api/corte-fonasa/",
+			{
+				"records": [
+					_corte_record("11111111-1", "2024-10-01", "CESFAM A"),
+					_corte_record("22222222-2", "2024-10-01", "CESFAM A", "RECHAZADO"),
+					_corte_record("33333333-3", "2024-10-01", "CESFAM A", "ACEPTADO", "FALLECIDO"),
+				]
+			},
+			format="json",
+		)
+
+		historial = client.get("/api/corte-fonasa/historial-mensual/", {"run": "22222222-2"}).json()
+		self.assertEqual([fila["estado"] for fila in historial], ["RECHAZADO"])
+
+		usuarios = [
+			NuevoUsuario.objects.create(
+				run=run, fecha_inscripcion=date(2024, 10, 5), periodo_mes=10, periodo_anio=2024
+			)
+			for run in ("11111111-1", "22222222-2", "33333333-3", "44444444-4")
+		]
+		respuesta = client.post(
+			"/api/nuevos-usuarios/validar-lote/",
+			{"usuarios": [{"id": u.id, "run": u.run, "fechaInscripcion": "2024-10-05"} for u in usuarios]},
+			format="json",
+		).json()
+		self.assertEqual(
+			[r["estado"] for r in respuesta["resultados"]],
+			["VALIDADO", "NO_VALIDADO", "FALLECIDO", "NO_VALIDADO"],
+		)
+
+		with CaptureQueriesContext(connection) as consultas:
+			validacion = client.post(
+				"/api/validaciones/validar-corte/",
+				{"periodoMes": 10, "periodoAnio": 2024, "fechaCorte": "2024-10-01"},
+				format="json",
+			).json()["validacion"]
+		# Una sola consulta al corte para todo el periodo, no dos por usuario
+		self.assertEqual(sum('FROM "api_cortefonasa"' in q["sql"] for q in consultas.captured_queries), 1)
+		self.assertEqual(validacion["usuariosValidados"], 1)
+		self.assertEqual(validacion["usuariosNoValidados"], 3)
+		self.assertEqual(
+			dict(NuevoUsuario.objects.values_list("run", "estado")),
+			{
+				"11111111-1": "VALIDADO",
+				"22222222-2": "NO_VALIDADO",
+				"33333333-3": "NO_VALIDADO",
+				"44444444-4": "NO_VALIDADO",
+			},
+		)
+
+
+class BusquedaTests(TestCase):
+	"""/api/search/ sobre los índices FTS5 de SQLite (ver api/busqueda.py)."""
+
+	def setUp(self):
+		cache.clear()
+		self.client = APIClient()
+		self.client.post(
+			"/api/corte-fonasa/",
+			{
+				"records": [
+					_corte_record("11111111-1", "2024-10-01", "CESFAM A", nombres="ANDREA"),
+					_corte_record("22222222-2", "2024-10-01", "CESFAM A", nombres="PEDRO"),
+					_corte_record("33333333-3", "2024-10-01", "CESFAM A", nombres="ALEJANDRA"),
+				]
+			},
+			format="json",
+		)
+
+	def _buscar(self, **params):
+		response = self.client.get("/api/search/", params)
+		self.assertEqual(response.status_code, 200, response.content)
+		return response.json()["results"]
+
+	def test_busqueda_por_nombre_usa_fts(self):
+		with CaptureQueriesContext(connection) as consultas:
+			resultados = self._buscar(q="andr", fuentes="corte")
+
+		self.assertEqual(sorted(fila["run"] for fila in resultados["corte"]), ["11111111-1", "33333333-3"])
+		self.assertTrue(all(fila["score"] is not None for fila in resultados["corte"]))
+		self.assertTrue(any("api_cortefonasa_fts" in consulta["sql"] for consulta in consultas.captured_queries))
+
+		# Los cambios posteriores llegan al índice por los triggers
+		CorteFonasa.objects.filter(run="22222222-2").update(nombres="ANDRES")
+		self.assertEqual(len(self._buscar(q="andr", fuentes="corte")["corte"]), 3)
+
+	def test_run_exacto_primero_y_termino_corto(self):
+		resultados = self._buscar(q="22.222.222-2", fuentes="corte")
+		self.assertEqual(resultados["corte"][0]["run"], "22222222-2")
+		self.assertTrue(resultados["corte"][0]["exacto"])
+
+		# Menos de 3 caracteres: icontains sin ranking
+		cortos = self._buscar(q="PE", fuentes="corte")["corte"]
+		self.assertEqual([(fila["run"], fila["score"]) for fila in cortos], [("22222222-2", None)])
+
+	def test_trakcare_solo_version_activa(self):
+		self.client.post("/api/hp-trakcare/", {"records": [{"run": "11111111-1", "nombre": "ANDREA"}]}, format="json")
+		self.client.post(
+			"/api/hp-trakcare/?replace=true", {"records": [{"run": "44444444-4", "nombre": "ANDRES"}]}, format="json"
+		)
+
+		resultados = self._buscar(q="andr", fuentes="trakcare")
+
+		self.assertEqual([fila["run"] for fila in resultados["trakcare"]], ["44444444-4"])
+
+	def test_parametros_invalidos(self):
+		self.assertEqual(self.client.get("/api/search/").status_code, 400)
+		self.assertEqual(self.client.get("/api/search/", {"q": "andr", "fuentes": "otra"}).status_code, 400)
+
+
+@mock.patch("api.views.STREAMING_CHUNK_SIZE", 2)
+class ListadoStreamingTests(TestCase):
+	"""Listados completos (all=true) transmitidos como JSON o NDJSON."""
+
+	def setUp(self):
+		cache.clear()
+		self.client = APIClient()
+		self.client.post(
+			"/api/corte-fonasa/",
+			{
+				"records": [
+					_corte_record(f"{str(numero) * 8}-{numero}", "2024-10-01", "CESFAM A", nombres=f"NOMBRE Ñ{numero}")
+					for numero in range(1, 6)
+				]
+			},
+			format="json",
+		)
+		self.paginado = self.client.get("/api/corte-fonasa/", {"limit": 100}).json()
+
+	def test_json_igual_al_paginado(self):
+		response = self.client.get("/api/corte-fonasa/", {"all": "true"})
+
+		self.assertTrue(response.streaming)
+		self.assertEqual(response["Content-Type"], "application/json; charset=utf-8")
+		data = json.loads(b"".join(response.streaming_content))
+		self.assertEqual(data, self.paginado)
+		self.assertEqual(len(data["rows"]), 5)
+
+	def test_ndjson_cabecera_y_una_linea_por_fila(self):
+		response = self.client.get("/api/corte-fonasa/", {"all": "true"}, HTTP_ACCEPT="application/x-ndjson")
+
+		self.assertEqual(response["Content-Type"], "application/x-ndjson; charset=utf-8")
+		lineas = b"".join(response.streaming_content).decode("utf-8").splitlines()
+		cabecera, filas = json.loads(lineas[0]), [json.loads(linea) for linea in lineas[1:]]
+		self.assertNotIn("rows", cabecera)
+		self.assertEqual(cabecera["total"], 5)
+		self.assertEqual(filas, self.paginado["rows"])
+		self.assertIn("Ñ1", lineas[1])
+
+	def test_sin_filas(self):
+		response = self.client.get("/api/corte-fonasa/", {"all": "true", "search": "NO EXISTE"})
+
+		data = json.loads(b"".join(response.streaming_content))
+		self.assertEqual((data["total"], data["rows"]), (0, []))
+
+
+@mock.patch("api.exportacion.EXPORT_CHUNK_SIZE", 2)
+class ExportacionTests(TestCase):
+	"""Exportación CSV/XLSX del corte con los filtros del listado."""
+
+	def setUp(self):
+		cache.clear()
+		self.client = APIClient()
+		self.client.post(
+			"/api/corte-fonasa/",
+			{
+				"records": [
+					_corte_record("11111111-1", "2024-10-01", "CESFAM A", nombres="JOSÉ"),
+					_corte_record("22222222-2", "2024-10-01", "CESFAM B", "RECHAZADO", "RECHAZADO PREVISIONAL"),
+					_corte_record("33333333-3", "2024-10-01", "CESFAM A", nombres='ANA "LA, PRIMERA"'),
+					_corte_record("44444444-4", "2024-09-01", "CESFAM A"),
+				]
+			},
+			format="json",
+		)
+
+	def test_csv_contenido(self):
+		response = self.client.get("/api/corte-fonasa/export/", {"month": "2024-10"})
+
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(response["Content-Disposition"], 'attachment; filename="corte_fonasa_2024-10.csv"')
+		contenido = b"".join(response.streaming_content).decode("utf-8")
+		self.assertTrue(contenido.startswith("\ufeffrun,nombres,"))
+		filas = list(csv.DictReader(io.StringIO(contenido.lstrip("\ufeff"))))
+		self.assertEqual(
+			sorted((fila["run"], fila["nombres"], fila["fechaCorte"], fila["estadoValidacion"]) for fila in filas),
+			[
+				("11111111-1", "JOSÉ", "2024-10-01", "VALIDADO"),
+				("22222222-2", "USUARIO", "2024-10-01", "NO_VALIDADO"),
+				("33333333-3", 'ANA "LA, PRIMERA"', "2024-10-01", "VALIDADO"),
+			],
+		)
+		self.assertEqual(filas[0]["fechaNacimiento"], "")
+
+	def test_csv_filtros_del_listado(self):
+		response = self.client.get("/api/corte-fonasa/export/", {"month": "2024-10", "non_validated_only": "true"})
+
+		filas = list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode("utf-8-sig"))))
+		self.assertEqual([fila["run"] for fila in filas], ["22222222-2"])
+
+	def test_xlsx_y_formato_invalido(self):
+		response = self.client.get("/api/corte-fonasa/export/", {"month": "2024-10", "format": "xlsx"})
+		self.assertEqual(response.status_code, 200)
+		libro = load_workbook(io.BytesIO(b"".join(response.streaming_content)), read_only=True)
+		filas = list(libro.active.iter_rows(values_only=True))
+		self.assertEqual(filas[0][:2], ("run", "nombres"))
+		self.assertEqual(len(filas), 4)
+
+		# DRF rechaza en la negociación los formatos sin renderer (EXPORT_RENDERERS)
+		self.assertEqual(self.client.get("/api/corte-fonasa/export/", {"format": "pdf"}).status_code, 404)
+
+
+class VersionCacheTests(TestCase):
+	"""Las ediciones fuera de las vistas (ORM, admin, comandos) invalidan los ETag."""
+
+	def setUp(self):
+		cache.clear()
+		self.client = APIClient()
+		with self._confirmar():
+			self.client.post(
+				"/api/corte-fonasa/", {"records": [_corte_record("11111111-1", "2024-10-01", "CESFAM A")]}, format="json"
+			)
+
+	@contextmanager
+	def _confirmar(self):
+		# TestCase nunca confirma: se ejecutan los on_commit y se descartan, para
+		# que bump_data_version no los siga viendo pendientes
+		inicio = len(connection.run_on_commit)
+		with self.captureOnCommitCallbacks(execute=True):
+			yield
+		del connection.run_on_commit[inicio:]
+
+	def test_renovar_no_lee_la_version_anterior(self):
+		# FileBasedCache/DatabaseCache hacen incr() como get() + set(): renovar no
+		# debe depender de ninguno de los dos para no perder una carga simultánea
+		versiones = {get_data_version("corte")}
+		for _ in range(3):
+			with mock.patch.object(cache, "incr", side_effect=AssertionError("incr")), mock.patch.object(
+				cache, "get", side_effect=AssertionError("get")
+			), self._confirmar():
+				bump_data_version("corte")
+			versiones.add(get_data_version("corte"))
+		self.assertEqual(len(versiones), 4)
+
+	def _vigente(self, url):
+		"""Retorna el ETag actual de `url`, comprobando que responde 304."""
+		etag = self.client.get(url)["ETag"]
+		self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+		return etag
+
+	def _sigue_vigente(self, url, etag):
+		return self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+	def test_save_desde_el_orm(self):
+		etag = self._vigente("/api/corte-fonasa/")
+
+		corte = CorteFonasa.objects.get()
+		corte.nombre_centro = "CESFAM B"
+		with self._confirmar():
+			corte.save()
+
+		self.assertFalse(self._sigue_vigente("/api/corte-fonasa/", etag))
+
+	def test_catalogo_guardado_y_eliminado(self):
+		etag = self._vigente("/api/catalogos/all/")
+		with self._confirmar():
+			etnia = Etnia.objects.create(nombre="MAPUCHE")
+		self.assertFalse(self._sigue_vigente("/api/catalogos/all/", etag))
+
+		etag = self._vigente("/api/catalogos/all/")
+		with self._confirmar():
+			etnia.delete()
+		self.assertFalse(self._sigue_vigente("/api/catalogos/all/", etag))
+
+	def test_eliminacion_desde_el_admin(self):
+		etag = self._vigente("/api/corte-fonasa/")
+
+		with self._confirmar():
+			admin.site._registry[CorteFonasa].delete_queryset(None, CorteFonasa.objects.all())
+
+		self.assertFalse(CorteFonasa.objects.exists())
+		self.assertFalse(self._sigue_vigente("/api/corte-fonasa/", etag))
+		# Sin receptores de eliminación el borrado masivo no carga las filas
+		self.assertFalse(post_delete.has_listeners(CorteFonasa))
+
+	def test_comando_recalcular_deltas(self):
+		etag = self._vigente("/api/corte-fonasa/delta/")
+
+		with self._confirmar():
+			call_command("recalcular_deltas_corte", stdout=io.StringIO())
+
+		self.assertFalse(self._sigue_vigente("/api/corte-fonasa/delta/", etag))
+
+
+class MetricasAccesoTests(TestCase):
+	"""/api/metrics/ solo para staff o con METRICS_TOKEN."""
+
+	def setUp(self):
+		self.client = APIClient()
+
+	def test_anonimo_y_usuario_sin_staff(self):
+		self.assertEqual(self.client.get("/api/metrics/").status_code, 403)
+
+		self.client.force_authenticate(User.objects.create_user("operador", password="x"))
+		self.assertEqual(self.client.get("/api/metrics/").status_code, 403)
+
+	def test_staff(self):
+		self.client.force_authenticate(User.objects.create_user("admin", password="x", is_staff=True))
+
+		response = self.client.get("/api/metrics/")
+
+		self.assertEqual(response.status_code, 200)
+		self.assertTrue(response["Content-Type"].startswith("text/plain"))
+
+	@override_settings(METRICS_TOKEN="secreto")
+	def test_token_bearer(self):
+		self.assertEqual(self.client.get("/api/metrics/", HTTP_AUTHORIZATION="Bearer secreto").status_code, 200)
+		self.assertEqual(self.client.get("/api/metrics/", HTTP_AUTHORIZATION="Bearer otro").status_code, 403)
+		self.assertEqual(self.client.get("/api/metrics/").status_code, 403)
+
+
+class DashboardCentrosTests(TestCase):
+	"""Serie por centro del dashboard, leída desde CorteMonthlyStats."""
+
+	def setUp(self):
+		cache.clear()
+		self.client = APIClient()
+		records = []
+		for mes in ("2024-08-01", "2024-09-01", "2024-10-01"):
+			records += [
+				_corte_record("11111111-1", mes, "CESFAM A"),
+				_corte_record("22222222-2", mes, "CESFAM A", "RECHAZADO", "RECHAZADO PREVISIONAL"),
+				_corte_record("33333333-3", mes, "CESFAM B", "RECHAZADO", "RECHAZADO FALLECIDO"),
+			]
+		records.append(_corte_record("44444444-4", "2024-10-01", "CESFAM B"))
+		self.client.post("/api/corte-fonasa/", {"records": records}, format="json")
+
+	def test_serie_por_centro(self):
+		with self.assertNumQueries(1):
+			data = self.client.get("/api/dashboard/centros/", {"months": 2}).json()
+
+		self.assertEqual(data["latest_month"], "2024-10")
+		self.assertEqual(
+			[(fila["month"], fila["total"], fila["validated"], fila["nonValidated"], fila["fallecidos"]) for fila in data["summary"]],
+			[("2024-10", 4, 2, 2, 1), ("2024-09", 3, 1, 2, 1)],
+		)
+		centros = {item["centro"]: item["data"] for item in data["by_centro"]}
+		self.assertEqual(
+			[(fila["month"], fila["total"], fila["validated"]) for fila in centros["CESFAM B"]],
+			[("2024-10", 2, 1), ("2024-09", 1, 0)],
+		)
+
+	def test_filtro_de_centros_y_todos_los_meses(self):
+		data = self.client.get("/api/dashboard/centros/", {"months": 0, "centros": "CESFAM A"}).json()
+
+		self.assertEqual([item["centro"] for item in data["by_centro"]], ["CESFAM A"])
+		self.assertEqual(
+			[(fila["month"], fila["total"]) for fila in data["summary"]],
+			[("2024-10", 2), ("2024-09", 2), ("2024-08", 2)],
+		)
+
+	def test_estadisticas_siguen_a_la_eliminacion(self):
+		self.client.delete("/api/corte-fonasa/?month=2024-10&admin_password=admin123")
+		cache.clear()
+
+		data = self.client.get("/api/dashboard/centros/").json()
+
+		self.assertEqual(data["latest_month"], "2024-09")
+		self.assertEqual([fila["month"] for fila in data["summary"]], ["2024-09", "2024-08"])
+
+
+@override_settings(CORTE_BULK_BATCH_SIZE=2)
+class TrakcareUpsertTests(TestCase):
+	"""Carga de HP Trakcare con upsert sobre (run, cod_registro)."""
+
+	def setUp(self):
+		cache.clear()
+		self.client = APIClient()
+
+	def _cargar(self, records):
+		response = self.client.post("/api/hp-trakcare/", {"records": records}, format="json")
+		self.assertEqual(response.status_code, 200, response.content)
+		return response.json()
+
+	def test_creados_y_actualizados(self):
+		primera = self._cargar(
+			[
+				{"run": "11111111-1", "codRegistro": "A", "nombre": "ANA"},
+				{"run": "22222222-2", "codRegistro": "B", "nombre": "BETO"},
+				{"run": "33333333-3", "codRegistro": "C", "nombre": "CARLA"},
+			]
+		)
+		self.assertEqual((primera["created"], primera["updated"], primera["total"]), (3, 0, 3))
+
+		segunda = self._cargar(
+			[
+				{"run": "11.111.111-1", "codRegistro": "A", "nombre": "ANA MARIA"},
+				{"run": "22222222-2", "codRegistro": "B", "nombre": "BETO"},
+				# Repetido dentro de un lote: cuenta una vez y gana la última fila
+				{"run": "44444444-4", "codRegistro": "D", "nombre": "DIEGO"},
+				{"run": "44444444-4", "codRegistro": "D", "nombre": "DIEGO ANDRES"},
+				{"run": "sin run", "codRegistro": "E"},
+			]
+		)
+
+		self.assertEqual((segunda["created"], segunda["updated"], segunda["invalid"]), (1, 2, 1))
+		self.assertEqual(segunda["total"], 4)
+		self.assertEqual(
+			dict(HpTrakcare.objects.values_list("cod_registro", "nombre")),
+			{"A": "ANA MARIA", "B": "BETO", "C": "CARLA", "D": "DIEGO ANDRES"},
+		)
+
+
+class CatalogoResolverTests(TestCase):
+	"""Coincidencia de catálogos sin distinguir mayúsculas, tildes ni espacios."""
+
+	def test_nombre_sin_tildes_ni_mayusculas(self):
+		etnia = Etnia.objects.create(nombre="Mapuche")
+		nacionalidad = Nacionalidad.objects.create(nombre="Perú")
+		resolver = CatalogoResolver(crear_desconocidos=False)
+
+		with self.assertNumQueries(2):
+			self.assertEqual(resolver.resolver("etnia", "  MAPUCHE "), etnia)
+			self.assertEqual(resolver.resolver("nacionalidad", "peru"), nacionalidad)
+			self.assertEqual(resolver.resolver("nacionalidad", "PERÚ"), nacionalidad)
+			# Un catálogo ya leído no vuelve a consultarse
+			self.assertIsNone(resolver.resolver("etnia", "AYMARA"))
+			self.assertIsNone(resolver.resolver("etnia", ""))
+
+	def test_codigo_y_prioridad_del_activo(self):
+		inactivo = Subsector.objects.create(nombre="Sector Río Norte", codigo="SN1", activo=False)
+		activo = Subsector.objects.create(nombre="SECTOR RIO  NORTE", codigo="SN2")
+		resolver = CatalogoResolver(crear_desconocidos=False)
+
+		self.assertEqual(resolver.resolver("subsector", "sector rio norte"), activo)
+		self.assertEqual(resolver.resolver("subsector", "sn1"), inactivo)
+
+	def test_resolver_filas_crea_desconocidos(self):
+		Sector.objects.create(nombre="Ñuñoa")
+		filas = [{"sector": "ÑUÑOA"}, {"sector": "Los Álamos"}, {"sector": "los alamos"}, {"sector": None}]
+
+		CatalogoResolver(crear_desconocidos=True).resolver_filas(filas, {"sector": "sector"})
+
+		self.assertEqual(
+			[fila["sector"].nombre if fila["sector"] else None for fila in filas],
+			["Ñuñoa", "Los Álamos", "Los Álamos", None],
+		)
+		self.assertEqual(Sector.objects.count(), 2)
+
+
+class TrakcareSnapshotsTests(TestCase):
+	"""Versiones de HP Trakcare: activación atómica, lecturas fijadas y recolección."""
+
+	def setUp(self):
+		cache.clear()
+		self.client = APIClient()
+
+	def _cargar(self, runs, replace=False):
+		records = [{"run": run, "codRegistro": run, "codFamilia": "F1"} for run in runs]
+		url = "/api/hp-trakcare/?replace=true" if replace else "/api/hp-trakcare/"
+		response = self.client.post(url, {"records": records}, format="json")
+		self.assertEqual(response.status_code, 200, response.content)
+
+	def test_activacion_y_recoleccion(self):
+		self._cargar(["11111111-1", "22222222-2"])
+		anterior = snapshot_activo()
+
+		nuevo = crear_snapshot()
+		HpTrakcare.todas_las_versiones.create(snapshot=nuevo, run="33333333-3", cod_registro="X")
+		# La versión en carga no es visible
+		self.assertEqual(HpTrakcare.objects.count(), 2)
+
+		activar_snapshot(nuevo)
+
+		self.assertEqual(list(HpTrakcare.objects.values_list("run", flat=True)), ["33333333-3"])
+		self.assertEqual(
+			dict(TrakcareSnapshot.objects.values_list("pk", "estado")), {anterior.pk: "OBSOLETO", nuevo.pk: "ACTIVO"}
+		)
+		self.assertEqual(TrakcareSnapshot.objects.get(pk=nuevo.pk).registros, 1)
+
+		# Cargas abandonadas en CARGANDO también se recolectan, las recientes no
+		abandonada = crear_snapshot()
+		TrakcareSnapshot.objects.filter(pk=abandonada.pk).update(creado_el=timezone.now() - timedelta(days=2))
+		HpTrakcare.todas_las_versiones.create(snapshot=abandonada, run="44444444-4", cod_registro="Y")
+		en_carga = crear_snapshot()
+
+		self.assertEqual(recolectar_snapshots(batch_size=1), 3)
+		self.assertEqual(set(TrakcareSnapshot.objects.values_list("pk", flat=True)), {nuevo.pk, en_carga.pk})
+		self.assertEqual(HpTrakcare.todas_las_versiones.count(), 1)
+
+	def test_activar_version_que_ya_no_esta_en_carga(self):
+		self._cargar(["11111111-1"])
+		activa = snapshot_activo()
+
+		descartada = crear_snapshot()
+		descartar_snapshot(descartada)
+		recolectada = crear_snapshot()
+		TrakcareSnapshot.objects.filter(pk=recolectada.pk).delete()
+
+		for snapshot in (descartada, recolectada, activa):
+			with self.subTest(snapshot=snapshot.pk), self.assertRaises(SnapshotNoDisponible):
+				activar_snapshot(snapshot)
+
+		# La versión activa sigue publicada con sus datos
+		self.assertEqual(TrakcareSnapshot.objects.get(pk=activa.pk).estado, "ACTIVO")
+		self.assertEqual(list(HpTrakcare.objects.values_list("run", flat=True)), ["11111111-1"])
+
+	def test_lecturas_fijadas_a_una_version(self):
+		self._cargar(["11111111-1", "22222222-2"])
+		anterior = snapshot_activo()
+		self._cargar(["33333333-3"], replace=True)
+
+		# Una versión ya resuelta sigue legible hasta que se recolecta
+		self.assertEqual(HpTrakcare.objects.de_snapshot(anterior.pk).count(), 2)
+
+		with CaptureQueriesContext(connection) as consultas:
+			data = self.client.get("/api/hp-trakcare/").json()
+		self.assertEqual((data["total"], len(data["rows"])), (1, 1))
+		# La versión activa se resuelve una sola vez; el total y la página filtran por su id
+		tabla = TrakcareSnapshot._meta.db_table
+		self.assertEqual(sum(tabla in consulta["sql"] for consulta in consultas.captured_queries), 1)
+
+		self.client.force_authenticate(User.objects.create_user("operador", password="x"))
+		with CaptureQueriesContext(connection) as consultas:
+			data = self.client.get("/api/buscar-familia/", {"run": "33333333-3"}).json()
+		self.assertEqual([miembro["run"] for miembro in data["miembros"]], ["33333333-3"])
+		self.assertEqual(sum(tabla in consulta["sql"] for consulta in consultas.captured_queries), 1)
+
+
+class BuscarFamiliaTests(TestCase):
+	"""buscar_familia resuelve los cortes de todos los miembros con consultas fijas."""
+
+	def setUp(self):
+		cache.clear()
+		self.client = APIClient()
+		self.client.force_authenticate(User.objects.create_user("operador", password="x"))
+
+	def _crear_familia(self, cantidad):
+		runs = [f"{str(numero) * 8}-{numero}" for numero in range(1, cantidad + 1)]
+		self.client.post(
+			"/api/hp-trakcare/",
+			{"records": [{"run": run, "codRegistro": run, "codFamilia": "F1"} for run in runs]},
+			format="json",
+		)
+		return runs
+
+	def test_consultas_fijas_y_resumen_por_miembro(self):
+		runs = self._crear_familia(3)
+		self.client.post(
+			"/api/corte-fonasa/",
+			{
+				"records": [
+					_corte_record(runs[0], "2024-09-01", "CESFAM A"),
+					_corte_record(runs[0], "2024-10-01", "CESFAM A", "RECHAZADO", "RECHAZADO PREVISIONAL"),
+					_corte_record(runs[1], "2024-09-01", "CESFAM A"),
+				]
+			},
+			format="json",
+		)
+
+		with self.assertNumQueries(4):
+			data = self.client.get("/api/buscar-familia/", {"run": runs[0]}).json()
+
+		miembros = {miembro["run"]: miembro for miembro in data["miembros"]}
+		self.assertEqual(data["total_miembros"], 3)
+		self.assertEqual(
+			[
+				(miembros[run]["total_cortes"], miembros[run]["ultimo_corte"], miembros[run]["estado_ultimo_corte"])
+				for run in runs
+			],
+			[(2, "2024-10-01", "NO_VALIDADO"), (1, "2024-09-01", "VALIDADO"), (0, None, None)],
+		)
+		self.assertEqual([miembros[run]["tiene_validados"] for run in runs], [False, True, False])
+		self.assertTrue(miembros[runs[0]]["es_principal"])
+
+	def test_consultas_no_crecen_con_los_miembros(self):
+		runs = self._crear_familia(9)
+		self.client.post(
+			"/api/corte-fonasa/",
+			{"records": [_corte_record(run, "2024-10-01", "CESFAM A") for run in runs]},
+			format="json",
+		)
+
+		with self.assertNumQueries(4):
+			data = self.client.get("/api/buscar-familia/", {"run": runs[0]}).json()
+
+		self.assertEqual(data["total_miembros"], 9)
+		self.assertTrue(all(miembro["total_cortes"] == 1 for miembro in data["miembros"]))
+
+
+class TrabajosCargaTests(TestCase):
+	"""Cargas en segundo plano: encolado, ejecución, reanudación y seguimiento."""
+
+	def setUp(self):
+		cache.clear()
+		self.records = [
+			_corte_record(f"{str(numero) * 8}-{numero}", "2024-10-01", "CESFAM A") for numero in range(1, 6)
+		]
+
+	def _encolar(self, **kwargs):
+		# En TestCase la transacción no se confirma: el pool de hilos no lo toma
+		return encolar_trabajo(tipo_carga="CORTE_FONASA", usuario="tester", registros=self.records, **kwargs)
+
+	def _abandonar(self, trabajo, filas_procesadas, intentos=1):
+		TrabajoCarga.objects.filter(pk=trabajo.pk).update(
+			estado="EN_PROCESO", intentos=intentos, latido_el=timezone.now() - timedelta(hours=2)
+		)
+		HistorialCarga.objects.filter(pk=trabajo.historial_id).update(filas_procesadas=filas_procesadas)
+
+	def test_encolar_y_ejecutar(self):
+		trabajo = self._encolar()
+		self.assertEqual(trabajo.estado, "PENDIENTE")
+		self.assertEqual((trabajo.historial.estado, trabajo.historial.total_registros), ("EN_PROCESO", 5))
+
+		ejecutar_trabajo(trabajo.pk)
+
+		trabajo.refresh_from_db()
+		historial = HistorialCarga.objects.get(pk=trabajo.historial_id)
+		self.assertEqual((trabajo.estado, trabajo.intentos, trabajo.registros), ("EXITOSO", 1, None))
+		self.assertEqual(trabajo.resultado["created"], 5)
+		self.assertEqual((historial.estado, historial.filas_procesadas, historial.registros_creados), ("EXITOSO", 5, 5))
+		self.assertEqual(historial.periodo_mes, 10)
+		self.assertEqual(CorteFonasa.objects.count(), 5)
+
+		# Un trabajo ya tomado no se vuelve a ejecutar
+		ejecutar_trabajo(trabajo.pk)
+		self.assertEqual(CorteFonasa.objects.count(), 5)
+
+	def test_reanuda_trabajo_abandonado_sin_duplicar(self):
+		trabajo = self._encolar()
+		# El primer intento confirmó un lote (2 filas) y el proceso murió
+		APIClient().post("/api/corte-fonasa/", {"records": self.records[:2]}, format="json")
+		self._abandonar(trabajo, filas_procesadas=2)
+
+		self.assertEqual(liberar_trabajos_abandonados(), 1)
+		ejecutar_trabajo(trabajo.pk)
+
+		trabajo.refresh_from_db()
+		self.assertEqual((trabajo.estado, trabajo.intentos), ("EXITOSO", 2))
+		self.assertEqual((trabajo.resultado["created"], trabajo.resultado["reanudado_desde"]), (3, 2))
+		self.assertEqual(HistorialCarga.objects.get(pk=trabajo.historial_id).filas_procesadas, 5)
+		self.assertEqual(CorteFonasa.objects.count(), 5)
+
+	def test_trabajo_con_reemplazo_reinicia(self):
+		trabajo = self._encolar(reemplazo=True)
+		self._abandonar(trabajo, filas_procesadas=2)
+
+		liberar_trabajos_abandonados()
+		ejecutar_trabajo(trabajo.pk)
+
+		trabajo.refresh_from_db()
+		self.assertEqual(trabajo.resultado["created"], 5)
+		self.assertNotIn("reanudado_desde", trabajo.resultado)
+		self.assertEqual(CorteFonasa.objects.count(), 5)
+
+	def test_liberar_respeta_latido_e_intentos(self):
+		reciente = self._encolar()
+		TrabajoCarga.objects.filter(pk=reciente.pk).update(estado="EN_PROCESO", intentos=1, latido_el=timezone.now())
+		agotado = self._encolar()
+		self._abandonar(agotado, filas_procesadas=2, intentos=3)
+
+		self.assertEqual(liberar_trabajos_abandonados(), 0)
+
+		reciente.refresh_from_db()
+		agotado.refresh_from_db()
+		self.assertEqual(reciente.estado, "EN_PROCESO")
+		self.assertEqual((agotado.estado, agotado.resultado), ("ERROR", {"filas_confirmadas": 2}))
+		self.assertEqual(HistorialCarga.objects.get(pk=agotado.historial_id).estado, "PARCIAL")
+
+	def test_api_jobs(self):
+		trabajo = self._encolar()
+		ejecutar_trabajo(trabajo.pk)
+		client = APIClient()
+
+		listado = client.get("/api/jobs/", {"estado": "exitoso"}).json()
+		self.assertEqual([item["id"] for item in listado], [trabajo.pk])
+
+		detalle = client.get(f"/api/jobs/{trabajo.pk}/").json()
+		self.assertEqual((detalle["estado"], detalle["filasProcesadas"], detalle["progreso"]), ("EXITOSO", 5, 100.0))
+		self.assertEqual(detalle["resultado"]["created"], 5)
+		self.assertEqual(client.get("/api/jobs/999999/").status_code, 404)
+
+	def test_ejecutor_por_hilos_reanuda_tras_reinicio(self):
+		# Tras un reinicio: uno perdió su on_commit (PENDIENTE) y otro quedó EN_PROCESO
+		sin_despachar = self._encolar()
+		interrumpido = self._encolar()
+		self._abandonar(interrumpido, filas_procesadas=0)
+		enviados = []
+		pool = mock.Mock(submit=lambda fn, trabajo_id: enviados.append(trabajo_id))
+
+		with mock.patch("api.trabajos._get_executor", return_value=pool):
+			self.assertEqual(reanudar_trabajos(forzar=True), 2)
+			# Dentro de REANUDAR_INTERVALO la consulta de trabajos no repite la recuperación
+			APIClient().get(f"/api/jobs/{sin_despachar.pk}/")
+
+		self.assertEqual(enviados, [sin_despachar.pk, interrumpido.pk])
+		self.assertEqual(TrabajoCarga.objects.get(pk=interrumpido.pk).estado, "PENDIENTE")
+		for trabajo_id in enviados:
+			ejecutar_trabajo(trabajo_id)
+		self.assertEqual(set(TrabajoCarga.objects.values_list("estado", flat=True)), {"EXITOSO"})
+
+		with override_settings(INGESTA_EJECUTOR="command"):
+			self.assertEqual(reanudar_trabajos(forzar=True), 0)
+
+
+class CorteSesionesTests(TestCase):
+	"""Carga del corte por chunks: idempotencia, conflictos y cierre de la sesión."""
+
+	def setUp(self):
+		cache.clear()
+		self.client = APIClient()
+
+	def _abrir(self, **data):
+		response = self.client.post("/api/corte-fonasa/sesiones/", data, format="json")
+		self.assertEqual(response.status_code, 201, response.content)
+		return response.json()["session_id"]
+
+	def _chunk(self, token, numero, records):
+		return self.client.put(
+			f"/api/corte-fonasa/sesiones/{token}/chunks/{numero}/", {"records": records}, format="json"
+		)
+
+	def _finalizar(self, token):
+		return self.client.post(f"/api/corte-fonasa/sesiones/{token}/finalizar/", format="json")
+
+	def test_chunk_idempotente_y_conflicto(self):
+		token = self._abrir()
+		records = [
+			_corte_record("11111111-1", "2024-10-01", "CESFAM A"),
+			_corte_record("22222222-2", "2024-10-01", "CESFAM B"),
+		]
+
+		primero = self._chunk(token, 0, records).json()
+		self.assertEqual((primero["created"], primero["duplicate"]), (2, False))
+
+		repetido = self._chunk(token, 0, records).json()
+		self.assertEqual((repetido["created"], repetido["duplicate"], repetido["hash"]), (2, True, primero["hash"]))
+		self.assertEqual(CorteFonasa.objects.count(), 2)
+
+		self.assertEqual(self._chunk(token, 0, records[:1]).status_code, 409)
+
+		final = self._finalizar(token).json()
+		self.assertEqual((final["estado"], final["created"], final["chunks_recibidos"]), ("FINALIZADA", 2, [0]))
+
+		# Cerrada la sesión no se aceptan chunks nuevos, pero el acuse del aplicado sigue disponible
+		self.assertEqual(self._chunk(token, 1, records).status_code, 409)
+		self.assertTrue(self._chunk(token, 0, records).json()["duplicate"])
+		self.assertEqual(self._finalizar(token).json()["created"], 2)
+		self.assertEqual(CorteFonasa.objects.count(), 2)
+
+	def test_finalizar_reemplazo_traspasa_preparados(self):
+		self.client.post(
+			"/api/corte-fonasa/",
+			{"records": [_corte_record("11111111-1", "2024-10-01", "CESFAM A"), _corte_record("22222222-2", "2024-10-01", "CESFAM A")]},
+			format="json",
+		)
+		token = self._abrir(replace=True, months=["2024-10"])
+		self._chunk(token, 0, [_corte_record(f"{str(numero) * 8}-{numero}", "2024-10-01", "CESFAM B") for numero in range(3, 6)])
+
+		# Hasta finalizar el mes visible es el anterior
+		self.assertEqual(set(CorteFonasa.objects.values_list("nombre_centro", flat=True)), {"CESFAM A"})
+		self.assertEqual(CorteFonasaStaging.objects.count(), 3)
+
+		response = self._finalizar(token)
+		self.assertEqual(response.status_code, 200, response.content)
+		self.assertEqual(response.json()["total"], 3)
+		self.assertEqual(set(CorteFonasa.objects.values_list("nombre_centro", flat=True)), {"CESFAM B"})
+		self.assertEqual(CorteFonasaStaging.objects.count(), 0)
+
+	def _sesion_reemplazo_preparada(self):
+		"""2024-10 con 2 registros visibles y una sesión de reemplazo con 3 preparados."""
+		self.client.post(
+			"/api/corte-fonasa/",
+			{"records": [_corte_record("11111111-1", "2024-10-01", "CESFAM A"), _corte_record("22222222-2", "2024-10-01", "CESFAM A")]},
+			format="json",
+		)
+		token = self._abrir(replace=True, months=["2024-10"])
+		self._chunk(token, 0, [_corte_record(f"{str(numero) * 8}-{numero}", "2024-10-01", "CESFAM B") for numero in range(3, 6)])
+		return token
+
+	def test_purga_respeta_sesion_activa(self):
+		token = self._sesion_reemplazo_preparada()
+		# Filas preparadas antiguas, pero la sesión sigue recibiendo chunks
+		CorteFonasaStaging.objects.update(creado_el=timezone.now() - timedelta(days=2))
+
+		self._abrir()
+
+		self.assertEqual(CorteFonasaStaging.objects.count(), 3)
+		self.assertEqual(self._finalizar(token).json()["created"], 3)
+		self.assertEqual(CorteFonasa.objects.filter(fecha_corte=date(2024, 10, 1)).count(), 3)
+
+	def test_purga_expira_sesion_inactiva(self):
+		token = self._sesion_reemplazo_preparada()
+		antigua = timezone.now() - timedelta(days=2)
+		SesionCargaCorte.objects.filter(token=token).update(creado_el=antigua)
+		ChunkCargaCorte.objects.update(recibido_el=antigua)
+
+		self._abrir()
+
+		self.assertEqual(SesionCargaCorte.objects.get(token=token).estado, "EXPIRADA")
+		self.assertFalse(CorteFonasaStaging.objects.exists())
+		self.assertEqual(self._finalizar(token).status_code, 409)
+		self.assertEqual(self._chunk(token, 1, [_corte_record("66666666-6", "2024-10-01", "CESFAM B")]).status_code, 409)
+		self.assertEqual(set(CorteFonasa.objects.values_list("nombre_centro", flat=True)), {"CESFAM A"})
+
+	def test_finalizar_rechaza_preparados_incompletos(self):
+		token = self._sesion_reemplazo_preparada()
+		CorteFonasaStaging.objects.filter(pk=CorteFonasaStaging.objects.values("pk")[:1]).delete()
+
+		response = self._finalizar(token)
+
+		self.assertEqual(response.status_code, 409)
+		self.assertEqual((response.json()["preparados"], response.json()["confirmados"]), (2, 3))
+		self.assertEqual(SesionCargaCorte.objects.get(token=token).estado, "ABIERTA")
+		self.assertEqual(CorteFonasa.objects.filter(fecha_corte=date(2024, 10, 1)).count(), 2)
+
+	def test_purga_cargas_sin_sesion_por_antiguedad(self):
+		def preparar(carga, creado_el):
+			CorteFonasaStaging.objects.create(carga=carga, run="11111111-1", fecha_corte=date(2024, 10, 1), creado_el=creado_el)
+
+		preparar(uuid.uuid4(), timezone.now() - timedelta(days=2))
+		reciente = uuid.uuid4()
+		preparar(reciente, timezone.now())
+
+		self._abrir()
+
+		self.assertEqual(list(CorteFonasaStaging.objects.values_list("carga", flat=True)), [reciente])
+
+
+class _PoolContador(ThreadPoolExecutor):
+	"""Reemplaza el ProcessPoolExecutor de normalizacion y cuenta los lotes enviados."""
+
+	def __init__(self):
+		super().__init__(max_workers=2)
+		self.lotes = 0
+
+	def submit(self, fn, *args, **kwargs):
+		self.lotes += 1
+		return super().submit(fn, *args, **kwargs)
+
+	def map(self, fn, *iterables, **kwargs):
+		iterables = [list(iterable) for iterable in iterables]
+		self.lotes += len(iterables[0])
+		return super().map(fn, *iterables, **kwargs)
+
+
+@override_settings(NORMALIZACION_WORKERS=2, NORMALIZACION_MIN_FILAS=4, CORTE_BULK_BATCH_SIZE=2)
+class NormalizacionPoolTests(TestCase):
+	"""Las cargas por lotes deben usar el pool aunque cada lote sea menor que NORMALIZACION_MIN_FILAS."""
+
+	def setUp(self):
+		cache.clear()
+		self.client = APIClient()
+		self.pool = _PoolContador()
+		patcher = mock.patch("api.normalizacion._get_pool", return_value=self.pool)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+		self.addCleanup(self.pool.shutdown)
+
+	def _csv(self, filas):
+		lineas = ["run,nombres,fehcaCorte,nombreCentro,aceptadoRechazado,motivo"]
+		lineas += [f"{str(numero) * 8}-{numero},USUARIO,2024-10-01,CESFAM A,ACEPTADO," for numero in range(1, filas + 1)]
+		return SimpleUploadedFile("corte.csv", "\n".join(lineas).encode("utf-8"), content_type="text/csv")
+
+	def test_archivo_usa_pool_al_alcanzar_el_minimo(self):
+		response = self.client.post("/api/corte-fonasa/archivo/", {"archivo": self._csv(7)}, format="multipart")
+
+		self.assertEqual(response.status_code, 200, response.content)
+		self.assertEqual(response.json()["created"], 7)
+		# Lotes de 2: solo el primero se normaliza en el proceso web, antes de
+		# alcanzar las 4 filas leídas
+		self.assertEqual(self.pool.lotes, 3)
+		self.assertEqual(CorteFonasa.objects.count(), 7)
+
+	def test_archivo_pequeno_no_usa_pool(self):
+		response = self.client.post("/api/corte-fonasa/archivo/", {"archivo": self._csv(3)}, format="multipart")
+
+		self.assertEqual(response.json()["created"], 3)
+		self.assertEqual(self.pool.lotes, 0)
+
+	def test_trabajo_conoce_el_total_y_usa_pool_desde_el_primer_lote(self):
+		records = [_corte_record(f"{str(numero) * 8}-{numero}", "2024-10-01", "CESFAM A") for numero in range(1, 6)]
+		trabajo = encolar_trabajo(tipo_carga="CORTE_FONASA", usuario="tester", registros=records)
+
+		ejecutar_trabajo(trabajo.pk)
+
+		self.assertEqual(self.pool.lotes, 3)
+		self.assertEqual(
+			sorted(CorteFonasa.objects.values_list("run", flat=True)),
+			sorted(record["run"] for record in records),
+		)
+
+	def test_trakcare_por_lotes_usa_pool(self):
+		records = [{"run": f"{str(numero) * 8}-{numero}", "codRegistro": str(numero)} for numero in range(1, 6)]
+
+		response = self.client.post("/api/hp-trakcare/?replace=true", {"records": records}, format="json")
+
+		self.assertEqual(response.status_code, 200, response.content)
+		self.assertEqual(response.json()["created"], 5)
+		self.assertEqual(self.pool.lotes, 3)
+		self.assertEqual(HpTrakcare.objects.count(), 5)
+
+
+class _CapturaConsultas:
+	"""execute_wrapper que guarda (sql, params) de cada SELECT ejecutado."""
+
+	def __init__(self):
+		self.consultas = []
+
+	def __call__(self, execute, sql, params, many, context):
+		if sql.lstrip().upper().startswith("SELECT"):
+			self.consultas.append((sql, params))
+		return execute(sql, params, many, context)
+
+
+def _nodos_plan(sql, params):
+	"""
+	(tabla, acceso secuencial, condición de índice) por cada lectura de tabla del
+	plan. En PostgreSQL se desactiva enable_seqscan: igual recurre a un Seq Scan si
+	ningún índice sirve para el filtro, sin depender del tamaño de los datos.
+	"""
+	with connection.cursor() as cursor:
+		if connection.vendor == "postgresql":
+			cursor.execute("SET enable_seqscan = off")
+			try:
+				cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+				plan = cursor.fetchone()[0]
+			finally:
+				cursor.execute("RESET enable_seqscan")
+			if isinstance(plan, str):
+				plan = json.loads(plan)
+			pendientes = [plan[0]["Plan"]]
+			nodos = []
+			while pendientes:
+				nodo = pendientes.pop()
+				pendientes.extend(nodo.get("Plans", []))
+				if "Relation Name" in nodo:
+					condicion = nodo.get("Index Cond", "") + nodo.get("Recheck Cond", "")
+					nodos.append((nodo["Relation Name"], nodo["Node Type"] == "Seq Scan", condicion))
+			return nodos
+
+		cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+		nodos = []
+		for *_, detalle in cursor.fetchall():
+			match = re.match(r"(SCAN|SEARCH) (\w+)(.*)", detalle)
+			if match:
+				operacion, tabla, resto = match.groups()
+				nodos.append((tabla, operacion == "SCAN" and " USING " not in resto, resto))
+		return nodos
+
+
+class PlanesConsultaTests(TestCase):
+	"""
+	Los endpoints más usados deben leer las tablas grandes por índice: un filtro
+	por mes escrito con __year/__month (o un índice faltante) termina en un
+	recorrido secuencial de la tabla completa.
+	"""
+
+	@classmethod
+	def setUpTestData(cls):
+		meses = [date(2023 + mes // 12, mes % 12 + 1, 1) for mes in range(24)]
+		CorteFonasa.objects.bulk_create(
+			CorteFonasa(
+				run=f"{numero:08d}-{numero % 10}",
+				fecha_corte=fecha_corte,
+				nombre_centro=f"CESFAM {numero % 8}",
+				nombres="USUARIO",
+				estado_validacion="VALIDADO",
+			)
+			for fecha_corte in meses
+			for numero in range(200)
+		)
+		snapshot = snapshot_activo()
+		HpTrakcare.objects.bulk_create(
+			HpTrakcare(
+				snapshot=snapshot,
+				run=f"{numero:08d}-{numero % 10}",
+				cod_registro=str(numero),
+				cod_familia=f"F{numero // 4}",
+				fecha_incorporacion=meses[numero % 24],
+				nombre="USUARIO",
+			)
+			for numero in range(4800)
+		)
+		HistorialCarga.objects.bulk_create(
+			HistorialCarga(
+				tipo_carga="CORTE_FONASA",
+				usuario="carga",
+				fecha_corte=meses[numero % 24],
+				periodo_anio=meses[numero % 24].year,
+				periodo_mes=meses[numero % 24].month,
+			)
+			for numero in range(2000)
+		)
+		with connection.cursor() as cursor:
+			# Estadísticas para que el planificador decida como con datos reales
+			cursor.execute("ANALYZE")
+		cls.user = User.objects.create_user("planes", password="planes")
+
+	def setUp(self):
+		cache.clear()
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def assertUsaIndices(self, url, params, tabla, columna):
+		"""
+		Ningún SELECT de la petición recorre `tabla` secuencialmente y al menos uno
+		la busca por un índice sobre `columna`.
+		"""
+		captura = _CapturaConsultas()
+		with connection.execute_wrapper(captura):
+			response = self.client.get(url, params)
+			if response.streaming:
+				b"".join(response.streaming_content)
+		self.assertEqual(response.status_code, 200, response.content if not response.streaming else url)
+
+		condiciones = []
+		for sql, params_sql in captura.consultas:
+			for nodo_tabla, secuencial, condicion in _nodos_plan(sql, params_sql):
+				if nodo_tabla != tabla:
+					continue
+				self.assertFalse(secuencial, f"{url} {params}: recorrido secuencial de {tabla} en\n{sql}")
+				condiciones.append(condicion)
+		self.assertTrue(
+			any(columna in condicion for condicion in condiciones),
+			f"{url} {params}: ninguna consulta busca {tabla} por {columna}: {condiciones}",
+		)
+
+	def test_listado_corte_por_mes(self):
+		self.assertUsaIndices("/api/corte-fonasa/", {"month": "2024-10"}, "api_cortefonasa", "fecha_corte")
+		self.assertUsaIndices(
+			"/api/corte-fonasa/",
+			{"month": "2024-10", "centros": "CESFAM 1,CESFAM 2", "validated_only": "true"},
+			"api_cortefonasa",
+			"fecha_corte",
+		)
+
+	def test_exportacion_corte_por_mes(self):
+		self.assertUsaIndices("/api/corte-fonasa/export/", {"month": "2024-10"}, "api_cortefonasa", "fecha_corte")
+
+	def test_trakcare_por_mes(self):
+		self.assertUsaIndices("/api/hp-trakcare/", {"month": "2024-10"}, "api_hptrakcare", "fecha_incorporacion")
+		self.assertUsaIndices(
+			"/api/hp-trakcare/export/", {"month": "2024-10"}, "api_hptrakcare", "fecha_incorporacion"
+		)
+
+	def test_historial_cargas_por_periodo(self):
+		self.assertUsaIndices("/api/historial-cargas/", {"periodo": "2024-10"}, "api_historialcarga", "fecha_corte")
+
+	def test_buscar_familia(self):
+		self.assertUsaIndices("/api/buscar-familia/", {"run": "00000005-5"}, "api_hptrakcare", "cod_familia")
+		self.assertUsaIndices("/api/buscar-familia/", {"run": "00000005-5"}, "api_cortefonasa", "run")
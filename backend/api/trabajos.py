@@ -0,0 +1,381 @@
+"""
+Ejecución en segundo plano de las cargas del Corte FONASA y HP Trakcare.
+
+Las vistas de carga crean un TrabajoCarga (junto a su HistorialCarga en estado
+EN_PROCESO) y responden de inmediato con el id del trabajo. El trabajo se ejecuta:
+
+- en un pool de hilos del propio proceso web (INGESTA_EJECUTOR = "thread"), o
+- en un proceso aparte con `python manage.py procesar_trabajos`
+  (INGESTA_EJECUTOR = "command").
+
+Cada lote confirmado actualiza el latido del trabajo y, en la misma transacción,
+las filas procesadas. Si el proceso muere, `liberar_trabajos_abandonados` devuelve
+el trabajo a la cola pasado INGESTA_TRABAJO_TIMEOUT; una carga sin reemplazo se
+reanuda desde las filas ya confirmadas y una con reemplazo vuelve a empezar (no
+publicó nada).
+
+Con el ejecutor por hilos esa recuperación la hace `reanudar_trabajos`: al crear
+el pool y, como mucho una vez por minuto, al encolar o consultar trabajos. Así un
+reinicio del servidor no deja trabajos EN_PROCESO ni PENDIENTE sin ejecutor.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import HistorialCarga, TrabajoCarga
+
+
+logger = logging.getLogger(__name__)
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+# Segundos mínimos entre dos recuperaciones de la cola en un mismo proceso
+REANUDAR_INTERVALO = 60
+_ultima_reanudacion: float | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        nuevo = _executor is None
+        if nuevo:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(int(getattr(settings, "INGESTA_WORKERS", 2)), 1),
+                thread_name_prefix="ingesta",
+            )
+    if nuevo:
+        # Primer uso del pool en este proceso: retoma lo que dejó un reinicio
+        reanudar_trabajos(forzar=True)
+    return _executor
+
+
+def reanudar_trabajos(forzar: bool = False) -> int:
+    """
+    Con el ejecutor por hilos, devuelve a la cola los trabajos abandonados y envía
+    al pool los PENDIENTE (p. ej. los que perdieron su on_commit en un reinicio).
+    Enviar un trabajo que otro proceso ya tomó no tiene efecto (ver
+    reclamar_trabajo). Sin `forzar` se omite si la última recuperación fue hace
+    menos de REANUDAR_INTERVALO segundos. Retorna cuántos trabajos se enviaron.
+    """
+    global _ultima_reanudacion
+    if getattr(settings, "INGESTA_EJECUTOR", "thread") != "thread":
+        return 0
+
+    ahora = time.monotonic()
+    with _executor_lock:
+        if not forzar and _ultima_reanudacion is not None and ahora - _ultima_reanudacion < REANUDAR_INTERVALO:
+            return 0
+        _ultima_reanudacion = ahora
+
+    try:
+        liberar_trabajos_abandonados()
+        pendientes = list(
+            TrabajoCarga.objects.filter(estado="PENDIENTE").order_by("creado_el").values_list("pk", flat=True)
+        )
+    except Exception:  # noqa: BLE001 - se reintenta en la próxima recuperación
+        logger.exception("Error al recuperar los trabajos de carga pendientes")
+        return 0
+
+    executor = _get_executor()
+    for trabajo_id in pendientes:
+        executor.submit(_ejecutar_en_hilo, trabajo_id)
+    if pendientes:
+        logger.info("Trabajos de carga reanudados: %s", pendientes)
+    return len(pendientes)
+
+
+def encolar_trabajo(
+    *,
+    tipo_carga: str,
+    usuario: str,
+    ip_address: str | None = None,
+    nombre_archivo: str = "",
+    registros: List[Dict[str, str]] | None = None,
+    archivo=None,
+    reemplazo: bool = False,
+) -> TrabajoCarga:
+    """
+    Registra un trabajo de carga y su HistorialCarga (EN_PROCESO).
+
+    Con el ejecutor por hilos el trabajo se despacha al confirmar la transacción;
+    con el ejecutor por comando queda PENDIENTE hasta que `procesar_trabajos` lo tome.
+    """
+    with transaction.atomic():
+        historial = HistorialCarga.objects.create(
+            tipo_carga=tipo_carga,
+            nombre_archivo=nombre_archivo or "",
+            usuario=usuario,
+            total_registros=len(registros) if registros is not None else 0,
+            estado="EN_PROCESO",
+            reemplazo=reemplazo,
+            ip_address=ip_address,
+        )
+        trabajo = TrabajoCarga(
+            tipo_carga=tipo_carga,
+            historial=historial,
+            registros=registros,
+            reemplazo=reemplazo,
+        )
+        if archivo is not None:
+            trabajo.archivo.save(archivo.name, archivo, save=False)
+        trabajo.save()
+
+        if getattr(settings, "INGESTA_EJECUTOR", "thread") == "thread":
+            transaction.on_commit(lambda: _despachar(trabajo.pk))
+
+    return trabajo
+
+
+def _despachar(trabajo_id: int) -> None:
+    _get_executor().submit(_ejecutar_en_hilo, trabajo_id)
+    # Aprovecha el encolado para retomar trabajos que quedaron sin ejecutor
+    reanudar_trabajos()
+
+
+def _ejecutar_en_hilo(trabajo_id: int) -> None:
+    try:
+        ejecutar_trabajo(trabajo_id)
+    finally:
+        # Cada hilo del pool abre su propia conexión; se cierra al terminar
+        close_old_connections()
+
+
+def programar_recoleccion_snapshots() -> None:
+    """
+    Programa la eliminación de las versiones obsoletas de HP Trakcare al confirmar
+    la transacción. Con el ejecutor por comando la hace `procesar_trabajos`.
+    """
+    if getattr(settings, "INGESTA_EJECUTOR", "thread") == "thread":
+        transaction.on_commit(lambda: _get_executor().submit(_recolectar_en_hilo))
+
+
+def _recolectar_en_hilo() -> None:
+    from .snapshots import recolectar_snapshots
+
+    try:
+        recolectar_snapshots()
+    except Exception:  # noqa: BLE001 - se reintenta en la próxima activación
+        logger.exception("Error al eliminar versiones obsoletas de HP Trakcare")
+    finally:
+        close_old_connections()
+
+
+class TrabajoReasignado(Exception):
+    """El trabajo fue devuelto a la cola mientras este ejecutor lo procesaba."""
+
+
+def reclamar_trabajo(trabajo_id: int) -> bool:
+    """Marca el trabajo EN_PROCESO solo si seguía PENDIENTE (un único ejecutor lo toma)."""
+    ahora = timezone.now()
+    return bool(
+        TrabajoCarga.objects.filter(pk=trabajo_id, estado="PENDIENTE").update(
+            estado="EN_PROCESO", iniciado_el=ahora, latido_el=ahora, intentos=F("intentos") + 1
+        )
+    )
+
+
+def liberar_trabajos_abandonados() -> int:
+    """
+    Devuelve a PENDIENTE los trabajos EN_PROCESO sin latido en INGESTA_TRABAJO_TIMEOUT
+    segundos (su proceso terminó sin cerrarlos). Los que ya agotaron
+    INGESTA_TRABAJO_MAX_INTENTOS quedan en ERROR. Retorna cuántos volvieron a la cola.
+    """
+    limite = timezone.now() - timedelta(seconds=int(getattr(settings, "INGESTA_TRABAJO_TIMEOUT", 1800)))
+    max_intentos = max(int(getattr(settings, "INGESTA_TRABAJO_MAX_INTENTOS", 3)), 1)
+    abandonados = TrabajoCarga.objects.filter(
+        Q(latido_el__lt=limite) | Q(latido_el__isnull=True, iniciado_el__lt=limite),
+        estado="EN_PROCESO",
+    )
+
+    for trabajo in abandonados.filter(intentos__gte=max_intentos).select_related("historial"):
+        mensaje = f"El trabajo se interrumpió {trabajo.intentos} veces sin terminar"
+        historial = trabajo.historial
+        historial.estado = "PARCIAL" if historial.filas_procesadas and not trabajo.reemplazo else "ERROR"
+        historial.errores = [mensaje]
+        historial.save(update_fields=["estado", "errores"])
+        trabajo.estado = "ERROR"
+        trabajo.error = mensaje
+        trabajo.resultado = _resultado_interrumpido(trabajo, historial)
+        trabajo.finalizado_el = timezone.now()
+        trabajo.save(update_fields=["estado", "error", "resultado", "finalizado_el"])
+
+    return abandonados.filter(intentos__lt=max_intentos).update(estado="PENDIENTE")
+
+
+def _resultado_interrumpido(trabajo: TrabajoCarga, historial: HistorialCarga) -> Dict:
+    """
+    Resultado de un trabajo que no terminó. Sin reemplazo cada lote se confirma por
+    separado: las filas ya confirmadas quedan cargadas. Con reemplazo no se publicó nada.
+    """
+    return {"filas_confirmadas": 0 if trabajo.reemplazo else historial.filas_procesadas}
+
+
+def ejecutar_trabajo(trabajo_id: int) -> None:
+    """
+    Ejecuta un trabajo de carga, registrando filas procesadas, tiempos por etapa y
+    totales finales en su HistorialCarga.
+    """
+    if not reclamar_trabajo(trabajo_id):
+        return
+
+    trabajo = TrabajoCarga.objects.select_related("historial").get(pk=trabajo_id)
+    historial = trabajo.historial
+    etapas: Dict[str, float] = {}
+    inicio = time.perf_counter()
+
+    # Un intento anterior sin reemplazo dejó confirmadas sus primeras filas
+    reanudar_desde = historial.filas_procesadas if trabajo.intentos > 1 and not trabajo.reemplazo else 0
+
+    def on_progress(filas: int) -> None:
+        # Se llama dentro de la transacción de cada lote (ver _ingest_corte_batches)
+        if not TrabajoCarga.objects.filter(
+            pk=trabajo.pk, estado="EN_PROCESO", intentos=trabajo.intentos
+        ).update(latido_el=timezone.now()):
+            raise TrabajoReasignado(f"El trabajo #{trabajo.pk} fue devuelto a la cola")
+        HistorialCarga.objects.filter(pk=historial.pk).update(
+            filas_procesadas=filas,
+            etapas=_redondear_etapas(etapas),
+        )
+
+    try:
+        if trabajo.tipo_carga == "CORTE_FONASA":
+            resultado = _ejecutar_corte(trabajo, historial, on_progress, etapas, reanudar_desde)
+        else:
+            resultado = _ejecutar_trakcare(trabajo, on_progress, etapas, reanudar_desde)
+    except TrabajoReasignado:
+        # Otro ejecutor lo retomó; el lote en curso se revirtió
+        logger.warning("Trabajo de carga %s reasignado; se abandona este intento", trabajo_id)
+        return
+    except Exception as exc:  # noqa: BLE001 - el error queda registrado en el trabajo
+        logger.exception("Error en trabajo de carga %s", trabajo_id)
+        historial.refresh_from_db(fields=["filas_procesadas"])
+        historial.estado = "PARCIAL" if historial.filas_procesadas and not trabajo.reemplazo else "ERROR"
+        historial.errores = [str(exc)]
+        trabajo.estado = "ERROR"
+        trabajo.error = str(exc)
+        trabajo.resultado = _resultado_interrumpido(trabajo, historial)
+    else:
+        if reanudar_desde:
+            resultado["reanudado_desde"] = reanudar_desde
+        historial.estado = "EXITOSO"
+        historial.filas_procesadas = (
+            reanudar_desde + resultado["created"] + resultado.get("updated", 0) + resultado["invalid"]
+        )
+        historial.total_registros = historial.total_registros or historial.filas_procesadas
+        historial.registros_creados = resultado["created"]
+        historial.registros_actualizados = resultado.get("updated", 0)
+        historial.registros_invalidos = resultado["invalid"]
+        historial.errores = resultado["invalid_rows"]
+        trabajo.estado = "EXITOSO"
+        trabajo.resultado = resultado
+
+    historial.etapas = _redondear_etapas(etapas)
+    historial.tiempo_procesamiento = round(time.perf_counter() - inicio, 3)
+    historial.save()
+
+    # Los datos de entrada ya no se necesitan una vez procesados
+    if trabajo.archivo:
+        trabajo.archivo.delete(save=False)
+    trabajo.registros = None
+    trabajo.finalizado_el = timezone.now()
+    trabajo.save()
+
+
+def _redondear_etapas(etapas: Dict[str, float]) -> Dict[str, float]:
+    return {nombre: round(segundos, 3) for nombre, segundos in etapas.items()}
+
+
+def _observar_fechas(
+    batches: Iterable[List[Tuple[Dict[str, str], date | None]]],
+    fechas: set,
+):
+    for batch in batches:
+        fechas.update(fecha_corte for _, fecha_corte in batch if fecha_corte)
+        yield batch
+
+
+def _ejecutar_corte(
+    trabajo: TrabajoCarga,
+    historial: HistorialCarga,
+    on_progress: Callable[[int], None],
+    etapas: Dict[str, float],
+    reanudar_desde: int = 0,
+) -> Dict:
+    from .normalizacion import _parse_date
+    from .views import _get_corte_batch_size, _ingest_corte_batches, _iter_corte_file_batches
+
+    batch_size = _get_corte_batch_size()
+    fechas: set = set()
+
+    if trabajo.archivo:
+        with trabajo.archivo.open("rb"):
+            created, skipped = _ingest_corte_batches(
+                _observar_fechas(_iter_corte_file_batches(trabajo.archivo, batch_size), fechas),
+                replace_mode=trabajo.reemplazo,
+                on_progress=on_progress,
+                etapas=etapas,
+                reanudar_desde=reanudar_desde,
+            )
+    else:
+        prepared_records = [
+            (record, _parse_date(record.get("fehcaCorte")))
+            for record in trabajo.registros or []
+        ]
+        batches = (
+            prepared_records[offset : offset + batch_size]
+            for offset in range(0, len(prepared_records), batch_size)
+        )
+        created, skipped = _ingest_corte_batches(
+            _observar_fechas(batches, fechas),
+            replace_mode=trabajo.reemplazo,
+            on_progress=on_progress,
+            etapas=etapas,
+            reanudar_desde=reanudar_desde,
+            total_carga=len(prepared_records),
+        )
+
+    if fechas:
+        fecha_corte = max(fechas)
+        historial.fecha_corte = fecha_corte
+        historial.periodo_mes = fecha_corte.month
+        historial.periodo_anio = fecha_corte.year
+
+    return {
+        "created": created,
+        "invalid": len(skipped),
+        "invalid_rows": skipped[:20],
+    }
+
+
+def _ejecutar_trakcare(
+    trabajo: TrabajoCarga,
+    on_progress: Callable[[int], None],
+    etapas: Dict[str, float],
+    reanudar_desde: int = 0,
+) -> Dict:
+    from .views import _ingest_trakcare_records
+
+    created, updated, skipped = _ingest_trakcare_records(
+        trabajo.registros or [],
+        replace_mode=trabajo.reemplazo,
+        on_progress=on_progress,
+        etapas=etapas,
+        reanudar_desde=reanudar_desde,
+    )
+
+    return {
+        "created": created,
+        "updated": updated,
+        "invalid": len(skipped),
+        "invalid_rows": skipped[:20],
+    }
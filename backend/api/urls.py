@@ -3,10 +3,28 @@ from . import views
 
 urlpatterns = [
     path("corte-fonasa/", views.upload_corte_fonasa, name="corte-fonasa-upload"),
+    path("corte-fonasa/archivo/", views.upload_corte_fonasa_archivo, name="corte-fonasa-archivo"),
+    path("corte-fonasa/export/", views.corte_fonasa_export, name="corte-fonasa-export"),
+    path("corte-fonasa/sesiones/", views.corte_fonasa_sesiones, name="corte-fonasa-sesiones"),
+    path("corte-fonasa/sesiones/<uuid:token>/", views.corte_fonasa_sesion_detail, name="corte-fonasa-sesion-detail"),
+    path(
+        "corte-fonasa/sesiones/<uuid:token>/chunks/<int:numero>/",
+        views.corte_fonasa_sesion_chunk,
+        name="corte-fonasa-sesion-chunk",
+    ),
+    path(
+        "corte-fonasa/sesiones/<uuid:token>/finalizar/",
+        views.corte_fonasa_sesion_finalizar,
+        name="corte-fonasa-sesion-finalizar",
+    ),
     path("corte-fonasa/<int:pk>/", views.corte_fonasa_detail, name="corte-fonasa-detail"),
     path("corte-fonasa/historial-mensual/", views.corte_fonasa_historial_mensual, name="corte-fonasa-historial-mensual"),
+    path("corte-fonasa/delta/", views.corte_fonasa_delta, name="corte-fonasa-delta"),
+    path("search/", views.busqueda, name="busqueda"),
+    path("metrics/", views.metricas, name="metricas"),
     path("hp-trakcare/", views.upload_hp_trakcare, name="hp-trakcare-upload"),
     path("hp-trakcare/<int:pk>/", views.hp_trakcare_detail, name="hp-trakcare-detail"),
+    path("hp-trakcare/export/", views.hp_trakcare_export, name="hp-trakcare-export"),
     path("hp-trakcare/buscar/", views.hp_trakcare_buscar, name="hp-trakcare-buscar"),
     
     # Nuevos Usuarios
@@ -63,9 +81,14 @@ urlpatterns = [
     
     # Historial de Cargas
     path("historial-cargas/", views.historial_cargas, name="historial-cargas"),
+
+    # Trabajos de carga en segundo plano
+    path("jobs/", views.trabajos_list, name="trabajos-list"),
+    path("jobs/<int:pk>/", views.trabajo_detail, name="trabajo-detail"),
     
     # Centros
     path("centros-disponibles/", views.centros_disponibles, name="centros-disponibles"),
+    path("dashboard/centros/", views.dashboard_centros, name="dashboard-centros"),
     
     # Administración de Usuarios
     path("usuarios/", views.usuarios_list, name="usuarios-list"),
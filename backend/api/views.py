@@ -1,23 +1,45 @@
-from datetime import date, datetime
+import base64
+import binascii
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
 import json
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
 import hashlib
+import io
+import time
+import uuid
+import unicodedata
+from zipfile import BadZipFile
+
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
 
 from django.conf import settings
-from django.core.cache import cache
-from django.db import transaction
-from django.db.models import Count, Q, Max
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, Q, Max, Min, Sum
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils import timezone
 from rest_framework import status
-from rest_framework.decorators import api_view, parser_classes, permission_classes
+from rest_framework.decorators import api_view, parser_classes, permission_classes, renderer_classes
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 
 from .models import (
     CorteFonasa,
+    CorteFonasaDelta,
+    CorteFonasaStaging,
+    CorteMonthlyStats,
+    ChunkCargaCorte,
     HpTrakcare,
+    TrakcareSnapshot,
     HistorialCarga,
+    SesionCargaCorte,
+    TrabajoCarga,
     CorteFonasaObservacion,
     NuevoUsuario,
     ValidacionCorte,
@@ -26,6 +48,7 @@ from .models import (
     Sector,
     Subsector,
     Establecimiento,
+    NON_VALIDATED_MOTIVOS,
     normalize_motivo,
     normalize_run,
 )
@@ -44,7 +67,27 @@ from .serializers import (
     SubsectorSerializer,
     EstablecimientoSerializer,
     HistorialCargaSerializer,
+    TrabajoCargaSerializer,
+)
+from .normalizacion import (
+    CORTE_FIELDS,
+    _parse_date,
+    _parse_int,
+    _safe_str,
+    normalizar_cortes,
+    normalizar_cortes_por_lotes,
+    normalizar_nuevos_usuarios,
+    normalizar_trakcare,
+    normalizar_trakcare_por_lotes,
 )
+from .trabajos import encolar_trabajo, reanudar_trabajos
+from .busqueda import FUENTES, buscar
+from .cache_datos import bump_data_version, etag_por_version, get_cached_response, set_cached_response
+from .catalogos import CatalogoResolver
+from .exportacion import CORTE_EXPORT_COLUMNS, TRAKCARE_EXPORT_COLUMNS, ExportFormatError, exportar
+from .metricas import AccesoMetricas, render_prometheus
+from .renderers import EXPORT_RENDERERS, NDJSONRenderer
+from .snapshots import activar_snapshot, crear_snapshot, descartar_snapshot, snapshot_activo, snapshot_activo_id
 
 
 CORTE_COLUMNS = [
@@ -109,57 +152,11 @@ MONTH_NAMES_ES = [
     "Diciembre",
 ]
 
-# Solo los 3 motivos que realmente aparecen en el sistema
-NON_VALIDATED_MOTIVOS = {
-    "TRASLADO NEGATIVO",
-    "RECHAZADO PREVISIONAL",
-    "RECHAZADO FALLECIDO",
-}
-
-
-def _is_validated_corte(aceptado_rechazado: str, motivo: str) -> bool:
-    """
-    Determina si un registro del corte FONASA está validado.
-    
-    Valores posibles en aceptadoRechazado:
-    - "ACEPTADO" -> VALIDADO
-    - "RECHAZADO" -> NO VALIDADO
-    - "INGRESO RECHAZO SIMULTÁNEO" -> NO VALIDADO (es un rechazo)
-    - Vacío o None -> Revisar motivo
-    
-    Lógica:
-    1. Si aceptadoRechazado == "ACEPTADO" -> SÍ validado
-    2. Si aceptadoRechazado contiene "RECHAZADO" o "RECHAZO" -> NO validado
-    3. Si el motivo está en NON_VALIDATED_MOTIVOS -> NO validado
-    4. Si el motivo contiene "FALLECIDO" -> NO validado (caso especial)
-    5. Por defecto -> SÍ validado
-    """
-    if not aceptado_rechazado:
-        aceptado_upper = ""
-    else:
-        aceptado_upper = str(aceptado_rechazado).upper().strip()
-    
-    motivo_norm = normalize_motivo(motivo or "")
-    
-    # Prioridad 1: Revisar aceptadoRechazado exactamente
-    # ACEPTADO -> Validado
-    if aceptado_upper == "ACEPTADO":
-        return True
-    
-    # RECHAZADO o INGRESO RECHAZO SIMULTÁNEO -> No validado
-    if "RECHAZADO" in aceptado_upper or "RECHAZO" in aceptado_upper:
-        return False
-    
-    # Prioridad 2: Revisar motivo normalizado
-    if motivo_norm in NON_VALIDATED_MOTIVOS:
-        return False
-    
-    # Caso especial: fallecidos no están validados
-    if "FALLECIDO" in motivo_norm:
-        return False
-    
-    # Por defecto, si no hay indicación clara, se considera validado
-    return True
+# Clasificación persistida en CorteFonasa.estado_validacion (ver
+# classify_estado_validacion): los filtros son igualdades sobre una columna indexada.
+# NO VALIDADOS incluye a los fallecidos.
+CORTE_VALIDATED_FILTER = Q(estado_validacion="VALIDADO")
+CORTE_NON_VALIDATED_FILTER = Q(estado_validacion__in=["NO_VALIDADO", "FALLECIDO"])
 
 
 def _format_month_label(year: int, month: int) -> str:
@@ -172,33 +169,74 @@ def _format_month_key(year: int, month: int) -> str:
     return f"{year:04d}-{month:02d}"
 
 
-def _safe_str(value, *, max_length: int | None = None) -> str:
-    text = "" if value is None else str(value).strip()
-    if max_length is not None:
-        return text[:max_length]
-    return text
-def _parse_date(value: str | None) -> date | None:
-    if not value:
-        return None
+def _month_date_range(year: int, month: int) -> Tuple[date, date]:
+    """Rango semiabierto [primer día del mes, primer día del mes siguiente)."""
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
 
-    if isinstance(value, datetime):
-        return value.date()
 
-    for fmt in ("%Y-%m-%d", "%d-%m-%Y", "%Y/%m/%d", "%d/%m/%Y"):
-        try:
-            return datetime.strptime(value.strip(), fmt).date()
-        except (ValueError, TypeError):
-            continue
-    return None
+def _month_filter(field: str, year: int, month: int) -> Q:
+    """
+    Filtro de un mes sobre el campo de fecha `field` como rango semiabierto, en vez
+    de `field__year`/`field__month`: PostgreSQL solo usa los índices de la columna
+    con comparaciones directas, no con EXTRACT.
+    """
+    start, end = _month_date_range(year, month)
+    return Q(**{f"{field}__gte": start, f"{field}__lt": end})
 
 
-def _parse_int(value: str | None) -> int | None:
-    if value in (None, ""):
-        return None
-    try:
-        return int(str(value).strip())
-    except (TypeError, ValueError):
-        return None
+def _months_filter(field: str, months: Iterable[Tuple[int, int]]) -> Q:
+    """OR de `_month_filter` para varios meses (Q vacío si no hay meses)."""
+    months_q = Q()
+    for year, month in sorted(set(months)):
+        months_q |= _month_filter(field, year, month)
+    return months_q
+
+
+def _delete_sin_colector(queryset, *, relaciones_eliminadas: Iterable[type] = ()) -> int:
+    """
+    Elimina las filas de `queryset` con un único DELETE ... WHERE id IN (SELECT ...),
+    sin el colector de Django, que cargaría cada fila para resolver cascadas y
+    señales. Quien llama debe haber eliminado antes las filas relacionadas de
+    `relaciones_eliminadas`; si el modelo tiene otras relaciones inversas se lanza
+    RuntimeError en vez de dejarlas huérfanas. No envía señales pre/post_delete.
+    Retorna la cantidad de filas eliminadas.
+    """
+    model = queryset.model
+    pendientes = {rel.related_model for rel in model._meta.related_objects} - set(relaciones_eliminadas)
+    if pendientes:
+        nombres = ", ".join(sorted(related.__name__ for related in pendientes))
+        raise RuntimeError(f"{model.__name__} tiene relaciones que este DELETE no elimina: {nombres}")
+
+    ids_sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(model._meta.db_table)} WHERE {quote(model._meta.pk.column)} IN ({ids_sql})",
+            params,
+        )
+        return cursor.rowcount
+
+
+def _delete_corte_months(months: Iterable[Tuple[int, int]] | None = None) -> int:
+    """
+    Elimina los registros del corte de los meses indicados (None = todos).
+
+    Se usan sentencias por conjunto sobre el rango de fechas de cada mes: primero
+    las observaciones asociadas y luego un DELETE directo de los registros, sin
+    cargarlos en memoria para resolver la cascada. Retorna la cantidad eliminada.
+    """
+    queryset = CorteFonasa.objects.all()
+    if months is not None:
+        months_q = _months_filter("fecha_corte", months)
+        if not months_q:
+            return 0
+        queryset = queryset.filter(months_q)
+
+    CorteFonasaObservacion.objects.filter(corte__in=queryset.values("id")).delete()
+    bump_data_version("corte")
+    return _delete_sin_colector(queryset, relaciones_eliminadas=[CorteFonasaObservacion])
 
 
 def get_rut_from_token(token: str | None) -> str | None:
@@ -243,69 +281,781 @@ def _motivo_priority(value: str | None) -> int:
     return 0
 
 
+def _sort_by_motivo_priority(prepared_records: List[Tuple[Dict[str, str], date | None]]) -> None:
+    """Ordena (en el lugar) los registros de una carga: los no validados al final."""
+    prepared_records.sort(key=lambda item: _motivo_priority(item[0].get("motivo")))
+
+
+# Campos que necesita el payload de una fila del corte (listados por .values())
+CORTE_PAYLOAD_FIELDS = (
+    "id",
+    "run",
+    "nombres",
+    "ap_paterno",
+    "ap_materno",
+    "fecha_nacimiento",
+    "genero",
+    "tramo",
+    "fecha_corte",
+    "nombre_centro",
+    "centro_de_procedencia",
+    "comuna_de_procedencia",
+    "centro_actual",
+    "comuna_actual",
+    "aceptado_rechazado",
+    "motivo",
+    "estado_validacion",
+)
+
+
+def _corte_payload_from_values(row: Dict) -> Dict[str, str | None]:
+    return {
+        "id": row["id"],
+        "run": row["run"],
+        "nombres": row["nombres"],
+        "apPaterno": row["ap_paterno"],
+        "apMaterno": row["ap_materno"],
+        "fechaNacimiento": row["fecha_nacimiento"].isoformat() if row["fecha_nacimiento"] else "",
+        "genero": row["genero"],
+        "tramo": row["tramo"],
+        "fehcaCorte": row["fecha_corte"].isoformat(),
+        "nombreCentro": row["nombre_centro"],
+        "centroDeProcedencia": row["centro_de_procedencia"],
+        "comunaDeProcedencia": row["comuna_de_procedencia"],
+        "centroActual": row["centro_actual"],
+        "comunaActual": row["comuna_actual"],
+        "aceptadoRechazado": row["aceptado_rechazado"],
+        "motivo": row["motivo"],
+        "isValidated": row["estado_validacion"] == "VALIDADO",
+    }
+
+
 def _build_corte_payload(instance: CorteFonasa) -> Dict[str, str | None]:
+    return _corte_payload_from_values({field: getattr(instance, field) for field in CORTE_PAYLOAD_FIELDS})
+
+
+# Orden estable del listado del corte; el cursor codifica la última fila entregada
+CORTE_LIST_ORDERING = ("-fecha_corte", "run", "id")
+
+
+def _encode_corte_cursor(instance: CorteFonasa) -> str:
+    raw = json.dumps([instance.fecha_corte.isoformat(), instance.run, instance.id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_corte_cursor(value: str) -> Tuple[date, str, int] | None:
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        fecha_text, run, pk = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return date.fromisoformat(fecha_text), str(run), int(pk)
+    except (TypeError, ValueError, UnicodeError, binascii.Error):
+        return None
+
+
+def _corte_after_cursor_filter(cursor: Tuple[date, str, int]) -> Q:
+    """Filas posteriores al cursor según CORTE_LIST_ORDERING (fecha desc, run asc, id asc)."""
+    fecha_corte, run, pk = cursor
+    return (
+        Q(fecha_corte__lt=fecha_corte)
+        | Q(fecha_corte=fecha_corte, run__gt=run)
+        | Q(fecha_corte=fecha_corte, run=run, id__gt=pk)
+    )
+
+
+# Campos que necesita el payload de HP Trakcare; los catálogos se leen con un JOIN
+TRAKCARE_PAYLOAD_FIELDS = (
+    "id",
+    "cod_familia",
+    "relacion_parentezco",
+    "id_trakcare",
+    "cod_registro",
+    "run",
+    "ap_paterno",
+    "ap_materno",
+    "nombre",
+    "genero",
+    "fecha_nacimiento",
+    "edad",
+    "direccion",
+    "telefono",
+    "telefono_celular",
+    "telefono_recado",
+    "servicio_salud",
+    "prevision",
+    "plan_trakcare",
+    "prais_trakcare",
+    "fecha_incorporacion",
+    "fecha_ultima_modif",
+    "fecha_defuncion",
+    "etnia__nombre",
+    "nacionalidad__nombre",
+    "centro_inscripcion__nombre",
+    "sector__nombre",
+)
+
+
+def _trakcare_payload_from_values(row: Dict) -> Dict[str, str | int | None]:
     return {
-        "id": instance.id,
-        "run": instance.run,
-        "nombres": instance.nombres,
-        "apPaterno": instance.ap_paterno,
-        "apMaterno": instance.ap_materno,
-        "fechaNacimiento": instance.fecha_nacimiento.isoformat() if instance.fecha_nacimiento else "",
-        "genero": instance.genero,
-        "tramo": instance.tramo,
-        "fehcaCorte": instance.fecha_corte.isoformat(),
-        "nombreCentro": instance.nombre_centro,
-        "centroDeProcedencia": instance.centro_de_procedencia,
-        "comunaDeProcedencia": instance.comuna_de_procedencia,
-        "centroActual": instance.centro_actual,
-        "comunaActual": instance.comuna_actual,
-        "aceptadoRechazado": instance.aceptado_rechazado,
-        "motivo": instance.motivo,
-        "isValidated": _is_validated_corte(instance.aceptado_rechazado, instance.motivo),
+        "id": row["id"],
+        "codFamilia": row["cod_familia"] or None,
+        "relacionParentezco": row["relacion_parentezco"] or None,
+        "idTrakcare": row["id_trakcare"] or None,
+        "codRegistro": row["cod_registro"] or None,
+        "RUN": row["run"] or None,
+        "apPaterno": row["ap_paterno"] or None,
+        "apMaterno": row["ap_materno"] or None,
+        "nombre": row["nombre"] or None,
+        "genero": row["genero"] or None,
+        "fechaNacimiento": row["fecha_nacimiento"].isoformat() if row["fecha_nacimiento"] else None,
+        "edad": row["edad"],
+        "direccion": row["direccion"] or None,
+        "telefono": row["telefono"] or None,
+        "telefonoCelular": row["telefono_celular"] or None,
+        "TelefonoRecado": row["telefono_recado"] or None,
+        "telefonoRecado": row["telefono_recado"] or None,
+        "servicioSalud": row["servicio_salud"] or None,
+        "prevision": row["prevision"] or None,
+        "planTrakcare": row["plan_trakcare"] or None,
+        "praisTrakcare": row["prais_trakcare"] or None,
+        "fechaIncorporacion": row["fecha_incorporacion"].isoformat() if row["fecha_incorporacion"] else None,
+        "fechaUltimaModif": row["fecha_ultima_modif"].isoformat() if row["fecha_ultima_modif"] else None,
+        "fechaDefuncion": row["fecha_defuncion"].isoformat() if row["fecha_defuncion"] else None,
+        # Relaciones normalizadas
+        "etnia": row["etnia__nombre"],
+        "nacionalidad": row["nacionalidad__nombre"],
+        "centroInscripcion": row["centro_inscripcion__nombre"],
+        "sector": row["sector__nombre"],
     }
 
 
 def _build_trakcare_payload(instance: HpTrakcare) -> Dict[str, str | int | None]:
     """Construye un payload serializable con los datos principales de HP Trakcare."""
+    row = {}
+    for field in TRAKCARE_PAYLOAD_FIELDS:
+        relation, _, attribute = field.partition("__")
+        value = getattr(instance, relation)
+        row[field] = (getattr(value, attribute) if value else None) if attribute else value
+    return _trakcare_payload_from_values(row)
+
+
+# Filas por iteración al recorrer listados completos con .iterator()
+STREAMING_CHUNK_SIZE = 2000
+
+
+def _wants_ndjson(request) -> bool:
+    return "application/x-ndjson" in request.headers.get("Accept", "")
+
+
+def _streaming_listing_response(request, header: Dict, rows: Iterable[Dict]) -> StreamingHttpResponse:
+    """
+    Respuesta de un listado completo que se genera mientras se leen las filas, con
+    memoria constante sin importar el tamaño del resultado.
+
+    - JSON (por defecto): el mismo documento que la respuesta paginada, con los
+      campos de `header` y la lista "rows".
+    - NDJSON (Accept: application/x-ndjson): una primera línea con `header` y
+      luego una línea por fila.
+    """
+    def dumps(value) -> str:
+        return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(",", ":"))
+
+    if _wants_ndjson(request):
+        def generate_ndjson():
+            yield dumps(header) + "\n"
+            buffer = []
+            for row in rows:
+                buffer.append(dumps(row))
+                if len(buffer) >= STREAMING_CHUNK_SIZE:
+                    yield "\n".join(buffer) + "\n"
+                    buffer = []
+            if buffer:
+                yield "\n".join(buffer) + "\n"
+
+        return StreamingHttpResponse(generate_ndjson(), content_type="application/x-ndjson; charset=utf-8")
+
+    def generate_json():
+        # Se reabre el objeto de cabecera para agregar "rows" al final
+        yield dumps(header)[:-1] + ',"rows":['
+        buffer = []
+        first = True
+        for row in rows:
+            buffer.append(dumps(row))
+            if len(buffer) >= STREAMING_CHUNK_SIZE:
+                yield ("" if first else ",") + ",".join(buffer)
+                first = False
+                buffer = []
+        if buffer:
+            yield ("" if first else ",") + ",".join(buffer)
+        yield "]}"
+
+    return StreamingHttpResponse(generate_json(), content_type="application/json; charset=utf-8")
+
+
+def _get_corte_batch_size() -> int:
+    return max(int(getattr(settings, "CORTE_BULK_BATCH_SIZE", 5000)), 1)
+
+
+@contextmanager
+def _medir_etapa(etapas: Dict[str, float], nombre: str):
+    """Acumula en etapas[nombre] los segundos transcurridos dentro del bloque."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        etapas[nombre] = etapas.get(nombre, 0.0) + time.perf_counter() - inicio
+
+
+def _is_async_request(request) -> bool:
+    return request.query_params.get("async", "").lower() in {"1", "true", "yes"}
+
+
+def _encolar_carga(request, *, tipo_carga: str, **kwargs):
+    usuario_nombre, ip_address = _resolve_carga_origen(request)
+    archivo = kwargs.get("archivo")
+    nombre_archivo = archivo.name if archivo else _safe_str(request.data.get("nombre_archivo"))
+    return encolar_trabajo(
+        tipo_carga=tipo_carga,
+        usuario=usuario_nombre,
+        ip_address=ip_address,
+        nombre_archivo=nombre_archivo,
+        **kwargs,
+    )
 
-    etnia = instance.etnia
-    nacionalidad = instance.nacionalidad
-    centro_inscripcion = instance.centro_inscripcion
-    sector = instance.sector
 
+def _build_trabajo_accepted_response(trabajo) -> Response:
+    return Response(
+        {
+            "job_id": trabajo.pk,
+            "historial_id": trabajo.historial_id,
+            "estado": trabajo.estado,
+            "status_url": f"/api/jobs/{trabajo.pk}/",
+        },
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
+def _bulk_insert_cortes(
+    prepared_records: List[Tuple[Dict[str, str], date | None]],
+    *,
+    batch_size: int | None = None,
+    start_index: int = 0,
+    stats_deltas: Dict[Tuple[int, int, str], List[int]] | None = None,
+    staging_carga: uuid.UUID | None = None,
+    normalized: List[tuple | None] | None = None,
+) -> Tuple[int, List[Dict[str, str]]]:
+    """
+    Inserta registros del corte en lotes con bulk_create.
+
+    Normaliza los registros (ver normalizacion.normalizar_cortes), salvo que se
+    entreguen ya normalizados en `normalized`, y los escribe con un solo INSERT
+    multi-fila por lote, en lugar de un INSERT por registro.
+    Debe llamarse dentro de una transacción.
+    Si se entrega stats_deltas, acumula ahí los totales por mes y centro de los
+    registros insertados (ver _apply_corte_stats_deltas).
+    Si se entrega staging_carga, los registros se escriben en CorteFonasaStaging
+    bajo ese identificador de carga (ver _swap_staged_cortes).
+    Retorna la cantidad de registros creados y la lista de registros inválidos.
+    """
+    batch_size = batch_size or _get_corte_batch_size()
+    model = CorteFonasaStaging if staging_carga else CorteFonasa
+    created = 0
+    skipped: List[Dict[str, str]] = []
+    batch: List[CorteFonasa | CorteFonasaStaging] = []
+
+    # bulk_create no llama a save(): el RUN y el motivo ya vienen normalizados
+    if normalized is None:
+        normalized = normalizar_cortes(prepared_records)
+
+    for index, values in enumerate(normalized, start=start_index):
+        if values is None:
+            skipped.append({"index": index, "motivo": "RUN o fecha de corte inválidos"})
+            continue
+
+        fields = dict(zip(CORTE_FIELDS, values))
+        instance = CorteFonasaStaging(carga=staging_carga, **fields) if staging_carga else CorteFonasa(**fields)
+        if stats_deltas is not None:
+            _add_corte_stats_delta(stats_deltas, instance)
+        batch.append(instance)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch, batch_size=batch_size)
+            created += len(batch)
+            batch = []
+
+    if batch:
+        model.objects.bulk_create(batch, batch_size=batch_size)
+        created += len(batch)
+
+    # Los registros preparados no son visibles hasta _swap_staged_cortes
+    if created and not staging_carga:
+        bump_data_version("corte")
+
+    return created, skipped
+
+
+# Columnas compartidas entre CorteFonasaStaging y CorteFonasa
+_CORTE_STAGING_FIELDS = [
+    field.name
+    for field in CorteFonasaStaging._meta.concrete_fields
+    if field.name not in {"id", "carga"}
+]
+
+
+def _swap_staged_cortes(carga: uuid.UUID, months: Iterable[Tuple[int, int]] = ()) -> int:
+    """
+    Traspasa a CorteFonasa los registros preparados de una carga, reemplazando
+    los meses indicados más los presentes en la carga.
+
+    Debe llamarse dentro de una transacción: se eliminan los meses, se copian los
+    registros con un único INSERT ... SELECT, se recalculan las estadísticas y se
+    vacía la carga preparada. Los lectores ven el mes anterior hasta el commit.
+    Retorna la cantidad de registros traspasados.
+    """
+    staged = CorteFonasaStaging.objects.filter(carga=carga)
+    months = set(months) | {
+        (value.year, value.month) for value in staged.dates("fecha_corte", "month")
+    }
+
+    _delete_corte_months(months)
+
+    quote = connection.ops.quote_name
+    columns = ", ".join(
+        quote(CorteFonasaStaging._meta.get_field(name).column) for name in _CORTE_STAGING_FIELDS
+    )
+    carga_field = CorteFonasaStaging._meta.get_field("carga")
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(CorteFonasa._meta.db_table)} ({columns}) "
+            f"SELECT {columns} FROM {quote(CorteFonasaStaging._meta.db_table)} "
+            f"WHERE {quote(carga_field.column)} = %s ORDER BY {quote('id')}",
+            [carga_field.get_db_prep_value(carga, connection)],
+        )
+        swapped = cursor.rowcount
+
+    staged.delete()
+    _refresh_corte_monthly_stats(months)
+    return swapped
+
+
+# Una sesión de carga sin chunks nuevos en este plazo se considera abandonada
+_CORTE_SESION_EXPIRACION = timedelta(days=1)
+
+
+def _purge_stale_corte_staging() -> None:
+    """
+    Descarta cargas preparadas abandonadas. Las sesiones ABIERTAS se juzgan por su
+    propia actividad (último chunk recibido o apertura): las inactivas pasan a
+    EXPIRADA, ya no se pueden finalizar, y se eliminan sus registros preparados.
+    Los de sesiones FINALIZADAS también se eliminan. Las cargas con reemplazo sin
+    sesión (archivo o trabajos) se descartan por la antigüedad de sus filas.
+    """
+    limite = timezone.now() - _CORTE_SESION_EXPIRACION
+    inactivas = (
+        SesionCargaCorte.objects.filter(estado="ABIERTA")
+        .annotate(ultima_actividad=Coalesce(Max("chunks__recibido_el"), "creado_el"))
+        .filter(ultima_actividad__lt=limite)
+        .values_list("pk", flat=True)
+    )
+    # La condición sobre el estado se vuelve a evaluar al actualizar: una sesión
+    # que se finaliza en paralelo (bloqueada) no queda expirada
+    SesionCargaCorte.objects.filter(pk__in=list(inactivas), estado="ABIERTA").update(
+        estado="EXPIRADA", finalizado_el=timezone.now()
+    )
+
+    sesiones = SesionCargaCorte.objects.values("token")
+    CorteFonasaStaging.objects.filter(
+        Q(carga__in=sesiones.exclude(estado="ABIERTA"))
+        | (Q(creado_el__lt=limite) & ~Q(carga__in=sesiones))
+    ).delete()
+
+
+def _add_corte_stats_delta(stats_deltas: Dict[Tuple[int, int, str], List[int]], instance: CorteFonasa) -> None:
+    validated = instance.estado_validacion == "VALIDADO"
+    non_validated = not validated
+    key = (instance.fecha_corte.year, instance.fecha_corte.month, instance.nombre_centro or "")
+    counters = stats_deltas.setdefault(key, [0, 0, 0, 0])
+    counters[0] += 1
+    counters[1] += int(validated)
+    counters[2] += int(non_validated)
+    counters[3] += int(instance.estado_validacion == "FALLECIDO")
+
+
+def _apply_corte_stats_deltas(stats_deltas: Dict[Tuple[int, int, str], List[int]]) -> None:
+    """Suma a CorteMonthlyStats los totales acumulados durante una carga."""
+    if not stats_deltas:
+        return
+
+    # Crear primero las filas faltantes: otra carga concurrente (p. ej. chunks en
+    # paralelo) puede estar creando las mismas, por eso se ignoran los conflictos.
+    CorteMonthlyStats.objects.bulk_create(
+        [
+            CorteMonthlyStats(periodo_anio=year, periodo_mes=month, nombre_centro=nombre_centro)
+            for year, month, nombre_centro in stats_deltas
+        ],
+        ignore_conflicts=True,
+    )
+
+    months_q = Q()
+    for year, month in {(year, month) for year, month, _ in stats_deltas}:
+        months_q |= Q(periodo_anio=year, periodo_mes=month)
+
+    # Bloqueo en orden fijo para evitar deadlocks entre cargas concurrentes
+    existing = {
+        (item.periodo_anio, item.periodo_mes, item.nombre_centro): item
+        for item in CorteMonthlyStats.objects.select_for_update()
+        .filter(months_q)
+        .order_by("periodo_anio", "periodo_mes", "nombre_centro")
+    }
+
+    now = timezone.now()
+    to_update: List[CorteMonthlyStats] = []
+    for key, (total, validados, no_validados, fallecidos) in stats_deltas.items():
+        item = existing[key]
+        item.total += total
+        item.validados += validados
+        item.no_validados += no_validados
+        item.fallecidos += fallecidos
+        item.actualizado_el = now
+        to_update.append(item)
+
+    CorteMonthlyStats.objects.bulk_update(
+        to_update, ["total", "validados", "no_validados", "fallecidos", "actualizado_el"]
+    )
+
+
+def _previous_corte_month(year: int, month: int) -> Tuple[int, int] | None:
+    """Último mes cargado anterior al indicado."""
+    month_start, _ = _month_date_range(year, month)
+    previous = CorteFonasa.objects.filter(fecha_corte__lt=month_start).aggregate(
+        ultima=Max("fecha_corte")
+    )["ultima"]
+    return (previous.year, previous.month) if previous else None
+
+
+def _next_corte_month(year: int, month: int) -> Tuple[int, int] | None:
+    """Primer mes cargado posterior al indicado."""
+    _, month_end = _month_date_range(year, month)
+    following = CorteFonasa.objects.filter(fecha_corte__gte=month_end).aggregate(
+        primera=Min("fecha_corte")
+    )["primera"]
+    return (following.year, following.month) if following else None
+
+
+# Último registro de cada RUN dentro de un rango de fechas del corte
+_CORTE_DELTA_SNAPSHOT_SQL = (
+    "SELECT run, tramo, nombre_centro, motivo_normalizado, "
+    "TRIM(nombres || ' ' || ap_paterno || ' ' || ap_materno) AS nombre "
+    "FROM {corte} WHERE id IN ("
+    "SELECT MAX(id) FROM {corte} WHERE fecha_corte >= %s AND fecha_corte < %s GROUP BY run"
+    ")"
+)
+
+_CORTE_DELTA_INSERT_SQL = (
+    "WITH cur AS ({snapshot}), prev AS ({snapshot}) "
+    "INSERT INTO {delta} ("
+    "periodo_anio, periodo_mes, anterior_anio, anterior_mes, run, tipo, nombre, "
+    "tramo_anterior, tramo_actual, centro_anterior, centro_actual, motivo_anterior, motivo_actual, "
+    "cambio_tramo, cambio_centro, cambio_motivo"
+    ") "
+    "SELECT %s, %s, %s, %s, cur.run, 'ALTA', cur.nombre, "
+    "'', cur.tramo, '', cur.nombre_centro, '', cur.motivo_normalizado, FALSE, FALSE, FALSE "
+    "FROM cur LEFT JOIN prev ON prev.run = cur.run WHERE prev.run IS NULL "
+    "UNION ALL "
+    "SELECT %s, %s, %s, %s, prev.run, 'BAJA', prev.nombre, "
+    "prev.tramo, '', prev.nombre_centro, '', prev.motivo_normalizado, '', FALSE, FALSE, FALSE "
+    "FROM prev LEFT JOIN cur ON cur.run = prev.run WHERE cur.run IS NULL "
+    "UNION ALL "
+    "SELECT %s, %s, %s, %s, cur.run, 'CAMBIO', cur.nombre, "
+    "prev.tramo, cur.tramo, prev.nombre_centro, cur.nombre_centro, "
+    "prev.motivo_normalizado, cur.motivo_normalizado, "
+    "prev.tramo <> cur.tramo, prev.nombre_centro <> cur.nombre_centro, "
+    "prev.motivo_normalizado <> cur.motivo_normalizado "
+    "FROM cur JOIN prev ON prev.run = cur.run "
+    "WHERE prev.tramo <> cur.tramo OR prev.nombre_centro <> cur.nombre_centro "
+    "OR prev.motivo_normalizado <> cur.motivo_normalizado"
+)
+
+
+def _compute_corte_delta(year: int, month: int) -> None:
+    """
+    Calcula las altas, bajas y cambios (tramo, centro, motivo) del mes respecto
+    del mes cargado anterior con un único INSERT ... SELECT.
+    """
+    CorteFonasaDelta.objects.filter(periodo_anio=year, periodo_mes=month).delete()
+
+    month_start, month_end = _month_date_range(year, month)
+    if not CorteFonasa.objects.filter(fecha_corte__gte=month_start, fecha_corte__lt=month_end).exists():
+        return
+
+    previous = _previous_corte_month(year, month)
+    if previous is None:
+        # Primer corte cargado: no hay contra qué comparar
+        return
+    previous_start, previous_end = _month_date_range(*previous)
+
+    quote = connection.ops.quote_name
+    snapshot = _CORTE_DELTA_SNAPSHOT_SQL.format(corte=quote(CorteFonasa._meta.db_table))
+    sql = _CORTE_DELTA_INSERT_SQL.format(
+        snapshot=snapshot, delta=quote(CorteFonasaDelta._meta.db_table)
+    )
+    periodos = [year, month, previous[0], previous[1]]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql,
+            [month_start, month_end, previous_start, previous_end] + periodos * 3,
+        )
+
+
+def _refresh_corte_deltas(months: Iterable[Tuple[int, int]] | None = None) -> None:
+    """
+    Recalcula CorteFonasaDelta para los meses indicados y para el mes cargado
+    siguiente a cada uno, cuyo corte anterior pudo cambiar. Si months es None,
+    recalcula todos los meses cargados.
+    """
+    if months is None:
+        CorteFonasaDelta.objects.all().delete()
+        targets = {
+            (value.year, value.month) for value in CorteFonasa.objects.dates("fecha_corte", "month")
+        }
+    else:
+        targets = set(months)
+        for year, month in list(targets):
+            following = _next_corte_month(year, month)
+            if following:
+                targets.add(following)
+
+    for year, month in sorted(targets):
+        _compute_corte_delta(year, month)
+
+
+def _refresh_corte_monthly_stats(months: Iterable[Tuple[int, int]] | None = None) -> None:
+    """
+    Recalcula CorteMonthlyStats desde CorteFonasa para los meses indicados.
+    Si months es None, reconstruye la tabla completa.
+    """
+    stats_queryset = CorteMonthlyStats.objects.all()
+    cortes_queryset = CorteFonasa.objects.all()
+
+    if months is not None:
+        months = set(months)
+        if not months:
+            return
+        stats_q = Q()
+        for year, month in months:
+            stats_q |= Q(periodo_anio=year, periodo_mes=month)
+        stats_queryset = stats_queryset.filter(stats_q)
+        cortes_queryset = cortes_queryset.filter(_months_filter("fecha_corte", months))
+
+    grouped = (
+        cortes_queryset.values("fecha_corte__year", "fecha_corte__month", "nombre_centro")
+        .annotate(
+            total=Count("id"),
+            validados=Count("id", filter=CORTE_VALIDATED_FILTER),
+            no_validados=Count("id", filter=CORTE_NON_VALIDATED_FILTER),
+            fallecidos=Count("id", filter=Q(estado_validacion="FALLECIDO")),
+        )
+        .order_by()
+    )
+
+    with transaction.atomic():
+        stats_queryset.delete()
+        CorteMonthlyStats.objects.bulk_create(
+            [
+                CorteMonthlyStats(
+                    periodo_anio=item["fecha_corte__year"],
+                    periodo_mes=item["fecha_corte__month"],
+                    nombre_centro=item["nombre_centro"] or "",
+                    total=item["total"],
+                    validados=item["validados"],
+                    no_validados=item["no_validados"],
+                    fallecidos=item["fallecidos"],
+                )
+                for item in grouped
+            ]
+        )
+
+
+def _rollup_corte_stats(
+    grouped_rows: Iterable[Tuple[int, int, str, int, int, int]],
+    *,
+    centros_list: List[str] | None = None,
+    validated_only: bool = False,
+    non_validated_only: bool = False,
+):
+    """
+    Consolida filas (año, mes, centro, total, validados, no validados) en total,
+    validados, no validados, resumen mensual y desglose por centro.
+
+    Las filas deben venir ordenadas por centro y mes descendente.
+    """
+    total_count = 0
+    validated_count = 0
+    non_validated_count = 0
+    months: Dict[Tuple[int, int], List[int]] = {}
+    centros_data: Dict[str, list] = {}
+
+    for year, month, nombre_centro, total, validados, no_validados in grouped_rows:
+        total_count += total
+        # El total general no depende del filtro de validados/no validados
+        if validated_only:
+            row_total, row_validated, row_non_validated = validados, validados, 0
+        elif non_validated_only:
+            row_total, row_validated, row_non_validated = no_validados, 0, no_validados
+        else:
+            row_total, row_validated, row_non_validated = total, validados, no_validados
+
+        validated_count += row_validated
+        non_validated_count += row_non_validated
+
+        counters = months.setdefault((year, month), [0, 0, 0])
+        counters[0] += row_total
+        counters[1] += row_validated
+        counters[2] += row_non_validated
+
+        if centros_list and nombre_centro in centros_list and row_total:
+            centros_data.setdefault(nombre_centro, []).append({
+                "month": _format_month_key(year, month),
+                "label": _format_month_label(year, month),
+                "total": row_total,
+                "validated": row_validated,
+                "nonValidated": row_non_validated,
+            })
+
+    summary = [
+        {
+            "month": _format_month_key(year, month),
+            "label": _format_month_label(year, month),
+            "total": counters[0],
+            "validated": counters[1],
+            "nonValidated": counters[2],
+        }
+        for (year, month), counters in sorted(months.items(), reverse=True)
+        if counters[0]
+    ]
+    by_centro = [{"centro": nombre, "data": data} for nombre, data in centros_data.items()]
+
+    return total_count, validated_count, non_validated_count, summary, by_centro
+
+
+def _corte_totals_from_stats(
+    month_filter: Tuple[int, int] | None,
+    *,
+    centro: str = "",
+    centros_list: List[str] | None = None,
+    validated_only: bool = False,
+    non_validated_only: bool = False,
+):
+    """
+    Calcula total, validados, no validados, resumen mensual y desglose por centro
+    del listado del corte leyendo CorteMonthlyStats (O(meses x centros)).
+    """
+    stats_queryset = CorteMonthlyStats.objects.all()
+    if month_filter:
+        year, month = month_filter
+        stats_queryset = stats_queryset.filter(periodo_anio=year, periodo_mes=month)
+    if centro:
+        stats_queryset = stats_queryset.filter(nombre_centro__icontains=centro)
+    elif centros_list:
+        stats_queryset = stats_queryset.filter(nombre_centro__in=centros_list)
+
+    grouped_rows = stats_queryset.order_by("nombre_centro", "-periodo_anio", "-periodo_mes").values_list(
+        "periodo_anio", "periodo_mes", "nombre_centro", "total", "validados", "no_validados"
+    )
+    return _rollup_corte_stats(
+        grouped_rows,
+        centros_list=centros_list,
+        validated_only=validated_only,
+        non_validated_only=non_validated_only,
+    )
+
+
+def _corte_totals_from_queryset(
+    queryset,
+    *,
+    centros_list: List[str] | None = None,
+    validated_only: bool = False,
+    non_validated_only: bool = False,
+):
+    """
+    Igual que _corte_totals_from_stats, pero sobre un queryset arbitrario de
+    CorteFonasa (p. ej. con búsqueda por texto): una sola consulta agrupada por
+    mes y centro, consolidada en Python.
+    """
+    grouped_rows = (
+        queryset.values_list("fecha_corte__year", "fecha_corte__month", "nombre_centro")
+        .annotate(
+            total=Count("id"),
+            validados=Count("id", filter=CORTE_VALIDATED_FILTER),
+            no_validados=Count("id", filter=CORTE_NON_VALIDATED_FILTER),
+        )
+        .order_by("nombre_centro", "-fecha_corte__year", "-fecha_corte__month")
+    )
+    return _rollup_corte_stats(
+        grouped_rows,
+        centros_list=centros_list,
+        validated_only=validated_only,
+        non_validated_only=non_validated_only,
+    )
+
+
+def _corte_listing_params(request) -> Dict:
+    """Parámetros de filtro del listado del corte (compartidos con la exportación)."""
+    centros = request.query_params.get("centros")
     return {
-        "id": instance.id,
-        "codFamilia": instance.cod_familia or None,
-        "relacionParentezco": instance.relacion_parentezco or None,
-        "idTrakcare": instance.id_trakcare or None,
-        "codRegistro": instance.cod_registro or None,
-        "RUN": instance.run or None,
-        "apPaterno": instance.ap_paterno or None,
-        "apMaterno": instance.ap_materno or None,
-        "nombre": instance.nombre or None,
-        "genero": instance.genero or None,
-        "fechaNacimiento": instance.fecha_nacimiento.isoformat() if instance.fecha_nacimiento else None,
-        "edad": instance.edad,
-        "direccion": instance.direccion or None,
-        "telefono": instance.telefono or None,
-        "telefonoCelular": instance.telefono_celular or None,
-        "TelefonoRecado": instance.telefono_recado or None,
-        "telefonoRecado": instance.telefono_recado or None,
-        "servicioSalud": instance.servicio_salud or None,
-        "prevision": instance.prevision or None,
-        "planTrakcare": instance.plan_trakcare or None,
-        "praisTrakcare": instance.prais_trakcare or None,
-        "fechaIncorporacion": instance.fecha_incorporacion.isoformat() if instance.fecha_incorporacion else None,
-        "fechaUltimaModif": instance.fecha_ultima_modif.isoformat() if instance.fecha_ultima_modif else None,
-        "fechaDefuncion": instance.fecha_defuncion.isoformat() if instance.fecha_defuncion else None,
-        # Relaciones normalizadas
-        "etnia": etnia.nombre if etnia else None,
-        "nacionalidad": nacionalidad.nombre if nacionalidad else None,
-        "centroInscripcion": centro_inscripcion.nombre if centro_inscripcion else None,
-        "sector": sector.nombre if sector else None,
+        "month_filter": _parse_month(request.query_params.get("month")),
+        "search_term": _safe_str(request.query_params.get("search")),
+        "centro": _safe_str(request.query_params.get("centro")),
+        # Soporte para múltiples centros separados por coma
+        "centros_list": [c.strip() for c in centros.split(",") if c.strip()] if centros else [],
+        # Filtrar solo validados o no validados
+        "validated_only": request.query_params.get("validated_only", "").lower() in {"1", "true", "yes"},
+        "non_validated_only": request.query_params.get("non_validated_only", "").lower() in {"1", "true", "yes"},
     }
 
 
+def _filter_corte_listing(queryset, params: Dict, *, include_validation: bool = True):
+    if params["month_filter"]:
+        queryset = queryset.filter(_month_filter("fecha_corte", *params["month_filter"]))
+    search_term = params["search_term"]
+    if search_term:
+        queryset = queryset.filter(
+            Q(run__icontains=search_term)
+            | Q(nombres__icontains=search_term)
+            | Q(ap_paterno__icontains=search_term)
+            | Q(ap_materno__icontains=search_term)
+        )
+    # Filtro opcional por centro (nombre del centro en el corte FONASA)
+    if params["centro"]:
+        queryset = queryset.filter(Q(nombre_centro__icontains=params["centro"]))
+    # Filtro por múltiples centros
+    elif params["centros_list"]:
+        queryset = queryset.filter(nombre_centro__in=params["centros_list"])
+
+    if include_validation:
+        if params["validated_only"]:
+            queryset = queryset.filter(CORTE_VALIDATED_FILTER)
+        elif params["non_validated_only"]:
+            queryset = queryset.filter(CORTE_NON_VALIDATED_FILTER)
+    return queryset
+
+
+def _filter_trakcare_listing(request, queryset):
+    """Filtros del listado de HP Trakcare (compartidos con la exportación)."""
+    month_filter = _parse_month(request.query_params.get("month"))
+    search_term = _safe_str(request.query_params.get("search"))
+
+    if month_filter:
+        queryset = queryset.filter(_month_filter("fecha_incorporacion", *month_filter))
+    if search_term:
+        queryset = queryset.filter(
+            Q(run__icontains=search_term)
+            | Q(nombre__icontains=search_term)
+            | Q(ap_paterno__icontains=search_term)
+            | Q(ap_materno__icontains=search_term)
+            | Q(cod_registro__icontains=search_term)
+        )
+    return queryset
+
+
 def _check_admin_password(request) -> Tuple[bool, Response | None]:
     expected = getattr(settings, "ADMIN_DELETE_PASSWORD", "")
     if not expected:
@@ -327,13 +1077,17 @@ def _validar_nuevos_usuarios_con_corte():
     """
     Valida automáticamente los nuevos usuarios contra el último corte disponible.
     Se ejecuta cada vez que se sube un nuevo corte.
+
+    La validación es por conjuntos: una sola consulta cruza los usuarios pendientes
+    del mes anterior con los registros del corte, y los estados se escriben con un
+    UPDATE por estado, por lo que la cantidad de consultas no depende del tamaño
+    de la cohorte.
     """
     # Obtener el último corte disponible
-    ultimo_corte = CorteFonasa.objects.order_by('-fecha_corte').first()
-    if not ultimo_corte:
+    fecha_corte = CorteFonasa.objects.aggregate(ultima=Max("fecha_corte"))["ultima"]
+    if not fecha_corte:
         return
     
-    fecha_corte = ultimo_corte.fecha_corte
     mes_corte = fecha_corte.month
     anio_corte = fecha_corte.year
     
@@ -347,43 +1101,41 @@ def _validar_nuevos_usuarios_con_corte():
         periodo_anio=anio_anterior,
         estado='PENDIENTE'
     )
-    
-    # Contador de validaciones
-    validados = 0
-    no_validados = 0
-    fallecidos = 0
-    
-    # Validar cada usuario contra el corte
-    for usuario in usuarios_pendientes:
-        run_usuario = normalize_run(usuario.run)
-        
-        # Buscar el RUN en el corte de este mes
-        try:
-            registro_corte = CorteFonasa.objects.get(
-                run=run_usuario,
-                fecha_corte=fecha_corte
-            )
-			
-            # Usar la nueva lógica de validación
-            motivo_normalizado = (registro_corte.motivo_normalizado or '').upper()
-            
-            # Primero verificar si está fallecido (prioridad máxima)
-            if 'FALLECIDO' in motivo_normalizado:
-                usuario.estado = 'FALLECIDO'
-                fallecidos += 1
-            # Luego usar la función de validación que revisa aceptadoRechazado primero
-            elif not _is_validated_corte(registro_corte.aceptado_rechazado, registro_corte.motivo):
-                usuario.estado = 'NO_VALIDADO'
-                no_validados += 1
-            else:
-                usuario.estado = 'VALIDADO'
-                validados += 1
-			
-            usuario.save()
-			
-        except CorteFonasa.DoesNotExist:
-            # Si no está en el corte, permanece pendiente
-            pass
+    total_pendientes = usuarios_pendientes.count()
+    if not total_pendientes:
+        return
+
+    # Cruce único: registros del corte cuyo RUN corresponde a un usuario pendiente.
+    # Un RUN puede aparecer más de una vez en el mismo corte.
+    registros_corte = CorteFonasa.objects.filter(
+        fecha_corte=fecha_corte,
+        run__in=usuarios_pendientes.values("run"),
+    ).values_list("run", "estado_validacion")
+
+    estados_por_run: Dict[str, str] = {}
+    for run, estado in registros_corte.iterator():
+        # Fallecido tiene prioridad máxima; luego basta un registro validado
+        estado_actual = estados_por_run.get(run)
+        if estado_actual == 'FALLECIDO' or (estado_actual == 'VALIDADO' and estado != 'FALLECIDO'):
+            continue
+        estados_por_run[run] = estado
+
+    # Los usuarios que no están en el corte permanecen pendientes
+    runs_por_estado: Dict[str, List[str]] = {}
+    for run, estado in estados_por_run.items():
+        runs_por_estado.setdefault(estado, []).append(run)
+
+    ahora = timezone.now()
+    actualizados = {'VALIDADO': 0, 'NO_VALIDADO': 0, 'FALLECIDO': 0}
+    for estado, runs in runs_por_estado.items():
+        actualizados[estado] = usuarios_pendientes.filter(run__in=runs).update(
+            estado=estado,
+            modificado_el=ahora,
+        )
+
+    validados = actualizados['VALIDADO']
+    no_validados = actualizados['NO_VALIDADO']
+    fallecidos = actualizados['FALLECIDO']
     
     # Crear o actualizar registro de validación si hubo cambios
     if validados > 0 or no_validados > 0 or fallecidos > 0:
@@ -392,16 +1144,19 @@ def _validar_nuevos_usuarios_con_corte():
             periodo_anio=anio_anterior,
             fecha_corte=fecha_corte,
             defaults={
-                'total_usuarios': usuarios_pendientes.count(),
+                'total_usuarios': total_pendientes,
                 'usuarios_validados': validados,
                 'usuarios_no_validados': no_validados + fallecidos,
-                'usuarios_pendientes': usuarios_pendientes.filter(estado='PENDIENTE').count(),
-                'procesado_el': timezone.now(),
+                'usuarios_pendientes': total_pendientes - validados - no_validados - fallecidos,
+                'procesado_el': ahora,
             }
         )
+        bump_data_version("nuevos_usuarios")
 
 
 @api_view(["GET", "POST", "DELETE"])
+@renderer_classes([JSONRenderer, NDJSONRenderer])
+@etag_por_version("corte")
 def upload_corte_fonasa(request):
     if request.method == "DELETE":
         is_valid, error_response = _check_admin_password(request)
@@ -409,65 +1164,51 @@ def upload_corte_fonasa(request):
             return error_response
 
         month_filter = _parse_month(request.query_params.get("month"))
-        queryset = CorteFonasa.objects.all()
-        if month_filter:
-            year, month = month_filter
-            queryset = queryset.filter(fecha_corte__year=year, fecha_corte__month=month)
 
-        deleted_count, _ = queryset.delete()
+        with transaction.atomic():
+            deleted_count = _delete_corte_months([month_filter] if month_filter else None)
+            _refresh_corte_monthly_stats([month_filter] if month_filter else None)
+            _refresh_corte_deltas([month_filter] if month_filter else None)
         return Response({"deleted": deleted_count}, status=status.HTTP_200_OK)
 
     if request.method == "GET":
-        month_filter = _parse_month(request.query_params.get("month"))
-        search_term = _safe_str(request.query_params.get("search"))
-        centro = _safe_str(request.query_params.get("centro"))
-        # Soporte para múltiples centros separados por coma
-        centros = request.query_params.get("centros")
-        # Nuevo parámetro para filtrar solo validados o no validados
-        validated_only = request.query_params.get("validated_only", "").lower() in {"1", "true", "yes"}
-        non_validated_only = request.query_params.get("non_validated_only", "").lower() in {"1", "true", "yes"}
-
-        queryset = CorteFonasa.objects.all()
-        if month_filter:
-            year, month = month_filter
-            queryset = queryset.filter(fecha_corte__year=year, fecha_corte__month=month)
+        # Las respuestas JSON paginadas se cachean por parámetros y versión de datos
+        cache_key, cached = get_cached_response("corte-fonasa", request.query_params)
+        if cached is not None:
+            return Response(cached)
+
+        params = _corte_listing_params(request)
+        month_filter = params["month_filter"]
+        search_term = params["search_term"]
+        centro = params["centro"]
+        centros_list = params["centros_list"]
+        validated_only = params["validated_only"]
+        non_validated_only = params["non_validated_only"]
+
+        # El filtro de validados se aplica después de calcular los totales
+        queryset = _filter_corte_listing(CorteFonasa.objects.all(), params, include_validation=False)
+
+        validated_filter = CORTE_VALIDATED_FILTER
+        non_validated_filter = CORTE_NON_VALIDATED_FILTER
+
+        # Una sola consulta agrupada por mes y centro para todos los totales: sin
+        # búsqueda por texto se lee desde CorteMonthlyStats, con búsqueda desde el corte
         if search_term:
-            queryset = queryset.filter(
-                Q(run__icontains=search_term)
-                | Q(nombres__icontains=search_term)
-                | Q(ap_paterno__icontains=search_term)
-                | Q(ap_materno__icontains=search_term)
+            totals = _corte_totals_from_queryset(
+                queryset,
+                centros_list=centros_list,
+                validated_only=validated_only,
+                non_validated_only=non_validated_only,
             )
-        # Filtro opcional por centro (nombre del centro en el corte FONASA)
-        if centro:
-            queryset = queryset.filter(Q(nombre_centro__icontains=centro))
-        # Filtro por múltiples centros
-        elif centros:
-            centros_list = [c.strip() for c in centros.split(",") if c.strip()]
-            if centros_list:
-                queryset = queryset.filter(nombre_centro__in=centros_list)
-
-        # Calcular estadísticas con la nueva lógica
-        total_count = queryset.count()
-        
-        # Filtro mejorado basado en los 3 valores posibles:
-        # NO VALIDADOS: 
-        #   - aceptadoRechazado = "RECHAZADO"
-        #   - aceptadoRechazado = "INGRESO RECHAZO SIMULTÁNEO" (contiene "RECHAZO")
-        #   - O motivo en NON_VALIDATED_MOTIVOS
-        #   - O motivo contiene "FALLECIDO"
-        non_validated_filter = (
-            Q(aceptado_rechazado__icontains="RECHAZADO") | 
-            Q(aceptado_rechazado__icontains="RECHAZO") |
-            Q(motivo_normalizado__in=NON_VALIDATED_MOTIVOS) |
-            Q(motivo_normalizado__icontains="FALLECIDO")
-        )
-        
-        # VALIDADOS: aceptadoRechazado = "ACEPTADO" Y NO está en los rechazados
-        validated_filter = (
-            Q(aceptado_rechazado__iexact="ACEPTADO") & 
-            ~non_validated_filter
-        )
+        else:
+            totals = _corte_totals_from_stats(
+                month_filter,
+                centro=centro,
+                centros_list=centros_list,
+                validated_only=validated_only,
+                non_validated_only=non_validated_only,
+            )
+        total_count, validated_count, non_validated_count, summary, by_centro = totals
 
         # Aplicar filtro de validados/no validados si se solicita
         if validated_only:
@@ -475,9 +1216,6 @@ def upload_corte_fonasa(request):
         elif non_validated_only:
             queryset = queryset.filter(non_validated_filter)
 
-        validated_count = queryset.filter(validated_filter).count()
-        non_validated_count = queryset.filter(non_validated_filter).count()
-
         all_param = request.query_params.get("all", "").lower()
         include_all = all_param in {"1", "true", "yes"}
 
@@ -486,6 +1224,14 @@ def upload_corte_fonasa(request):
         except ValueError:
             offset = 0
 
+        # Paginación por cursor (keyset): ?cursor= vacío pide la primera página
+        cursor_param = request.query_params.get("cursor")
+        cursor = None
+        if cursor_param:
+            cursor = _decode_corte_cursor(cursor_param)
+            if cursor is None:
+                return Response({"detail": "Cursor inválido"}, status=status.HTTP_400_BAD_REQUEST)
+
         # Determinar si solo queremos el summary sin datos
         summary_only = request.query_params.get("summary_only", "").lower() in {"1", "true", "yes"}
 
@@ -500,98 +1246,42 @@ def upload_corte_fonasa(request):
                 parsed_limit = 500
             limit_value = max(parsed_limit, 0)
 
-        # OPTIMIZACIÓN: Cache para usuarios validados cuando se pide all=true
-        cache_key = None
-        use_cache = validated_only and include_all and not month_filter and not search_term and not centro and not centros
-        
-        if use_cache:
-            # Generar cache key basado en última actualización
-            last_update = CorteFonasa.objects.filter(validated_filter).aggregate(
-                max_fecha=Max('fecha_corte')
-            )['max_fecha']
-            
-            if last_update:
-                cache_key = f"validated_users_all_{last_update.strftime('%Y%m%d')}_v2"
-                cached_response = cache.get(cache_key)
-                
-                if cached_response:
-                    print(f"✅ Cache HIT para usuarios validados: {cache_key}")
-                    return Response(cached_response)
-                else:
-                    print(f"⚠️ Cache MISS para usuarios validados: {cache_key}")
-
         # Si solo queremos el summary, no traemos rows
+        next_cursor = None
         if summary_only:
             rows = []
         else:
-            ordered_queryset = queryset.order_by("-fecha_corte", "run")
+            ordered_queryset = queryset.order_by(*CORTE_LIST_ORDERING)
+            if cursor_param is not None:
+                if cursor:
+                    ordered_queryset = ordered_queryset.filter(_corte_after_cursor_filter(cursor))
+                offset = 0
             if limit_value == 0:
-                data_queryset = ordered_queryset[offset:]
-            else:
-                data_queryset = ordered_queryset[offset : offset + limit_value]
+                # Listado completo (all=true): se transmite fila a fila sin materializar instancias
+                rows_iterator = (
+                    _corte_payload_from_values(row)
+                    for row in ordered_queryset[offset:]
+                    .values(*CORTE_PAYLOAD_FIELDS)
+                    .iterator(chunk_size=STREAMING_CHUNK_SIZE)
+                )
+                header = {
+                    "columns": CORTE_COLUMNS,
+                    "total": total_count,
+                    "validated": validated_count,
+                    "non_validated": non_validated_count,
+                    "summary": summary,
+                    "by_centro": by_centro,
+                    "next_cursor": None,
+                }
+                return _streaming_listing_response(request, header, rows_iterator)
 
-            rows = [_build_corte_payload(instance) for instance in data_queryset]
+            # Una fila extra indica si existe una página siguiente
+            instances = list(ordered_queryset[offset : offset + limit_value + 1])
+            if len(instances) > limit_value:
+                instances = instances[:limit_value]
+                next_cursor = _encode_corte_cursor(instances[-1])
 
-        grouped = (
-            queryset.values("fecha_corte__year", "fecha_corte__month")
-            .annotate(
-                total=Count("id"),
-                validated=Count("id", filter=validated_filter),
-                non_validated=Count("id", filter=non_validated_filter),
-            )
-            .order_by("-fecha_corte__year", "-fecha_corte__month")
-        )
-
-        summary = [
-            {
-                "month": _format_month_key(item["fecha_corte__year"], item["fecha_corte__month"]),
-                "label": _format_month_label(item["fecha_corte__year"], item["fecha_corte__month"]),
-                "total": item["total"],
-                "validated": item["validated"],
-                "nonValidated": item["non_validated"],
-            }
-            for item in grouped
-        ]
-
-        # Si hay filtro de centros, también devolver datos agrupados por centro
-        by_centro = []
-        if centros:
-            centros_list = [c.strip() for c in centros.split(",") if c.strip()]
-            if centros_list:
-                # Agrupar por centro y mes
-                grouped_by_centro = (
-                    queryset.filter(nombre_centro__in=centros_list)
-                    .values("nombre_centro", "fecha_corte__year", "fecha_corte__month")
-                    .annotate(
-                        total=Count("id"),
-                        validated=Count("id", filter=validated_filter),
-                        non_validated=Count("id", filter=non_validated_filter),
-                    )
-                    .order_by("nombre_centro", "-fecha_corte__year", "-fecha_corte__month")
-                )
-                
-                # Organizar por centro
-                centros_data = {}
-                for item in grouped_by_centro:
-                    centro_name = item["nombre_centro"]
-                    if centro_name not in centros_data:
-                        centros_data[centro_name] = []
-                    
-                    centros_data[centro_name].append({
-                        "month": _format_month_key(item["fecha_corte__year"], item["fecha_corte__month"]),
-                        "label": _format_month_label(item["fecha_corte__year"], item["fecha_corte__month"]),
-                        "total": item["total"],
-                        "validated": item["validated"],
-                        "nonValidated": item["non_validated"],
-                    })
-                
-                by_centro = [
-                    {
-                        "centro": centro,
-                        "data": data
-                    }
-                    for centro, data in centros_data.items()
-                ]
+            rows = [_build_corte_payload(instance) for instance in instances]
 
         response_data = {
             "columns": CORTE_COLUMNS,
@@ -601,14 +1291,10 @@ def upload_corte_fonasa(request):
             "non_validated": non_validated_count,
             "summary": summary,
             "by_centro": by_centro,  # Nuevo campo con datos por centro
+            "next_cursor": next_cursor,
         }
 
-        # Guardar en cache si aplica
-        if use_cache and cache_key and rows:
-            # Cache por 10 minutos (600 segundos)
-            cache.set(cache_key, response_data, timeout=600)
-            print(f"💾 Datos guardados en cache: {cache_key} ({len(rows)} registros)")
-
+        set_cached_response(cache_key, response_data)
         return Response(response_data)
 
     records = request.data.get("records")
@@ -621,93 +1307,673 @@ def upload_corte_fonasa(request):
     serializer = CorteFonasaRecordSerializer(data=records, many=True)
     serializer.is_valid(raise_exception=True)
 
-    created = 0
-    skipped: List[Dict[str, str]] = []
-
     replace_mode = request.query_params.get("replace", "").lower() in {"1", "true", "yes"}
 
     prepared_records: List[Tuple[Dict[str, str], date | None]] = []
-    months_to_replace: set[Tuple[int, int]] = set()
 
     for record in serializer.validated_data:
         fecha_corte = _parse_date(record.get("fehcaCorte"))
         prepared_records.append((record, fecha_corte))
-        if replace_mode and fecha_corte:
-            months_to_replace.add((fecha_corte.year, fecha_corte.month))
 
-    prepared_records.sort(key=lambda item: _motivo_priority(item[0].get("motivo")))
+    _sort_by_motivo_priority(prepared_records)
 
-    with transaction.atomic():
-        if replace_mode and months_to_replace:
-            for year, month in months_to_replace:
-                CorteFonasa.objects.filter(
-                    fecha_corte__year=year, fecha_corte__month=month
-                ).delete()
+    if _is_async_request(request):
+        trabajo = _encolar_carga(
+            request,
+            tipo_carga="CORTE_FONASA",
+            registros=[record for record, _ in prepared_records],
+            reemplazo=replace_mode,
+        )
+        return _build_trabajo_accepted_response(trabajo)
 
-        for index, (record, fecha_corte) in enumerate(prepared_records):
-            run_clean = normalize_run(record.get("run"))
+    created, skipped = _ingest_corte_batches(
+        [prepared_records], replace_mode=replace_mode, total_carga=len(prepared_records)
+    )
 
-            if not run_clean or not fecha_corte:
-                skipped.append({"index": index, "motivo": "RUN o fecha de corte inválidos"})
-                continue
+    return _build_corte_ingest_response(created, skipped)
 
-            motivo_value = _safe_str(record.get("motivo"))
-
-            defaults = {
-                "nombres": _safe_str(record.get("nombres")),
-                "ap_paterno": _safe_str(record.get("apPaterno")),
-                "ap_materno": _safe_str(record.get("apMaterno")),
-                "fecha_nacimiento": _parse_date(record.get("fechaNacimiento")),
-                "genero": _safe_str(record.get("genero")),
-                "tramo": _safe_str(record.get("tramo")),
-                "nombre_centro": _safe_str(record.get("nombreCentro")),
-                "centro_de_procedencia": _safe_str(record.get("centroDeProcedencia")),
-                "comuna_de_procedencia": _safe_str(record.get("comunaDeProcedencia")),
-                "nombre_centro_actual": _safe_str(record.get("nombreCentroActual")),
-                "centro_actual": _safe_str(record.get("centroActual")),
-                "comuna_actual": _safe_str(record.get("comunaActual")),
-                "aceptado_rechazado": _safe_str(record.get("aceptadoRechazado"), max_length=255),
-                "motivo": motivo_value,
-                "motivo_normalizado": normalize_motivo(motivo_value),
-            }
 
-            # Crear el registro directamente (permite duplicados de RUN en el mismo mes)
-            CorteFonasa.objects.create(
-                run=run_clean,
-                fecha_corte=fecha_corte,
-                **defaults,
-            )
-            created += 1
+def _iter_timed_batches(batches: Iterable, etapas: Dict[str, float]):
+    """Itera los lotes acumulando en etapas["lectura"] el tiempo de obtenerlos."""
+    iterator = iter(batches)
+    while True:
+        with _medir_etapa(etapas, "lectura"):
+            batch = next(iterator, None)
+        if batch is None:
+            return
+        yield batch
 
-        # Validación automática de nuevos usuarios cuando se sube un corte
-        if months_to_replace or created > 0:
-            _validar_nuevos_usuarios_con_corte()
 
-    # Calcular estadísticas usando la nueva lógica de validación
-    total_records = CorteFonasa.objects.count()
-    total_validated = 0
-    total_non_validated = 0
-    
-    for corte in CorteFonasa.objects.all().iterator():
-        if _is_validated_corte(corte.aceptado_rechazado, corte.motivo):
-            total_validated += 1
-        else:
-            total_non_validated += 1
+def _iter_normalized_corte_batches(
+    batches: Iterable[List[Tuple[Dict[str, str], date | None]]],
+    etapas: Dict[str, float],
+    total_carga: int | None,
+):
+    """
+    Entrega (lote, valores normalizados) por cada lote, normalizando en el pool
+    de procesos los siguientes mientras se inserta el actual (ver
+    normalizacion.normalizar_cortes_por_lotes). El tiempo de espera de la
+    normalización se acumula en etapas["normalizacion"], sin la lectura.
+    """
+    iterator = iter(
+        normalizar_cortes_por_lotes(_iter_timed_batches(batches, etapas), total_carga=total_carga)
+    )
+    while True:
+        antes = etapas.get("lectura", 0.0)
+        with _medir_etapa(etapas, "normalizacion"):
+            item = next(iterator, None)
+        etapas["normalizacion"] -= etapas.get("lectura", 0.0) - antes
+        if item is None:
+            return
+        yield item
+
+
+def _ingest_corte_batches(
+    batches: Iterable[List[Tuple[Dict[str, str], date | None]]],
+    *,
+    replace_mode: bool = False,
+    on_progress: Callable[[int], None] | None = None,
+    etapas: Dict[str, float] | None = None,
+    reanudar_desde: int = 0,
+    total_carga: int | None = None,
+) -> Tuple[int, List[Dict[str, str]]]:
+    """
+    Ingresa lotes de registros del corte dentro de una única transacción.
+
+    En modo reemplazo la carga pasa por CorteFonasaStaging (ver
+    _ingest_corte_replace). Al terminar se ejecuta la validación automática de
+    nuevos usuarios.
+
+    Si se entrega `on_progress`, cada lote se confirma en su propia transacción y
+    `on_progress` recibe la cantidad de filas procesadas dentro de esa misma
+    transacción (cargas en segundo plano). Con `reanudar_desde` se omiten las
+    primeras filas, confirmadas en un intento anterior del mismo trabajo.
+    `total_carga` es la cantidad de filas de la carga, si se conoce de antemano:
+    decide si la normalización usa el pool de procesos desde el primer lote.
+    `etapas` acumula los segundos empleados en lectura, normalización, inserción
+    y validación.
+    """
+    etapas = etapas if etapas is not None else {}
+    if replace_mode:
+        return _ingest_corte_replace(
+            batches, on_progress=on_progress, etapas=etapas, total_carga=total_carga
+        )
+
+    created = 0
+    skipped: List[Dict[str, str]] = []
+    stats_deltas: Dict[Tuple[int, int, str], List[int]] = {}
+    months: set[Tuple[int, int]] = set()
+    offset = reanudar_desde
+
+    def process_batch(batch, normalized):
+        nonlocal created, offset
+        months.update(
+            (fecha_corte.year, fecha_corte.month) for _, fecha_corte in batch if fecha_corte
+        )
+        batch_created, batch_skipped = _bulk_insert_cortes(
+            batch, start_index=offset, stats_deltas=stats_deltas, normalized=normalized
+        )
+        created += batch_created
+        skipped.extend(batch_skipped)
+        offset += len(batch)
+
+    if on_progress is None:
+        with transaction.atomic():
+            for batch, normalized in _iter_normalized_corte_batches(batches, etapas, total_carga):
+                with _medir_etapa(etapas, "insercion"):
+                    process_batch(batch, normalized)
+            with _medir_etapa(etapas, "insercion"):
+                _apply_corte_stats_deltas(stats_deltas)
+
+            # Validación automática de nuevos usuarios cuando se sube un corte
+            if created > 0:
+                with _medir_etapa(etapas, "delta"):
+                    _refresh_corte_deltas(months)
+                with _medir_etapa(etapas, "validacion"):
+                    _validar_nuevos_usuarios_con_corte()
+
+        return created, skipped
+
+    def pending_batches():
+        # Las filas de un intento anterior no se vuelven a normalizar: solo
+        # cuentan para los meses a recalcular
+        leidas = 0
+        for batch in batches:
+            ya_cargadas = min(max(reanudar_desde - leidas, 0), len(batch))
+            leidas += len(batch)
+            if ya_cargadas:
+                months.update(
+                    (fecha_corte.year, fecha_corte.month)
+                    for _, fecha_corte in batch[:ya_cargadas]
+                    if fecha_corte
+                )
+                batch = batch[ya_cargadas:]
+            if batch:
+                yield batch
+
+    pendientes = total_carga - reanudar_desde if total_carga is not None else None
+    for batch, normalized in _iter_normalized_corte_batches(pending_batches(), etapas, pendientes):
+        with _medir_etapa(etapas, "insercion"), transaction.atomic():
+            process_batch(batch, normalized)
+            _apply_corte_stats_deltas(stats_deltas)
+            stats_deltas.clear()
+            on_progress(offset)
+
+    if created > 0 or reanudar_desde:
+        with transaction.atomic():
+            with _medir_etapa(etapas, "delta"):
+                _refresh_corte_deltas(months)
+            with _medir_etapa(etapas, "validacion"):
+                _validar_nuevos_usuarios_con_corte()
+
+    return created, skipped
+
+
+def _ingest_corte_replace(
+    batches: Iterable[List[Tuple[Dict[str, str], date | None]]],
+    *,
+    on_progress: Callable[[int], None] | None = None,
+    etapas: Dict[str, float],
+    total_carga: int | None = None,
+) -> Tuple[int, List[Dict[str, str]]]:
+    """
+    Carga en modo reemplazo a través de CorteFonasaStaging.
+
+    Los lotes se insertan y validan en la tabla de preparación, cada uno en su
+    propia transacción y sin tocar CorteFonasa. Al final, una transacción corta
+    reemplaza los meses presentes en la carga (_swap_staged_cortes), por lo que
+    los lectores nunca ven un mes a medio cargar. Si la carga falla antes del
+    traspaso, el mes visible no cambia y los registros preparados se descartan.
+    """
+    carga = uuid.uuid4()
+    created = 0
+    skipped: List[Dict[str, str]] = []
+    months: set[Tuple[int, int]] = set()
+    offset = 0
+
+    try:
+        for batch, normalized in _iter_normalized_corte_batches(batches, etapas, total_carga):
+            months.update(
+                (fecha_corte.year, fecha_corte.month) for _, fecha_corte in batch if fecha_corte
+            )
+            with _medir_etapa(etapas, "insercion"), transaction.atomic():
+                batch_created, batch_skipped = _bulk_insert_cortes(
+                    batch, start_index=offset, staging_carga=carga, normalized=normalized
+                )
+            created += batch_created
+            skipped.extend(batch_skipped)
+            offset += len(batch)
+            if on_progress is not None:
+                on_progress(offset)
+
+        with transaction.atomic():
+            with _medir_etapa(etapas, "reemplazo"):
+                _swap_staged_cortes(carga, months)
+            with _medir_etapa(etapas, "delta"):
+                _refresh_corte_deltas(months)
+            if months:
+                with _medir_etapa(etapas, "validacion"):
+                    _validar_nuevos_usuarios_con_corte()
+    finally:
+        CorteFonasaStaging.objects.filter(carga=carga).delete()
+
+    return created, skipped
+
+
+def _build_corte_ingest_response(created: int, skipped: List[Dict[str, str]]) -> Response:
+    # Totales globales leídos desde CorteMonthlyStats (mantenida en cada carga)
+    totals = CorteMonthlyStats.objects.aggregate(
+        total=Sum("total"),
+        validated=Sum("validados"),
+        non_validated=Sum("no_validados"),
+    )
 
     return Response(
         {
             "created": created,
             "invalid": len(skipped),
             "invalid_rows": skipped[:20],
-            "total": total_records,
-            "validated": total_validated,
-            "non_validated": total_non_validated,
+            "total": totals["total"] or 0,
+            "validated": totals["validated"] or 0,
+            "non_validated": totals["non_validated"] or 0,
         },
         status=status.HTTP_200_OK,
     )
 
 
+def _normalize_header(value) -> str:
+    """Normaliza un encabezado de columna: minúsculas, sin tildes ni separadores."""
+    text = unicodedata.normalize("NFKD", _safe_str(value)).encode("ascii", "ignore").decode("ascii")
+    return "".join(ch for ch in text.lower() if ch.isalnum())
+
+
+# Alias aceptados en los encabezados del archivo del corte (mismos que usa el frontend)
+CORTE_COLUMN_ALIASES = {
+    "rut": "run",
+    "run_beneficiario": "run",
+    "rut_beneficiario": "run",
+    "documento_identidad": "run",
+    "sexo": "genero",
+    "fecha_corte": "fehcaCorte",
+    "fecha_de_corte": "fehcaCorte",
+    "fecha_corte_periodo": "fehcaCorte",
+    "fechaCorte": "fehcaCorte",
+    "resultado": "aceptadoRechazado",
+    "estado": "aceptadoRechazado",
+    "motivo_rechazo": "motivo",
+    "observacion": "motivo",
+    "centro_inscripcion": "nombreCentro",
+    "establecimiento": "nombreCentro",
+}
+
+_CORTE_HEADER_MAP = {
+    **{_normalize_header(alias): canonical for alias, canonical in CORTE_COLUMN_ALIASES.items()},
+    **{_normalize_header(column): column for column in CORTE_COLUMNS + ["nombreCentroActual"]},
+}
+
+
+def _stringify_cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def _iter_corte_file_rows(uploaded_file) -> Iterator[Dict[str, str]]:
+    """
+    Lee un archivo XLSX o CSV fila por fila sin cargarlo completo en memoria.
+
+    Los encabezados se mapean a las columnas de CORTE_COLUMNS; las columnas
+    desconocidas se descartan.
+    """
+    filename = (getattr(uploaded_file, "name", "") or "").lower()
+
+    if filename.endswith((".xlsx", ".xlsm")):
+        workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None) or ()
+            columns = [_CORTE_HEADER_MAP.get(_normalize_header(cell)) for cell in header]
+            for values in rows:
+                record = {
+                    column: _stringify_cell(value)
+                    for column, value in zip(columns, values)
+                    if column
+                }
+                if any(record.values()):
+                    yield record
+        finally:
+            workbook.close()
+        return
+
+    text_stream = io.TextIOWrapper(uploaded_file.file, encoding="utf-8-sig", errors="replace")
+    reader = pd.read_csv(
+        text_stream,
+        sep=None,
+        engine="python",
+        dtype=str,
+        keep_default_na=False,
+        chunksize=_get_corte_batch_size(),
+    )
+    for chunk in reader:
+        chunk = chunk.rename(columns=lambda name: _CORTE_HEADER_MAP.get(_normalize_header(name)))
+        chunk = chunk.loc[:, [column for column in chunk.columns if column]]
+        for record in chunk.to_dict("records"):
+            record = {column: _stringify_cell(value) for column, value in record.items()}
+            if any(record.values()):
+                yield record
+
+
+def _iter_corte_file_batches(uploaded_file, batch_size: int):
+    """
+    Lotes de (registro, fecha de corte) leídos del archivo, ordenados como las
+    cargas JSON. El archivo no se carga completo en memoria, así que el orden se
+    aplica dentro de cada lote de `batch_size` filas.
+    """
+    batch: List[Tuple[Dict[str, str], date | None]] = []
+    for record in _iter_corte_file_rows(uploaded_file):
+        batch.append((record, _parse_date(record.get("fehcaCorte"))))
+        if len(batch) >= batch_size:
+            _sort_by_motivo_priority(batch)
+            yield batch
+            batch = []
+    if batch:
+        _sort_by_motivo_priority(batch)
+        yield batch
+
+
+@api_view(["POST"])
+@parser_classes([MultiPartParser, FormParser])
+def upload_corte_fonasa_archivo(request):
+    """
+    Carga del corte FONASA a partir del archivo original (XLSX o CSV).
+
+    El archivo se procesa en el servidor fila por fila y se inserta en lotes de
+    CORTE_BULK_BATCH_SIZE registros, evitando enviar el contenido como JSON.
+
+    Parámetros:
+    - archivo: archivo .xlsx, .xlsm o .csv (multipart)
+    - replace: si es true, reemplaza los meses presentes en el archivo
+    - async: si es true, encola la carga y responde de inmediato con el trabajo
+    """
+    uploaded_file = request.FILES.get("archivo")
+    if not uploaded_file:
+        return Response(
+            {"detail": "Debe adjuntar el archivo del corte en el campo 'archivo'"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    filename = (uploaded_file.name or "").lower()
+    if not filename.endswith((".xlsx", ".xlsm", ".csv", ".txt")):
+        return Response(
+            {"detail": "Formato de archivo no soportado. Use XLSX o CSV."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    replace_mode = request.query_params.get("replace", "").lower() in {"1", "true", "yes"}
+
+    if _is_async_request(request):
+        trabajo = _encolar_carga(
+            request,
+            tipo_carga="CORTE_FONASA",
+            archivo=uploaded_file,
+            reemplazo=replace_mode,
+        )
+        return _build_trabajo_accepted_response(trabajo)
+
+    try:
+        created, skipped = _ingest_corte_batches(
+            _iter_corte_file_batches(uploaded_file, _get_corte_batch_size()),
+            replace_mode=replace_mode,
+        )
+    except (InvalidFileException, BadZipFile, pd.errors.ParserError, UnicodeDecodeError) as exc:
+        return Response(
+            {"detail": f"No se pudo leer el archivo: {exc}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    return _build_corte_ingest_response(created, skipped)
+
+
+def _hash_corte_chunk(records: List[Dict[str, str]]) -> str:
+    """SHA-256 del chunk sobre su JSON canónico (claves ordenadas, sin espacios)."""
+    canonical = json.dumps(records, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _build_sesion_corte_payload(sesion: SesionCargaCorte) -> Dict:
+    chunks = list(
+        sesion.chunks.order_by("numero").values_list("numero", "registros_creados", "registros_invalidos")
+    )
+    recibidos = [numero for numero, _, _ in chunks]
+
+    # Último chunk confirmado sin huecos desde el chunk 0: punto de reanudación
+    ultimo_confirmado = -1
+    for numero in recibidos:
+        if numero != ultimo_confirmado + 1:
+            break
+        ultimo_confirmado = numero
+
+    return {
+        "session_id": str(sesion.token),
+        "estado": sesion.estado,
+        "reemplazo": sesion.reemplazo,
+        "meses_reemplazados": sesion.meses_reemplazados,
+        "total_chunks": sesion.total_chunks,
+        "chunks_recibidos": recibidos,
+        "ultimo_chunk_confirmado": ultimo_confirmado if ultimo_confirmado >= 0 else None,
+        "created": sum(creados for _, creados, _ in chunks),
+        "invalid": sum(invalidos for _, _, invalidos in chunks),
+    }
+
+
+@api_view(["POST"])
+def corte_fonasa_sesiones(request):
+    """
+    Abre una sesión de carga del corte por chunks.
+
+    Body:
+    - replace: si es true, los chunks se preparan en CorteFonasaStaging y al
+      finalizar reemplazan los meses indicados en `months` (y los presentes en la carga)
+    - months: lista de meses "YYYY-MM" a reemplazar (requerida si replace es true)
+    - total_chunks: cantidad de chunks esperados (opcional, informativo)
+    - nombre_archivo: nombre del archivo original (opcional)
+    """
+    data = request.data
+    replace_mode = _safe_str(data.get("replace")).lower() in {"1", "true", "yes"}
+
+    months_raw = data.get("months") or []
+    if isinstance(months_raw, str):
+        months_raw = [item for item in months_raw.split(",") if item.strip()]
+    parsed_months = [_parse_month(_safe_str(item)) for item in months_raw]
+    months = sorted(set(parsed_months))
+    if None in parsed_months:
+        return Response(
+            {"detail": "'months' debe contener meses con formato YYYY-MM"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if replace_mode and not months:
+        return Response(
+            {"detail": "Para reemplazar debe indicar los meses en 'months'"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    usuario_nombre, _ = _resolve_carga_origen(request)
+
+    _purge_stale_corte_staging()
+
+    sesion = SesionCargaCorte.objects.create(
+        nombre_archivo=_safe_str(data.get("nombre_archivo")),
+        usuario=usuario_nombre,
+        reemplazo=replace_mode,
+        meses_reemplazados=[_format_month_key(year, month) for year, month in months] if replace_mode else [],
+        total_chunks=_parse_int(data.get("total_chunks")),
+    )
+
+    return Response(_build_sesion_corte_payload(sesion), status=status.HTTP_201_CREATED)
+
+
+@api_view(["GET"])
+def corte_fonasa_sesion_detail(request, token):
+    """Estado de la sesión: chunks confirmados y punto desde donde reanudar."""
+    try:
+        sesion = SesionCargaCorte.objects.get(token=token)
+    except SesionCargaCorte.DoesNotExist:
+        return Response({"detail": "Sesión no encontrada"}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response(_build_sesion_corte_payload(sesion))
+
+
+@api_view(["PUT"])
+def corte_fonasa_sesion_chunk(request, token, numero: int):
+    """
+    Aplica un chunk numerado de la sesión. Es idempotente: si el chunk ya fue
+    aplicado con el mismo contenido responde el acuse original sin insertar nada.
+
+    Body:
+    - records: lista de registros del corte (mismo formato que POST /corte-fonasa/)
+    - hash: SHA-256 del JSON canónico de `records` (opcional; si se envía se verifica)
+    - offset: índice de la primera fila del chunk en el archivo (opcional, para reportar errores)
+    """
+    try:
+        sesion = SesionCargaCorte.objects.get(token=token)
+    except SesionCargaCorte.DoesNotExist:
+        return Response({"detail": "Sesión no encontrada"}, status=status.HTTP_404_NOT_FOUND)
+
+    records = request.data.get("records")
+    if not isinstance(records, list) or not records:
+        return Response(
+            {"detail": "'records' debe ser una lista con datos"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    chunk_hash = _hash_corte_chunk(records)
+    client_hash = _safe_str(request.data.get("hash")).lower()
+    if client_hash and client_hash != chunk_hash:
+        return Response(
+            {"detail": "El hash no coincide con el contenido del chunk", "hash": chunk_hash},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    def acuse(chunk: ChunkCargaCorte, duplicate: bool) -> Response:
+        return Response(
+            {
+                "numero": chunk.numero,
+                "hash": chunk.hash,
+                "created": chunk.registros_creados,
+                "invalid": chunk.registros_invalidos,
+                "invalid_rows": chunk.errores,
+                "duplicate": duplicate,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    def conflicto() -> Response:
+        return Response(
+            {"detail": f"El chunk {numero} ya fue aplicado con otro contenido"},
+            status=status.HTTP_409_CONFLICT,
+        )
+
+    existing = sesion.chunks.filter(numero=numero).first()
+    if existing:
+        return acuse(existing, True) if existing.hash == chunk_hash else conflicto()
+
+    if sesion.estado != "ABIERTA":
+        return Response(
+            {"detail": "La sesión ya fue finalizada" if sesion.estado == "FINALIZADA" else "La sesión expiró"},
+            status=status.HTTP_409_CONFLICT,
+        )
+
+    serializer = CorteFonasaRecordSerializer(data=records, many=True)
+    serializer.is_valid(raise_exception=True)
+
+    prepared_records = [
+        (record, _parse_date(record.get("fehcaCorte")))
+        for record in serializer.validated_data
+    ]
+    _sort_by_motivo_priority(prepared_records)
+    # Normalizar antes de bloquear la sesión; el pool se decide por el tamaño
+    # estimado de la sesión completa
+    normalized = normalizar_cortes(
+        prepared_records, total_carga=len(prepared_records) * (sesion.total_chunks or 1)
+    )
+
+    with transaction.atomic():
+        # Bloquear la sesión: finalizar la toma con select_for_update, así que un
+        # chunk que pasó la verificación anterior no se aplica después del cierre.
+        sesion = SesionCargaCorte.objects.select_for_update().get(pk=sesion.pk)
+        existing = sesion.chunks.filter(numero=numero).first()
+        if existing:
+            return acuse(existing, True) if existing.hash == chunk_hash else conflicto()
+        if sesion.estado != "ABIERTA":
+            return Response(
+                {"detail": "La sesión ya fue finalizada" if sesion.estado == "FINALIZADA" else "La sesión expiró"},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        # Registrar el chunk primero. Sin bloqueo de filas (SQLite) la restricción
+        # única (sesion, numero) hace que un reintento concurrente sea un duplicado.
+        try:
+            with transaction.atomic():
+                chunk = ChunkCargaCorte.objects.create(
+                    sesion=sesion,
+                    numero=numero,
+                    hash=chunk_hash,
+                    total_registros=len(prepared_records),
+                )
+        except IntegrityError:
+            existing = sesion.chunks.get(numero=numero)
+            return acuse(existing, True) if existing.hash == chunk_hash else conflicto()
+
+        # En sesiones de reemplazo los registros quedan preparados hasta finalizar
+        stats_deltas: Dict[Tuple[int, int, str], List[int]] = {}
+        created, skipped = _bulk_insert_cortes(
+            prepared_records,
+            start_index=_parse_int(request.data.get("offset")) or 0,
+            stats_deltas=None if sesion.reemplazo else stats_deltas,
+            staging_carga=sesion.token if sesion.reemplazo else None,
+            normalized=normalized,
+        )
+        _apply_corte_stats_deltas(stats_deltas)
+
+        chunk.registros_creados = created
+        chunk.registros_invalidos = len(skipped)
+        chunk.errores = skipped[:20]
+        chunk.meses = sorted(
+            {_format_month_key(fecha.year, fecha.month) for _, fecha in prepared_records if fecha}
+        )
+        chunk.save(update_fields=["registros_creados", "registros_invalidos", "errores", "meses"])
+
+    return acuse(chunk, False)
+
+
+@api_view(["POST"])
+def corte_fonasa_sesion_finalizar(request, token):
+    """
+    Cierra la sesión y ejecuta la validación automática de nuevos usuarios. En
+    sesiones de reemplazo, traspasa aquí los registros preparados a CorteFonasa.
+    Llamarlo más de una vez no tiene efecto adicional.
+    """
+    with transaction.atomic():
+        try:
+            sesion = SesionCargaCorte.objects.select_for_update().get(token=token)
+        except SesionCargaCorte.DoesNotExist:
+            return Response({"detail": "Sesión no encontrada"}, status=status.HTTP_404_NOT_FOUND)
+
+        if sesion.estado == "EXPIRADA":
+            return Response(
+                {"detail": "La sesión expiró por inactividad y sus registros se descartaron; abra una nueva"},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        if sesion.estado == "ABIERTA":
+            if sesion.reemplazo:
+                # El traspaso reemplaza meses completos: solo con todos los chunks preparados
+                preparados = CorteFonasaStaging.objects.filter(carga=sesion.token).count()
+                confirmados = sesion.chunks.aggregate(total=Sum("registros_creados"))["total"] or 0
+                if preparados != confirmados:
+                    return Response(
+                        {
+                            "detail": "Los registros preparados no coinciden con los chunks confirmados",
+                            "preparados": preparados,
+                            "confirmados": confirmados,
+                        },
+                        status=status.HTTP_409_CONFLICT,
+                    )
+            months = {_parse_month(month) for month in sesion.meses_reemplazados}
+            for chunk_months in sesion.chunks.values_list("meses", flat=True):
+                months.update(_parse_month(month) for month in chunk_months)
+            if sesion.reemplazo:
+                _swap_staged_cortes(sesion.token, months)
+            _refresh_corte_deltas(months)
+            if sesion.meses_reemplazados or sesion.chunks.filter(registros_creados__gt=0).exists():
+                _validar_nuevos_usuarios_con_corte()
+            sesion.estado = "FINALIZADA"
+            sesion.finalizado_el = timezone.now()
+            sesion.save(update_fields=["estado", "finalizado_el"])
+
+    payload = _build_sesion_corte_payload(sesion)
+    totals = CorteMonthlyStats.objects.aggregate(
+        total=Sum("total"),
+        validated=Sum("validados"),
+        non_validated=Sum("no_validados"),
+    )
+    payload.update(
+        total=totals["total"] or 0,
+        validated=totals["validated"] or 0,
+        non_validated=totals["non_validated"] or 0,
+    )
+    return Response(payload)
+
+
 @api_view(["GET", "POST", "DELETE"])
+@renderer_classes([JSONRenderer, NDJSONRenderer])
+@etag_por_version("trakcare", "catalogos")
 def upload_hp_trakcare(request):
     if request.method == "DELETE":
         is_valid, error_response = _check_admin_password(request)
@@ -717,32 +1983,19 @@ def upload_hp_trakcare(request):
         month_filter = _parse_month(request.query_params.get("month"))
         queryset = HpTrakcare.objects.all()
         if month_filter:
-            year, month = month_filter
-            queryset = queryset.filter(
-                fecha_incorporacion__year=year, fecha_incorporacion__month=month
-            )
+            queryset = queryset.filter(_month_filter("fecha_incorporacion", *month_filter))
 
         deleted_count, _ = queryset.delete()
+        bump_data_version("trakcare")
         return Response({"deleted": deleted_count}, status=status.HTTP_200_OK)
 
     if request.method == "GET":
-        month_filter = _parse_month(request.query_params.get("month"))
-        search_term = _safe_str(request.query_params.get("search"))
+        cache_key, cached = get_cached_response("hp-trakcare", request.query_params)
+        if cached is not None:
+            return Response(cached)
 
-        queryset = HpTrakcare.objects.all()
-        if month_filter:
-            year, month = month_filter
-            queryset = queryset.filter(
-                fecha_incorporacion__year=year, fecha_incorporacion__month=month
-            )
-        if search_term:
-            queryset = queryset.filter(
-                Q(run__icontains=search_term)
-                | Q(nombre__icontains=search_term)
-                | Q(ap_paterno__icontains=search_term)
-                | Q(ap_materno__icontains=search_term)
-                | Q(cod_registro__icontains=search_term)
-            )
+        # Total, resumen y página leen la misma versión
+        queryset = _filter_trakcare_listing(request, HpTrakcare.objects.de_snapshot(snapshot_activo_id()))
 
         total_count = queryset.count()
 
@@ -765,12 +2018,6 @@ def upload_hp_trakcare(request):
             limit_value = max(parsed_limit, 0)
 
         ordered_queryset = queryset.order_by("run", "nombre")
-        if limit_value == 0:
-            data_queryset = ordered_queryset[offset:]
-        else:
-            data_queryset = ordered_queryset[offset : offset + limit_value]
-
-        rows = [_build_trakcare_payload(instance) for instance in data_queryset]
 
         grouped = (
             queryset.values("fecha_incorporacion__year", "fecha_incorporacion__month")
@@ -788,14 +2035,30 @@ def upload_hp_trakcare(request):
             if item["fecha_incorporacion__year"] and item["fecha_incorporacion__month"]
         ]
 
-        return Response(
-            {
-                "columns": TRAKCARE_COLUMNS,
-                "rows": rows,
-                "total": total_count,
-                "summary": summary,
-            }
-        )
+        if limit_value == 0:
+            # Listado completo (all=true): se transmite fila a fila sin materializar instancias
+            rows_iterator = (
+                _trakcare_payload_from_values(row)
+                for row in ordered_queryset[offset:]
+                .values(*TRAKCARE_PAYLOAD_FIELDS)
+                .iterator(chunk_size=STREAMING_CHUNK_SIZE)
+            )
+            header = {"columns": TRAKCARE_COLUMNS, "total": total_count, "summary": summary}
+            return _streaming_listing_response(request, header, rows_iterator)
+
+        data_queryset = ordered_queryset.select_related(
+            "etnia", "nacionalidad", "centro_inscripcion", "sector"
+        )[offset : offset + limit_value]
+        rows = [_build_trakcare_payload(instance) for instance in data_queryset]
+
+        response_data = {
+            "columns": TRAKCARE_COLUMNS,
+            "rows": rows,
+            "total": total_count,
+            "summary": summary,
+        }
+        set_cached_response(cache_key, response_data)
+        return Response(response_data)
 
     records = request.data.get("records")
     if not isinstance(records, list) or not records:
@@ -807,69 +2070,169 @@ def upload_hp_trakcare(request):
     serializer = HpTrakcareRecordSerializer(data=records, many=True)
     serializer.is_valid(raise_exception=True)
 
-    created = 0
-    updated = 0
-    skipped: List[Dict[str, str]] = []
-
     replace_mode = request.query_params.get("replace", "").lower() in {"1", "true", "yes"}
 
-    with transaction.atomic():
-        if replace_mode:
-            HpTrakcare.objects.all().delete()
+    if _is_async_request(request):
+        trabajo = _encolar_carga(
+            request,
+            tipo_carga="HP_TRAKCARE",
+            registros=serializer.validated_data,
+            reemplazo=replace_mode,
+        )
+        return _build_trabajo_accepted_response(trabajo)
+
+    created, updated, skipped = _ingest_trakcare_records(
+        serializer.validated_data, replace_mode=replace_mode
+    )
+
+    return _build_trakcare_ingest_response(created, updated, skipped)
+
+
+# Campos que una nueva carga de la misma fila (run, cod_registro) reemplaza
+TRAKCARE_UPSERT_FIELDS = [
+    field.name
+    for field in HpTrakcare._meta.concrete_fields
+    if field.name not in {"id", "snapshot", "run", "cod_registro", "creado_el"}
+]
+
+# Campo de HpTrakcare -> catálogo de CatalogoResolver
+TRAKCARE_CATALOG_FIELDS = {
+    "etnia": "etnia",
+    "nacionalidad": "nacionalidad",
+    "centro_inscripcion": "establecimiento",
+    "sector": "sector",
+}
+
+
+def _upsert_trakcare_rows(
+    rows: Dict[Tuple[str, str], Dict], resolver: CatalogoResolver, snapshot: TrakcareSnapshot
+) -> Tuple[int, int]:
+    """
+    Inserta o actualiza en `snapshot` un lote de HP Trakcare indexado por
+    (run, cod_registro) con un único INSERT ... ON CONFLICT. Retorna (creados,
+    actualizados), calculados a partir de las claves que ya existían.
+    """
+    if not rows:
+        return 0, 0
+
+    resolver.resolver_filas(rows.values(), TRAKCARE_CATALOG_FIELDS)
+
+    existing = set(
+        HpTrakcare.todas_las_versiones.filter(snapshot=snapshot, run__in={run for run, _ in rows}).values_list(
+            "run", "cod_registro"
+        )
+    ) & rows.keys()
+
+    instances = [
+        HpTrakcare(snapshot=snapshot, run=run, cod_registro=cod_registro, **defaults)
+        for (run, cod_registro), defaults in rows.items()
+    ]
+    HpTrakcare.todas_las_versiones.bulk_create(
+        instances,
+        update_conflicts=True,
+        unique_fields=["snapshot", "run", "cod_registro"],
+        update_fields=TRAKCARE_UPSERT_FIELDS,
+    )
+    return len(rows) - len(existing), len(existing)
 
-        for index, record in enumerate(serializer.validated_data):
-            run_clean = normalize_run(record.get("RUN") or record.get("run"))
-            if not run_clean:
+
+def _ingest_trakcare_records(
+    records: List[Dict[str, str]],
+    *,
+    replace_mode: bool = False,
+    on_progress: Callable[[int], None] | None = None,
+    etapas: Dict[str, float] | None = None,
+    reanudar_desde: int = 0,
+) -> Tuple[int, int, List[Dict[str, str]]]:
+    """
+    Crea o actualiza registros de HP Trakcare.
+
+    Sin reemplazo se escribe sobre la versión activa: sin `on_progress` en una
+    única transacción; con `on_progress` en lotes de CORTE_BULK_BATCH_SIZE, cada
+    uno confirmado por separado junto con su llamada a `on_progress`. Con
+    `reanudar_desde` se omiten las filas confirmadas en un intento anterior.
+
+    Con reemplazo los registros se escriben por lotes en una versión nueva, que se
+    activa al terminar (ver api/snapshots.py): mientras tanto las consultas siguen
+    viendo la versión anterior completa.
+    """
+    created = 0
+    updated = 0
+    skipped: List[Dict[str, str]] = []
+    etapas = etapas if etapas is not None else {}
+    resolver = CatalogoResolver()
+    snapshot = crear_snapshot() if replace_mode else snapshot_activo()
+
+    def process_batch(batch, offset, normalized=None):
+        nonlocal created, updated
+        if normalized is None:
+            with _medir_etapa(etapas, "normalizacion"):
+                normalized = normalizar_trakcare(batch, start_index=offset)
+
+        # Un RUN + código repetido en el lote se escribe una vez, con sus últimos valores
+        rows: Dict[Tuple[str, str], Dict] = {}
+        for index, values in enumerate(normalized, start=offset):
+            if values is None:
                 skipped.append({"index": index, "motivo": "RUN inválido"})
                 continue
+            run_clean, cod_registro_raw, defaults = values
+            rows[(run_clean, cod_registro_raw)] = defaults
+            if len(rows) == _get_corte_batch_size():
+                created_batch, updated_batch = _upsert_trakcare_rows(rows, resolver, snapshot)
+                created += created_batch
+                updated += updated_batch
+                rows = {}
+
+        created_batch, updated_batch = _upsert_trakcare_rows(rows, resolver, snapshot)
+        created += created_batch
+        updated += updated_batch
+
+    if on_progress is None and not replace_mode:
+        with _medir_etapa(etapas, "insercion"), transaction.atomic():
+            process_batch(records, 0)
+            bump_data_version("trakcare")
+        return created, updated, skipped
+
+    batch_size = _get_corte_batch_size()
+    inicio = 0 if replace_mode else min(reanudar_desde, len(records))
+    # Los lotes siguientes se normalizan en el pool mientras se inserta el actual
+    lotes = iter(
+        normalizar_trakcare_por_lotes(
+            (
+                (offset, records[offset : offset + batch_size])
+                for offset in range(inicio, len(records), batch_size)
+            ),
+            total_carga=len(records) - inicio,
+        )
+    )
+    try:
+        while True:
+            with _medir_etapa(etapas, "normalizacion"):
+                lote = next(lotes, None)
+            if lote is None:
+                break
+            (offset, batch), normalized = lote
+            with _medir_etapa(etapas, "insercion"), transaction.atomic():
+                process_batch(batch, offset, normalized)
+                if not replace_mode:
+                    bump_data_version("trakcare")
+                    if on_progress is not None:
+                        on_progress(min(offset + batch_size, len(records)))
+            if replace_mode and on_progress is not None:
+                on_progress(min(offset + batch_size, len(records)))
+    except Exception:
+        if replace_mode:
+            descartar_snapshot(snapshot)
+        raise
 
-            cod_registro_raw = _safe_str(record.get("codRegistro"))
-            if not cod_registro_raw:
-                cod_registro_raw = _safe_str(record.get("idTrakcare"))
-            if not cod_registro_raw:
-                cod_registro_raw = f"{run_clean}-{index}"
-
-            defaults = {
-                "cod_familia": _safe_str(record.get("codFamilia")),
-                "relacion_parentezco": _safe_str(record.get("relacionParentezco")),
-                "id_trakcare": _safe_str(record.get("idTrakcare")),
-                "etnia": _safe_str(record.get("etnia")),
-                "nacionalidad": _safe_str(record.get("nacionalidad")),
-                "ap_paterno": _safe_str(record.get("apPaterno")),
-                "ap_materno": _safe_str(record.get("apMaterno")),
-                "nombre": _safe_str(record.get("nombre")),
-                "genero": _safe_str(record.get("genero")),
-                "fecha_nacimiento": _parse_date(record.get("fechaNacimiento")),
-                "edad": _parse_int(record.get("edad")),
-                "direccion": _safe_str(record.get("direccion")),
-                "telefono": _safe_str(record.get("telefono")),
-                "telefono_celular": _safe_str(record.get("telefonoCelular")),
-                "telefono_recado": _safe_str(record.get("TelefonoRecado")),
-                "servicio_salud": _safe_str(record.get("servicioSalud")),
-                "centro_inscripcion": _safe_str(record.get("centroInscripcion")),
-                "sector": _safe_str(record.get("sector")),
-                "prevision": _safe_str(record.get("prevision")),
-                "plan_trakcare": _safe_str(record.get("planTrakcare")),
-                "prais_trakcare": _safe_str(record.get("praisTrakcare")),
-                "fecha_incorporacion": _parse_date(record.get("fechaIncorporacion")),
-                "fecha_ultima_modif": _parse_date(record.get("fechaUltimaModif")),
-                "fecha_defuncion": _parse_date(record.get("fechaDefuncion")),
-            }
+    if replace_mode:
+        with _medir_etapa(etapas, "activacion"):
+            activar_snapshot(snapshot)
 
-            _, created_flag = HpTrakcare.objects.update_or_create(
-                run=run_clean,
-                cod_registro=cod_registro_raw,
-                defaults={
-                    **defaults,
-                    "cod_registro": cod_registro_raw,
-                },
-            )
+    return created, updated, skipped
 
-            if created_flag:
-                created += 1
-            else:
-                updated += 1
 
+def _build_trakcare_ingest_response(created: int, updated: int, skipped: List[Dict[str, str]]) -> Response:
     total_records = HpTrakcare.objects.count()
 
     return Response(
@@ -884,6 +2247,44 @@ def upload_hp_trakcare(request):
     )
 
 
+@api_view(["GET"])
+def trabajos_list(request):
+    """
+    Lista los trabajos de carga más recientes.
+
+    Parámetros:
+    - estado: filtra por estado (PENDIENTE, EN_PROCESO, EXITOSO, ERROR)
+    - tipo_carga: CORTE_FONASA o HP_TRAKCARE
+    - limit: cantidad máxima de trabajos (por defecto 50)
+    """
+    # Quien sigue sus cargas tras un reinicio también las pone de nuevo en marcha
+    reanudar_trabajos()
+    queryset = TrabajoCarga.objects.select_related("historial")
+
+    estado = _safe_str(request.query_params.get("estado")).upper()
+    if estado:
+        queryset = queryset.filter(estado=estado)
+    tipo_carga = _safe_str(request.query_params.get("tipo_carga")).upper()
+    if tipo_carga:
+        queryset = queryset.filter(tipo_carga=tipo_carga)
+
+    limit = _parse_int(request.query_params.get("limit")) or 50
+    serializer = TrabajoCargaSerializer(queryset[: max(limit, 1)], many=True)
+    return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+def trabajo_detail(request, pk: int):
+    """Estado y avance de un trabajo de carga (filas procesadas, etapas y resultado)."""
+    reanudar_trabajos()
+    try:
+        trabajo = TrabajoCarga.objects.select_related("historial").get(pk=pk)
+    except TrabajoCarga.DoesNotExist:
+        return Response({"detail": "Trabajo no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response(TrabajoCargaSerializer(trabajo).data, status=status.HTTP_200_OK)
+
+
 @api_view(["GET", "PATCH", "DELETE"])
 def corte_fonasa_detail(request, pk: int):
     try:
@@ -891,21 +2292,215 @@ def corte_fonasa_detail(request, pk: int):
     except CorteFonasa.DoesNotExist:
         return Response({"detail": "Registro no encontrado"}, status=status.HTTP_404_NOT_FOUND)
 
-    if request.method == "DELETE":
-        instance.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
-
     if request.method == "GET":
         return Response(_build_corte_payload(instance))
 
+    affected_months = {(instance.fecha_corte.year, instance.fecha_corte.month)}
+
+    if request.method == "DELETE":
+        with transaction.atomic():
+            instance.delete()
+            _refresh_corte_monthly_stats(affected_months)
+            bump_data_version("corte")
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
     serializer = CorteFonasaDetailSerializer(instance, data=request.data, partial=True)
     serializer.is_valid(raise_exception=True)
-    serializer.save()
+    with transaction.atomic():
+        serializer.save()
+        instance.refresh_from_db()
+        affected_months.add((instance.fecha_corte.year, instance.fecha_corte.month))
+        _refresh_corte_monthly_stats(affected_months)
+        bump_data_version("corte")
 
-    instance.refresh_from_db()
     return Response(_build_corte_payload(instance), status=status.HTTP_200_OK)
 
 
+@api_view(["GET"])
+@etag_por_version("corte")
+def corte_fonasa_delta(request):
+    """
+    Altas, bajas y cambios de un corte respecto del corte cargado anterior.
+    Se lee desde CorteFonasaDelta, calculada en cada carga.
+
+    Parámetros:
+    - month: mes del corte (YYYY-MM); por defecto el último con delta calculado
+    - tipo: ALTA, BAJA o CAMBIO
+    - cambio: tramo, centro o motivo (solo cambios de ese campo)
+    - search: filtra por RUN o nombre
+    - offset / limit: paginación de las filas (limit por defecto 500, 0 = todas)
+    """
+    cache_key, cached = get_cached_response("corte-fonasa-delta", request.query_params)
+    if cached is not None:
+        return Response(cached)
+
+    month_filter = _parse_month(request.query_params.get("month"))
+    if month_filter is None:
+        latest = CorteFonasaDelta.objects.order_by("-periodo_anio", "-periodo_mes").values(
+            "periodo_anio", "periodo_mes"
+        ).first()
+        if latest is None:
+            return Response({"month": None, "previous_month": None, "summary": {}, "total": 0, "rows": []})
+        month_filter = (latest["periodo_anio"], latest["periodo_mes"])
+
+    year, month = month_filter
+    queryset = CorteFonasaDelta.objects.filter(periodo_anio=year, periodo_mes=month)
+
+    summary = queryset.aggregate(
+        altas=Count("id", filter=Q(tipo="ALTA")),
+        bajas=Count("id", filter=Q(tipo="BAJA")),
+        cambios=Count("id", filter=Q(tipo="CAMBIO")),
+        cambios_tramo=Count("id", filter=Q(cambio_tramo=True)),
+        cambios_centro=Count("id", filter=Q(cambio_centro=True)),
+        cambios_motivo=Count("id", filter=Q(cambio_motivo=True)),
+    )
+    previous = queryset.values("anterior_anio", "anterior_mes").first()
+
+    tipo = _safe_str(request.query_params.get("tipo")).upper()
+    if tipo:
+        queryset = queryset.filter(tipo=tipo)
+    cambio = _safe_str(request.query_params.get("cambio")).lower()
+    if cambio in {"tramo", "centro", "motivo"}:
+        queryset = queryset.filter(**{f"cambio_{cambio}": True})
+    search_term = _safe_str(request.query_params.get("search"))
+    if search_term:
+        queryset = queryset.filter(Q(run__icontains=search_term) | Q(nombre__icontains=search_term))
+
+    total_count = queryset.count()
+
+    try:
+        offset = max(int(request.query_params.get("offset", "0")), 0)
+    except ValueError:
+        offset = 0
+    limit_value = _parse_int(request.query_params.get("limit"))
+    limit_value = 500 if limit_value is None else max(limit_value, 0)
+
+    ordered_queryset = queryset.order_by("tipo", "run")
+    if limit_value == 0:
+        data_queryset = ordered_queryset[offset:]
+    else:
+        data_queryset = ordered_queryset[offset : offset + limit_value]
+
+    rows = [
+        {
+            "run": item.run,
+            "nombre": item.nombre,
+            "tipo": item.tipo,
+            "tramoAnterior": item.tramo_anterior,
+            "tramoActual": item.tramo_actual,
+            "centroAnterior": item.centro_anterior,
+            "centroActual": item.centro_actual,
+            "motivoAnterior": item.motivo_anterior,
+            "motivoActual": item.motivo_actual,
+            "cambioTramo": item.cambio_tramo,
+            "cambioCentro": item.cambio_centro,
+            "cambioMotivo": item.cambio_motivo,
+        }
+        for item in data_queryset
+    ]
+
+    response_data = {
+        "month": _format_month_key(year, month),
+        "label": _format_month_label(year, month),
+        "previous_month": (
+            _format_month_key(previous["anterior_anio"], previous["anterior_mes"]) if previous else None
+        ),
+        "summary": summary,
+        "total": total_count,
+        "rows": rows,
+    }
+    set_cached_response(cache_key, response_data)
+    return Response(response_data)
+
+
+@api_view(["GET"])
+def busqueda(request):
+    """
+    Búsqueda por RUN o nombre con resultados ordenados por relevancia.
+
+    Parámetros:
+    - q: término de búsqueda (requerido, mínimo 2 caracteres)
+    - fuentes: corte, trakcare y/o nuevos_usuarios separados por coma (por defecto todas)
+    - limit: resultados por fuente (por defecto 20, máximo 100)
+    """
+    termino = _safe_str(request.query_params.get("q"))
+    if len(termino) < 2:
+        return Response(
+            {"detail": "El parámetro 'q' debe tener al menos 2 caracteres"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    fuentes_param = _safe_str(request.query_params.get("fuentes"))
+    fuentes = [item.strip() for item in fuentes_param.split(",") if item.strip()] if fuentes_param else list(FUENTES)
+    desconocidas = [fuente for fuente in fuentes if fuente not in FUENTES]
+    if desconocidas:
+        return Response(
+            {"detail": f"Fuentes no válidas: {', '.join(desconocidas)}. Opciones: {', '.join(FUENTES)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    limit_value = _parse_int(request.query_params.get("limit"))
+    limit_value = 20 if limit_value is None else min(max(limit_value, 1), 100)
+
+    return Response({"query": termino, "results": buscar(termino, fuentes, limit_value)})
+
+
+@api_view(["GET"])
+@permission_classes([AccesoMetricas])
+def metricas(request):
+    """
+    Métricas por endpoint de este proceso en formato de texto de Prometheus.
+    Solo para usuarios staff o con el token de METRICS_TOKEN (ver api/metricas.py).
+    """
+    return HttpResponse(render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@api_view(["GET"])
+@renderer_classes(EXPORT_RENDERERS)
+def corte_fonasa_export(request):
+    """
+    Exporta el corte FONASA como archivo descargable.
+
+    Parámetros:
+    - format: csv (por defecto), xlsx o parquet (parquet requiere pyarrow)
+    - month, search, centro, centros, validated_only, non_validated_only: los
+      mismos filtros del listado
+    """
+    params = _corte_listing_params(request)
+    queryset = _filter_corte_listing(CorteFonasa.objects.all(), params).order_by(*CORTE_LIST_ORDERING)
+
+    month_filter = params["month_filter"]
+    nombre_archivo = f"corte_fonasa_{_format_month_key(*month_filter)}" if month_filter else "corte_fonasa"
+    return _build_export_response(request, queryset, CORTE_EXPORT_COLUMNS, nombre_archivo)
+
+
+@api_view(["GET"])
+@renderer_classes(EXPORT_RENDERERS)
+def hp_trakcare_export(request):
+    """
+    Exporta HP Trakcare como archivo descargable.
+
+    Parámetros:
+    - format: csv (por defecto), xlsx o parquet (parquet requiere pyarrow)
+    - month, search: los mismos filtros del listado
+    """
+    queryset = _filter_trakcare_listing(
+        request, HpTrakcare.objects.de_snapshot(snapshot_activo_id())
+    ).order_by("run", "nombre")
+
+    month_filter = _parse_month(request.query_params.get("month"))
+    nombre_archivo = f"hp_trakcare_{_format_month_key(*month_filter)}" if month_filter else "hp_trakcare"
+    return _build_export_response(request, queryset, TRAKCARE_EXPORT_COLUMNS, nombre_archivo)
+
+
+def _build_export_response(request, queryset, columnas, nombre_archivo: str):
+    formato = _safe_str(request.query_params.get("format") or "csv").lower()
+    try:
+        return exportar(queryset, columnas, formato, nombre_archivo)
+    except ExportFormatError as exc:
+        return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+
 @api_view(["GET"])
 def corte_fonasa_historial_mensual(request):
     """
@@ -954,13 +2549,8 @@ def corte_fonasa_historial_mensual(request):
         month = corte.fecha_corte.month
         mes_str = f"{meses[month - 1]} {year}"
         
-        # Determinar estado basado en motivo
-        motivo_rechazado = corte.motivo_normalizado in NON_VALIDATED_MOTIVOS if corte.motivo_normalizado else False
-        
-        if motivo_rechazado:
-            estado = "RECHAZADO"
-        else:
-            estado = "VALIDADO"
+        # Estado según la clasificación persistida (estado_validacion)
+        estado = "VALIDADO" if corte.estado_validacion == "VALIDADO" else "RECHAZADO"
         
         historial.append({
             "mes": month,
@@ -990,6 +2580,7 @@ def hp_trakcare_detail(request, pk: int):
 
     if request.method == "DELETE":
         instance.delete()
+        bump_data_version("trakcare")
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     if request.method == "GET":
@@ -998,6 +2589,7 @@ def hp_trakcare_detail(request, pk: int):
     serializer = HpTrakcareDetailSerializer(instance, data=request.data, partial=True)
     serializer.is_valid(raise_exception=True)
     serializer.save()
+    bump_data_version("trakcare")
 
     instance.refresh_from_db()
     return Response(_build_trakcare_payload(instance), status=status.HTTP_200_OK)
@@ -1041,6 +2633,7 @@ def hp_trakcare_buscar(request):
 # ============================================================================
 
 @api_view(["GET", "POST"])
+@etag_por_version("nuevos_usuarios", "catalogos")
 def nuevos_usuarios_list(request):
     """
     GET: Lista usuarios nuevos con filtros por periodo y estado
@@ -1050,6 +2643,7 @@ def nuevos_usuarios_list(request):
         serializer = NuevoUsuarioSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         usuario = serializer.save()
+        bump_data_version("nuevos_usuarios")
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     # GET - Listar con filtros
@@ -1120,6 +2714,7 @@ def nuevo_usuario_detail(request, pk: int):
     
     if request.method == "DELETE":
         usuario.delete()
+        bump_data_version("nuevos_usuarios")
         return Response(status=status.HTTP_204_NO_CONTENT)
     
     if request.method == "GET":
@@ -1130,6 +2725,7 @@ def nuevo_usuario_detail(request, pk: int):
     serializer = NuevoUsuarioSerializer(usuario, data=request.data, partial=True)
     serializer.is_valid(raise_exception=True)
     serializer.save()
+    bump_data_version("nuevos_usuarios")
     
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -1161,6 +2757,7 @@ def marcar_usuario_revisado(request, pk: int):
     usuario.observaciones_trakcare = observaciones_trakcare
     usuario.checklist_trakcare = checklist_trakcare
     usuario.save()
+    bump_data_version("nuevos_usuarios")
     
     # Retornar el usuario actualizado
     serializer = NuevoUsuarioSerializer(usuario)
@@ -1301,16 +2898,12 @@ def nuevos_usuarios_historial(request):
         corte_fonasa = cortes_usuario_dict.get(periodo_key)
 
         if corte_fonasa:
-            # El usuario aparece en el corte FONASA
-            # Verificar si el motivo es de rechazo
-            motivo_rechazado = corte_fonasa.motivo_normalizado in NON_VALIDATED_MOTIVOS
-
-            if motivo_rechazado:
-                # RECHAZADO - aparece en corte pero con motivo de rechazo
-                estado = "RECHAZADO"
-            else:
-                # VALIDADO - aparece en corte con inscripción válida
+            # El usuario aparece en el corte FONASA: RECHAZADO si la
+            # clasificación persistida no lo valida (rechazo o fallecido)
+            if corte_fonasa.estado_validacion == "VALIDADO":
                 estado = "VALIDADO"
+            else:
+                estado = "RECHAZADO"
 
             historial.append({
                 "mes": mes,
@@ -1391,6 +2984,15 @@ def exportar_nuevos_usuarios(request):
     }, status=status.HTTP_200_OK)
 
 
+# Campo de NuevoUsuario -> catálogo de CatalogoResolver
+NUEVO_USUARIO_CATALOG_FIELDS = {
+    "nacionalidad": "nacionalidad",
+    "etnia": "etnia",
+    "sector": "sector",
+    "subsector": "subsector",
+}
+
+
 @api_view(["GET", "POST", "DELETE"])
 def upload_nuevos_usuarios(request):
     """
@@ -1426,6 +3028,7 @@ def upload_nuevos_usuarios(request):
                 )
         
         deleted_count, _ = queryset.delete()
+        bump_data_version("nuevos_usuarios")
         return Response({"deleted": deleted_count}, status=status.HTTP_200_OK)
 
     if request.method == "GET":
@@ -1476,15 +3079,21 @@ def upload_nuevos_usuarios(request):
     
     replace_mode = request.query_params.get("replace", "").lower() in {"1", "true", "yes"}
     
-    # Preparar registros y detectar periodos a reemplazar
-    prepared_records: List[Dict[str, str]] = []
+    # Normalizar registros y detectar periodos a reemplazar
+    normalized = normalizar_nuevos_usuarios(serializer.validated_data)
     periods_to_replace: set[Tuple[int, int]] = set()
     
-    for record in serializer.validated_data:
-        fecha_inscripcion = _parse_date(record.get("fecha"))
-        if fecha_inscripcion and replace_mode:
-            periods_to_replace.add((fecha_inscripcion.year, fecha_inscripcion.month))
-        prepared_records.append(record)
+    if replace_mode:
+        for record in serializer.validated_data:
+            fecha_inscripcion = _parse_date(record.get("fecha"))
+            if fecha_inscripcion:
+                periods_to_replace.add((fecha_inscripcion.year, fecha_inscripcion.month))
+    
+    # Nombres de catálogo -> instancias, sin consultas por fila
+    CatalogoResolver().resolver_filas(
+        (values[3] for values in normalized if values is not None),
+        NUEVO_USUARIO_CATALOG_FIELDS,
+    )
     
     with transaction.atomic():
         # Si está en modo replace, eliminar registros del periodo
@@ -1495,11 +3104,8 @@ def upload_nuevos_usuarios(request):
                     periodo_mes=month
                 ).delete()
         
-        for index, record in enumerate(prepared_records):
-            run_clean = normalize_run(record.get("run"))
-            fecha_inscripcion = _parse_date(record.get("fecha"))
-            
-            if not run_clean or not fecha_inscripcion:
+        for index, (record, values) in enumerate(zip(serializer.validated_data, normalized)):
+            if values is None:
                 skipped.append({
                     "index": index,
                     "motivo": "RUN o fecha inválidos",
@@ -1507,69 +3113,10 @@ def upload_nuevos_usuarios(request):
                 })
                 continue
             
-            # Buscar catálogos por nombre o código
-            nacionalidad_obj = None
-            nacionalidad_str = _safe_str(record.get("nacionalidad"))
-            if nacionalidad_str:
-                try:
-                    nacionalidad_obj = Nacionalidad.objects.filter(
-                        Q(nombre__iexact=nacionalidad_str) | 
-                        Q(codigo__iexact=nacionalidad_str)
-                    ).first()
-                except Exception:
-                    pass
-            
-            etnia_obj = None
-            etnia_str = _safe_str(record.get("etnia"))
-            if etnia_str:
-                try:
-                    etnia_obj = Etnia.objects.filter(
-                        Q(nombre__iexact=etnia_str) | 
-                        Q(codigo__iexact=etnia_str)
-                    ).first()
-                except Exception:
-                    pass
-            
-            sector_obj = None
-            sector_str = _safe_str(record.get("sector"))
-            if sector_str:
-                try:
-                    sector_obj = Sector.objects.filter(
-                        Q(nombre__iexact=sector_str) | 
-                        Q(codigo__iexact=sector_str)
-                    ).first()
-                except Exception:
-                    pass
-            
-            subsector_obj = None
-            subsector_str = _safe_str(record.get("subsector"))
-            if subsector_str:
-                try:
-                    subsector_obj = Subsector.objects.filter(
-                        Q(nombre__iexact=subsector_str) | 
-                        Q(codigo__iexact=subsector_str)
-                    ).first()
-                except Exception:
-                    pass
+            run_clean, fecha_inscripcion, defaults, catalogos = values
             
             # Crear/actualizar el registro
-            defaults = {
-                "nombres": _safe_str(record.get("nombres")),
-                "apellido_paterno": _safe_str(record.get("apellidoPaterno")),
-                "apellido_materno": _safe_str(record.get("apellidoMaterno")),
-                "fecha_inscripcion": fecha_inscripcion,
-                "periodo_mes": fecha_inscripcion.month,
-                "periodo_anio": fecha_inscripcion.year,
-                "nacionalidad": nacionalidad_obj,
-                "etnia": etnia_obj,
-                "sector": sector_obj,
-                "subsector": subsector_obj,
-                "codigo_percapita": _safe_str(record.get("codPercapita")),
-                "codigo_sector": _safe_str(record.get("codigoSector")),
-                "centro": _safe_str(record.get("centro")),
-                "observaciones": _safe_str(record.get("observaciones")),
-                "estado": _safe_str(record.get("estado")) or "PENDIENTE",
-            }
+            defaults = {**defaults, **catalogos}
             
             _, created_flag = NuevoUsuario.objects.update_or_create(
                 run=run_clean,
@@ -1582,6 +3129,8 @@ def upload_nuevos_usuarios(request):
                 created += 1
             else:
                 updated += 1
+
+        bump_data_version("nuevos_usuarios")
     
     total_records = NuevoUsuario.objects.count()
     
@@ -1656,32 +3205,21 @@ def validar_contra_corte(request):
         no_validados = 0
         pendientes = 0
         
+        # RUNs validados en el corte, en una sola query sobre estado_validacion
+        runs_validados = set(
+            CorteFonasa.objects.filter(
+                CORTE_VALIDATED_FILTER,
+                fecha_corte=fecha_corte,
+                run__in=usuarios.order_by().values("run"),
+            ).order_by().values_list("run", flat=True)
+        )
+        
         for usuario in usuarios:
-            # Buscar el RUN en el corte de FONASA
-            existe_en_corte = CorteFonasa.objects.filter(
-                run=usuario.run,
-                fecha_corte=fecha_corte
-            ).exists()
-            
-            if existe_en_corte:
-                # Verificar el motivo
-                corte = CorteFonasa.objects.filter(
-                    run=usuario.run,
-                    fecha_corte=fecha_corte
-                ).first()
-                
-                if corte:
-                    if corte.motivo_normalizado in NON_VALIDATED_MOTIVOS:
-                        usuario.estado = "NO_VALIDADO"
-                        no_validados += 1
-                    else:
-                        usuario.estado = "VALIDADO"
-                        validados += 1
-                else:
-                    usuario.estado = "NO_VALIDADO"
-                    no_validados += 1
+            # No validado si no está en el corte o si el corte lo rechaza
+            if usuario.run in runs_validados:
+                usuario.estado = "VALIDADO"
+                validados += 1
             else:
-                # No está en el corte
                 usuario.estado = "NO_VALIDADO"
                 no_validados += 1
             
@@ -1694,6 +3232,7 @@ def validar_contra_corte(request):
         validacion.usuarios_no_validados = no_validados
         validacion.usuarios_pendientes = usuarios.filter(estado="PENDIENTE").count()
         validacion.save()
+        bump_data_version("nuevos_usuarios")
     
     serializer = ValidacionCorteSerializer(validacion)
     
@@ -1758,6 +3297,7 @@ def validacion_detail(request, pk: int):
 # ==================== ENDPOINTS DE CATÁLOGOS ====================
 
 @api_view(["GET"])
+@etag_por_version("catalogos")
 def catalogos_all(request):
     """
     GET: Obtiene todos los catálogos organizados (activos e inactivos)
@@ -1779,6 +3319,7 @@ def etnias_list(request):
         serializer = EtniaSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        bump_data_version("catalogos")
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
     queryset = Etnia.objects.all().order_by("nombre")
@@ -1802,6 +3343,7 @@ def etnia_detail(request, pk: int):
         else:
             etnia.activo = False
             etnia.save()
+        bump_data_version("catalogos")
         return Response(status=status.HTTP_204_NO_CONTENT)
     
     if request.method == "GET":
@@ -1811,6 +3353,7 @@ def etnia_detail(request, pk: int):
     serializer = EtniaSerializer(etnia, data=request.data, partial=True)
     serializer.is_valid(raise_exception=True)
     serializer.save()
+    bump_data_version("catalogos")
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -1822,6 +3365,7 @@ def nacionalidades_list(request):
         serializer = NacionalidadSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        bump_data_version("catalogos")
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
     queryset = Nacionalidad.objects.all().order_by("nombre")
@@ -1845,6 +3389,7 @@ def nacionalidad_detail(request, pk: int):
         else:
             nacionalidad.activo = False
             nacionalidad.save()
+        bump_data_version("catalogos")
         return Response(status=status.HTTP_204_NO_CONTENT)
     
     if request.method == "GET":
@@ -1854,6 +3399,7 @@ def nacionalidad_detail(request, pk: int):
     serializer = NacionalidadSerializer(nacionalidad, data=request.data, partial=True)
     serializer.is_valid(raise_exception=True)
     serializer.save()
+    bump_data_version("catalogos")
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -1865,6 +3411,7 @@ def sectores_list(request):
         serializer = SectorSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        bump_data_version("catalogos")
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
     queryset = Sector.objects.all().order_by("nombre")
@@ -1888,6 +3435,7 @@ def sector_detail(request, pk: int):
         else:
             sector.activo = False
             sector.save()
+        bump_data_version("catalogos")
         return Response(status=status.HTTP_204_NO_CONTENT)
     
     if request.method == "GET":
@@ -1897,6 +3445,7 @@ def sector_detail(request, pk: int):
     serializer = SectorSerializer(sector, data=request.data, partial=True)
     serializer.is_valid(raise_exception=True)
     serializer.save()
+    bump_data_version("catalogos")
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -1908,6 +3457,7 @@ def subsectores_list(request):
         serializer = SubsectorSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        bump_data_version("catalogos")
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
     queryset = Subsector.objects.all().order_by("nombre")
@@ -1931,6 +3481,7 @@ def subsector_detail(request, pk: int):
         else:
             subsector.activo = False
             subsector.save()
+        bump_data_version("catalogos")
         return Response(status=status.HTTP_204_NO_CONTENT)
     
     if request.method == "GET":
@@ -1940,6 +3491,7 @@ def subsector_detail(request, pk: int):
     serializer = SubsectorSerializer(subsector, data=request.data, partial=True)
     serializer.is_valid(raise_exception=True)
     serializer.save()
+    bump_data_version("catalogos")
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -1951,6 +3503,7 @@ def establecimientos_list(request):
         serializer = EstablecimientoSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        bump_data_version("catalogos")
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
     queryset = Establecimiento.objects.all().order_by("nombre")
@@ -1974,6 +3527,7 @@ def establecimiento_detail(request, pk: int):
         else:
             establecimiento.activo = False
             establecimiento.save()
+        bump_data_version("catalogos")
         return Response(status=status.HTTP_204_NO_CONTENT)
     
     if request.method == "GET":
@@ -1983,6 +3537,7 @@ def establecimiento_detail(request, pk: int):
     serializer = EstablecimientoSerializer(establecimiento, data=request.data, partial=True)
     serializer.is_valid(raise_exception=True)
     serializer.save()
+    bump_data_version("catalogos")
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -1990,6 +3545,35 @@ def establecimiento_detail(request, pk: int):
 # HISTORIAL DE CARGAS
 # ============================================================================
 
+def _resolve_carga_origen(request) -> Tuple[str, str | None]:
+    """Retorna el responsable de una carga (RUT del token o usuario autenticado) y la IP del cliente."""
+    # Obtener IP del cliente
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        ip_address = x_forwarded_for.split(',')[0]
+    else:
+        ip_address = request.META.get('REMOTE_ADDR')
+    
+    # Determinar responsable de la carga desde el usuario autenticado
+    usuario_nombre = 'Anónimo'
+    
+    # Intentar obtener del token
+    auth_header = request.headers.get('Authorization', '')
+    token = auth_header.replace("Bearer ", "") if auth_header.startswith('Bearer ') else None
+    rut_del_token = get_rut_from_token(token)
+    if rut_del_token:
+        usuario_nombre = rut_del_token
+    elif request.user and request.user.is_authenticated:
+        usuario_nombre = (
+            getattr(request.user, "nombre_completo", "")
+            or request.user.get_full_name()
+            or request.user.get_username()
+            or usuario_nombre
+        )
+
+    return usuario_nombre, ip_address
+
+
 @api_view(["GET", "POST"])
 def historial_cargas(request):
     """
@@ -2013,19 +3597,13 @@ def historial_cargas(request):
             queryset = queryset.filter(usuario__icontains=usuario)
 
         filtro_periodo: Q | None = None
-        if periodo:
-            try:
-                periodo = periodo.strip()
-                year_str, month_str = periodo.split("-", 1)
-                periodo_year = int(year_str)
-                periodo_month = int(month_str)
-                filtro_periodo = Q(periodo_anio=periodo_year, periodo_mes=periodo_month) | Q(
-                    fecha_corte__year=periodo_year,
-                    fecha_corte__month=periodo_month,
-                )
-                queryset = queryset.filter(filtro_periodo)
-            except (ValueError, AttributeError):
-                pass
+        periodo_filter = _parse_month(periodo.strip()) if periodo else None
+        if periodo_filter:
+            periodo_year, periodo_month = periodo_filter
+            filtro_periodo = Q(periodo_anio=periodo_year, periodo_mes=periodo_month) | _month_filter(
+                "fecha_corte", periodo_year, periodo_month
+            )
+            queryset = queryset.filter(filtro_periodo)
 
         # Limitar resultados y cargar objetos
         try:
@@ -2098,45 +3676,38 @@ def historial_cargas(request):
                 registro._periodo_key = (year, month)  # type: ignore[attr-defined]
 
         if periodos_requeridos:
-            # Crear query para buscar registros del mismo mes/año
+            # Totales por mes leídos desde CorteMonthlyStats
             periodos_query = Q()
             for year, month in periodos_requeridos:
-                periodos_query |= Q(fecha_corte__year=year, fecha_corte__month=month)
-
-            if periodos_query:
-                base_resumen_queryset = CorteFonasa.objects.filter(periodos_query)
-                resumen_non_validated_filter = Q(
-                    motivo_normalizado__in=NON_VALIDATED_MOTIVOS
-                )
-                resumen_validated_filter = ~resumen_non_validated_filter
-
-                # Agrupar por año/mes de fecha_corte
-                resumen = (
-                    base_resumen_queryset
-                    .values("fecha_corte__year", "fecha_corte__month")
-                    .annotate(
-                        validados=Count("id", filter=resumen_validated_filter),
-                        no_validados=Count("id", filter=resumen_non_validated_filter),
-                        total=Count("id"),
-                    )
+                periodos_query |= Q(periodo_anio=year, periodo_mes=month)
+
+            resumen = (
+                CorteMonthlyStats.objects.filter(periodos_query)
+                .values("periodo_anio", "periodo_mes")
+                .annotate(
+                    validados_mes=Sum("validados"),
+                    no_validados_mes=Sum("no_validados"),
+                    total_mes=Sum("total"),
                 )
+                .order_by()
+            )
 
-                # Crear mapa usando (año, mes) como clave
-                resumen_map = {
-                    (item["fecha_corte__year"], item["fecha_corte__month"]): item
-                    for item in resumen
-                }
+            # Crear mapa usando (año, mes) como clave
+            resumen_map = {
+                (item["periodo_anio"], item["periodo_mes"]): item
+                for item in resumen
+            }
 
-                for registro in registros:
-                    if getattr(registro, "tipo_carga", None) != "CORTE_FONASA":
-                        continue
+            for registro in registros:
+                if getattr(registro, "tipo_carga", None) != "CORTE_FONASA":
+                    continue
 
-                    periodo_key = getattr(registro, "_periodo_key", None)
-                    if periodo_key and periodo_key in resumen_map:
-                        data = resumen_map[periodo_key]
-                        registro.validados = data.get("validados", 0)
-                        registro.no_validados = data.get("no_validados", 0)
-                        registro.total_periodo = data.get("total", 0)
+                periodo_key = getattr(registro, "_periodo_key", None)
+                if periodo_key and periodo_key in resumen_map:
+                    data = resumen_map[periodo_key]
+                    registro.validados = data.get("validados_mes") or 0
+                    registro.no_validados = data.get("no_validados_mes") or 0
+                    registro.total_periodo = data.get("total_mes") or 0
 
         serializer = HistorialCargaSerializer(registros, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -2152,29 +3723,7 @@ def historial_cargas(request):
             )
         
         data = request.data
-        
-        # Obtener IP del cliente
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip_address = x_forwarded_for.split(',')[0]
-        else:
-            ip_address = request.META.get('REMOTE_ADDR')
-        
-        # Determinar responsable de la carga desde el usuario autenticado
-        usuario_nombre = 'Anónimo'
-        
-        # Intentar obtener del token
-        token = auth_header.replace("Bearer ", "")
-        rut_del_token = get_rut_from_token(token)
-        if rut_del_token:
-            usuario_nombre = rut_del_token
-        elif request.user and request.user.is_authenticated:
-            usuario_nombre = (
-                getattr(request.user, "nombre_completo", "")
-                or request.user.get_full_name()
-                or request.user.get_username()
-                or usuario_nombre
-            )
+        usuario_nombre, ip_address = _resolve_carga_origen(request)
 
         # Crear registro de historial
         historial = HistorialCarga.objects.create(
@@ -2200,6 +3749,7 @@ def historial_cargas(request):
 
 
 @api_view(["GET"])
+@etag_por_version("corte", "catalogos")
 def centros_disponibles(request):
     """
     Retorna la lista de centros únicos del último corte disponible.
@@ -2244,6 +3794,76 @@ def centros_disponibles(request):
     }, status=status.HTTP_200_OK)
 
 
+@api_view(["GET"])
+@etag_por_version("corte")
+def dashboard_centros(request):
+    """
+    Serie mensual por centro y estado de validación para los gráficos del
+    dashboard, leída desde CorteMonthlyStats en una sola consulta.
+
+    Parámetros:
+    - months: cantidad de meses más recientes (por defecto 3, 0 = todos)
+    - centros: nombres de centro separados por coma (por defecto todos)
+    """
+    cache_key, cached = get_cached_response("dashboard-centros", request.query_params)
+    if cached is not None:
+        return Response(cached)
+
+    months_value = _parse_int(request.query_params.get("months"))
+    months_value = 3 if months_value is None else max(months_value, 0)
+    centros_param = _safe_str(request.query_params.get("centros"))
+    centros_list = [item.strip() for item in centros_param.split(",") if item.strip()]
+
+    stats_queryset = CorteMonthlyStats.objects.filter(total__gt=0)
+    if centros_list:
+        stats_queryset = stats_queryset.filter(nombre_centro__in=centros_list)
+    grouped_rows = stats_queryset.order_by("-periodo_anio", "-periodo_mes", "nombre_centro").values_list(
+        "periodo_anio", "periodo_mes", "nombre_centro", "total", "validados", "no_validados", "fallecidos"
+    )
+
+    months: Dict[Tuple[int, int], Dict] = {}
+    centros_data: Dict[str, List[Dict]] = {}
+    for year, month, nombre_centro, total, validados, no_validados, fallecidos in grouped_rows.iterator():
+        if (year, month) not in months:
+            # Filas ordenadas por mes descendente: al pasar el límite no quedan meses útiles
+            if months_value and len(months) >= months_value:
+                break
+            months[(year, month)] = {
+                "month": _format_month_key(year, month),
+                "label": _format_month_label(year, month),
+                "total": 0,
+                "validated": 0,
+                "nonValidated": 0,
+                "fallecidos": 0,
+            }
+        summary = months[(year, month)]
+        summary["total"] += total
+        summary["validated"] += validados
+        summary["nonValidated"] += no_validados
+        summary["fallecidos"] += fallecidos
+
+        centros_data.setdefault(nombre_centro, []).append({
+            "month": summary["month"],
+            "label": summary["label"],
+            "total": total,
+            "validated": validados,
+            "nonValidated": no_validados,
+            "fallecidos": fallecidos,
+        })
+
+    summary_rows = list(months.values())
+    response_data = {
+        "latest_month": summary_rows[0]["month"] if summary_rows else None,
+        "summary": summary_rows,
+        "by_centro": [
+            {"centro": nombre, "data": data}
+            for nombre, data in sorted(centros_data.items())
+        ],
+    }
+    set_cached_response(cache_key, response_data)
+    return Response(response_data)
+
+
 @api_view(["POST"])
 def validar_nuevos_usuarios_lote(request):
     """
@@ -2280,26 +3900,16 @@ def validar_nuevos_usuarios_lote(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
     
-    # Obtener último corte disponible
-    ultimo_corte = (
-        CorteFonasa.objects.all()
-        .values("fecha_corte__year", "fecha_corte__month")
-        .annotate(total=Count("id"))
-        .order_by("-fecha_corte__year", "-fecha_corte__month")
-        .first()
-    )
+    # Obtener último corte disponible (MAX sobre el índice de fecha_corte)
+    ultima_fecha_corte = CorteFonasa.objects.aggregate(ultima=Max("fecha_corte"))["ultima"]
     
-    if not ultimo_corte:
+    if not ultima_fecha_corte:
         return Response(
             {"detail": "No hay cortes FONASA disponibles"},
             status=status.HTTP_400_BAD_REQUEST,
         )
     
-    ultimo_corte_fecha = date(
-        ultimo_corte["fecha_corte__year"],
-        ultimo_corte["fecha_corte__month"],
-        1
-    )
+    ultimo_corte_fecha = ultima_fecha_corte.replace(day=1)
     
     # Extraer todos los RUNs para buscar en una sola query
     runs_a_buscar = [normalize_run(u.get("run", "")) for u in usuarios if u.get("run")]
@@ -2309,9 +3919,9 @@ def validar_nuevos_usuarios_lote(request):
     if runs_a_buscar:
         registros_corte = CorteFonasa.objects.filter(
             run__in=runs_a_buscar
-        ).values("run", "motivo", "motivo_normalizado", "aceptado_rechazado")
+        ).order_by("-fecha_corte", "id").values("run", "estado_validacion")
         
-        # Crear diccionario para búsqueda rápida
+        # Crear diccionario para búsqueda rápida (queda el corte más reciente de cada RUN)
         for registro in registros_corte:
             run_norm = normalize_run(registro["run"])
             if run_norm not in corte_dict:
@@ -2350,23 +3960,8 @@ def validar_nuevos_usuarios_lote(request):
             existe_en_corte = bool(registro_corte)
             
             if registro_corte:
-                # PRIMERO verificar aceptado_rechazado
-                aceptado_rechazado = (registro_corte.get("aceptado_rechazado") or "").upper()
-                motivo_normalizado = (registro_corte.get("motivo_normalizado") or "").upper()
-                
-                # Lógica de validación basada en aceptado_rechazado
-                if "FALLECIDO" in motivo_normalizado or "FALLECIDO" in aceptado_rechazado:
-                    nuevo_estado = "FALLECIDO"
-                elif "RECHAZADO" in aceptado_rechazado:
-                    nuevo_estado = "NO_VALIDADO"
-                elif "ACEPTADO" in aceptado_rechazado or "MANTIENE" in aceptado_rechazado:
-                    nuevo_estado = "VALIDADO"
-                else:
-                    # Fallback a motivo_normalizado si aceptado_rechazado está vacío
-                    if any(m in motivo_normalizado for m in NON_VALIDATED_MOTIVOS):
-                        nuevo_estado = "NO_VALIDADO"
-                    else:
-                        nuevo_estado = "VALIDADO"
+                # VALIDADO, NO_VALIDADO o FALLECIDO según classify_estado_validacion
+                nuevo_estado = registro_corte["estado_validacion"]
             else:
                 # Usuario inscrito antes del último corte pero NO aparece en corte
                 nuevo_estado = "NO_VALIDADO"
@@ -2404,6 +3999,7 @@ def validar_nuevos_usuarios_lote(request):
                     estado=update_data["estado"]
                 )
                 total_actualizados += 1
+            bump_data_version("nuevos_usuarios")
     
     return Response(
         {
@@ -2411,8 +4007,8 @@ def validar_nuevos_usuarios_lote(request):
             "totalProcesados": len(resultados),
             "totalActualizados": total_actualizados,
             "ultimoCorte": {
-                "mes": ultimo_corte["fecha_corte__month"],
-                "anio": ultimo_corte["fecha_corte__year"],
+                "mes": ultimo_corte_fecha.month,
+                "anio": ultimo_corte_fecha.year,
             }
         },
         status=status.HTTP_200_OK,
@@ -2982,7 +4578,7 @@ def buscar_usuario(request):
             }
         
         # Determinar si está validado
-        es_validado = _is_validated_corte(corte.aceptado_rechazado, corte.motivo)
+        es_validado = corte.is_validated
         
         # Actualizar estado de validación del mes (si hay al menos uno validado, el mes se considera validado)
         if cortes_por_mes[mes_key]["validado"] is None:
@@ -3118,6 +4714,36 @@ def buscar_usuario(request):
     return Response(response_data, status=status.HTTP_200_OK)
 
 
+def _corte_resumen_por_run(runs: Iterable[str]) -> Dict[str, Tuple[int, date, str]]:
+    """
+    Por RUN: (cantidad de cortes, fecha del último corte, estado de validación en
+    ese corte). Dos consultas sin importar cuántos RUN se pidan.
+    """
+    runs = [run for run in runs if run]
+    if not runs:
+        return {}
+
+    totales = {
+        item["run"]: (item["total"], item["ultimo_corte"])
+        for item in CorteFonasa.objects.filter(run__in=runs)
+        .values("run")
+        .annotate(total=Count("id"), ultimo_corte=Max("fecha_corte"))
+        .order_by()
+    }
+    if not totales:
+        return {}
+
+    ultimos_q = Q()
+    for run, (_, ultimo_corte) in totales.items():
+        ultimos_q |= Q(run=run, fecha_corte=ultimo_corte)
+    estados: Dict[str, str] = {}
+    # Con varias filas del mismo corte gana la más reciente
+    for run, estado in CorteFonasa.objects.filter(ultimos_q).order_by("id").values_list("run", "estado_validacion"):
+        estados[run] = estado
+
+    return {run: (total, ultimo_corte, estados.get(run)) for run, (total, ultimo_corte) in totales.items()}
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def buscar_familia(request):
@@ -3157,24 +4783,21 @@ def buscar_familia(request):
             status=status.HTTP_200_OK,
         )
 
-    # Buscar todos los miembros de la familia
-    miembros_familia = HpTrakcare.objects.filter(
+    # Buscar todos los miembros de la familia, en la misma versión que el registro principal
+    miembros_familia = HpTrakcare.objects.de_snapshot(hp_principal.snapshot_id).filter(
         cod_familia=hp_principal.cod_familia
     ).select_related(
         'etnia', 'nacionalidad', 'centro_inscripcion', 'sector'
     ).order_by('relacion_parentezco', 'run')
 
+    # Resumen de cortes de todos los miembros con un número fijo de consultas
+    miembros_familia = list(miembros_familia)
+    resumen_cortes = _corte_resumen_por_run({miembro.run for miembro in miembros_familia})
+
     # Serializar cada miembro con información resumida de cortes
     miembros_data = []
     for miembro in miembros_familia:
-        # Obtener resumen de cortes para este miembro
-        cortes_count = CorteFonasa.objects.filter(run=miembro.run).count()
-        ultimo_corte = CorteFonasa.objects.filter(run=miembro.run).order_by('-fecha_corte').first()
-
-        # Determinar si tiene cortes validados
-        tiene_validados = False
-        if ultimo_corte:
-            tiene_validados = _is_validated_corte(ultimo_corte.aceptado_rechazado, ultimo_corte.motivo)
+        cortes_count, ultimo_corte, estado_ultimo_corte = resumen_cortes.get(miembro.run, (0, None, None))
 
         miembro_data = {
             "id": miembro.id,
@@ -3197,8 +4820,9 @@ def buscar_familia(request):
             "es_principal": miembro.run == normalized_run,
             # Información de cortes
             "total_cortes": cortes_count,
-            "ultimo_corte": ultimo_corte.fecha_corte.isoformat() if ultimo_corte else None,
-            "tiene_validados": tiene_validados,
+            "ultimo_corte": ultimo_corte.isoformat() if ultimo_corte else None,
+            "estado_ultimo_corte": estado_ultimo_corte,
+            "tiene_validados": estado_ultimo_corte == "VALIDADO",
         }
         miembros_data.append(miembro_data)
 
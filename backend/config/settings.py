@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 import os
 from pathlib import Path
+from corsheaders.defaults import default_headers
 from decouple import config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -47,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.metricas.MetricasMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -125,16 +127,39 @@ USE_TZ = True
 
 # Cache Configuration
 # https://docs.djangoproject.com/en/5.2/topics/cache/
+# Caché compartida entre los workers (ver api/cache_datos.py):
+# - "file": archivos en CACHE_LOCATION (por defecto; sirve con varios workers en un servidor)
+# - "db": tabla CACHE_LOCATION (requiere `python manage.py createcachetable`)
+# - "redis": servidor Redis en CACHE_LOCATION (producción; requiere el paquete redis)
+# - "locmem": memoria de cada proceso (solo desarrollo)
+CACHE_BACKEND = config("CACHE_BACKEND", default="file")
+_CACHE_BACKENDS = {
+    "file": ("django.core.cache.backends.filebased.FileBasedCache", str(BASE_DIR / "cache")),
+    "db": ("django.core.cache.backends.db.DatabaseCache", "api_cache"),
+    "redis": ("django.core.cache.backends.redis.RedisCache", "redis://127.0.0.1:6379/1"),
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "percapita-cache"),
+}
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'percapita-cache',
+        'BACKEND': _CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': config("CACHE_LOCATION", default=_CACHE_BACKENDS[CACHE_BACKEND][1]),
+        'KEY_PREFIX': 'percapita',
+        'TIMEOUT': 600,
         'OPTIONS': {
-            'MAX_ENTRIES': 100,  # Máximo 100 entradas en cache
-        }
+            'MAX_ENTRIES': 5000,
+        } if CACHE_BACKEND != "redis" else {},
     }
 }
 
+# Segundos que se guardan las respuestas cacheadas; una carga las invalida antes
+RESPONSE_CACHE_TIMEOUT = config("RESPONSE_CACHE_TIMEOUT", default=600, cast=int)
+
+# Peticiones más lentas que este umbral (ms) se registran con sus consultas; 0 desactiva
+METRICS_SLOW_REQUEST_MS = config("METRICS_SLOW_REQUEST_MS", default=0, cast=int)
+
+# Token Bearer con el que Prometheus lee /api/metrics/; vacío = solo usuarios staff
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
@@ -157,6 +182,10 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Peticiones condicionales: el frontend puede reenviar el ETag recibido
+CORS_ALLOW_HEADERS = (*default_headers, "if-none-match")
+CORS_EXPOSE_HEADERS = ["ETag"]
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
@@ -168,3 +197,23 @@ REST_FRAMEWORK = {
 }
 
 ADMIN_DELETE_PASSWORD = config("ADMIN_DELETE_PASSWORD", default="admin123")
+
+# Tamaño de lote para la inserción masiva de registros del corte FONASA
+CORTE_BULK_BATCH_SIZE = config("CORTE_BULK_BATCH_SIZE", default=5000, cast=int)
+
+# Ejecución de cargas en segundo plano: "thread" (pool en el proceso web, que
+# retoma por sí mismo los trabajos interrumpidos por un reinicio) o "command"
+# (proceso aparte con `python manage.py procesar_trabajos`)
+INGESTA_EJECUTOR = config("INGESTA_EJECUTOR", default="thread")
+INGESTA_WORKERS = config("INGESTA_WORKERS", default=2, cast=int)
+# Un trabajo EN_PROCESO sin avance en este plazo (segundos) vuelve a la cola;
+# tras INGESTA_TRABAJO_MAX_INTENTOS intentos queda en ERROR
+INGESTA_TRABAJO_TIMEOUT = config("INGESTA_TRABAJO_TIMEOUT", default=1800, cast=int)
+INGESTA_TRABAJO_MAX_INTENTOS = config("INGESTA_TRABAJO_MAX_INTENTOS", default=3, cast=int)
+
+# Crear en los catálogos los valores desconocidos que traen las cargas (etnia, sector, ...)
+INGESTA_CREAR_CATALOGOS = config("INGESTA_CREAR_CATALOGOS", default=False, cast=bool)
+
+# Normalización de cargas grandes en procesos paralelos (0 o 1 = sin procesos)
+NORMALIZACION_WORKERS = config("NORMALIZACION_WORKERS", default=2, cast=int)
+NORMALIZACION_MIN_FILAS = config("NORMALIZACION_MIN_FILAS", default=20000, cast=int)
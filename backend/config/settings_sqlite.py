@@ -5,6 +5,8 @@ Django settings for config project - SQLite temporal para exportar datos.
 import os
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -25,6 +27,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.metricas.MetricasMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -83,6 +86,10 @@ CORS_ALLOWED_ORIGINS = [
 ]
 CORS_ALLOW_CREDENTIALS = True
 
+# Peticiones condicionales: el frontend puede reenviar el ETag recibido
+CORS_ALLOW_HEADERS = (*default_headers, "if-none-match")
+CORS_EXPOSE_HEADERS = ["ETag"]
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
@@ -93,3 +100,39 @@ REST_FRAMEWORK = {
 }
 
 ADMIN_DELETE_PASSWORD = "admin123"
+
+# Tamaño de lote para la inserción masiva de registros del corte FONASA
+CORTE_BULK_BATCH_SIZE = 5000
+
+# Ejecución de cargas en segundo plano: "thread" (pool en el proceso web, que
+# retoma por sí mismo los trabajos interrumpidos por un reinicio) o "command"
+# (proceso aparte con `python manage.py procesar_trabajos`)
+INGESTA_EJECUTOR = "thread"
+INGESTA_WORKERS = 2
+# Un trabajo EN_PROCESO sin avance en este plazo (segundos) vuelve a la cola;
+# tras INGESTA_TRABAJO_MAX_INTENTOS intentos queda en ERROR
+INGESTA_TRABAJO_TIMEOUT = 1800
+INGESTA_TRABAJO_MAX_INTENTOS = 3
+
+# Crear en los catálogos los valores desconocidos que traen las cargas (etnia, sector, ...)
+INGESTA_CREAR_CATALOGOS = False
+
+# Normalización de cargas grandes en procesos paralelos (0 o 1 = sin procesos)
+NORMALIZACION_WORKERS = 2
+NORMALIZACION_MIN_FILAS = 20000
+
+# Caché por proceso: la base SQLite es local y de un solo servidor
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "percapita-cache",
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    }
+}
+RESPONSE_CACHE_TIMEOUT = 600
+
+# Peticiones más lentas que este umbral (ms) se registran con sus consultas; 0 desactiva
+METRICS_SLOW_REQUEST_MS = 0
+
+# Token Bearer con el que Prometheus lee /api/metrics/; vacío = solo usuarios staff
+METRICS_TOKEN = ""
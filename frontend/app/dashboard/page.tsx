@@ -111,8 +111,8 @@ export default function DashboardPage() {
       if (centrosNombres.length > 0) {
         console.log("Centros disponibles:", centrosNombres);
         const allCentrosRes = await fetch(
-          `${API_URL}/api/corte-fonasa/?summary_only=true&centros=${centrosNombres.join(
-            ","
+          `${API_URL}/api/dashboard/centros/?months=1&centros=${encodeURIComponent(
+            centrosNombres.join(",")
           )}`
         );
         if (allCentrosRes.ok) {